@@ -0,0 +1,31 @@
+import argparse
+
+from engine import atlas
+from engine.resources import pack as asset_pack
+from . import atlases, pack
+
+DEFAULT_SCREEN_SIZES = ["1280x960"]
+
+
+def parse_screen_size(value: str) -> tuple[int, int]:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bake", description="Bake the sprite sheets and image definitions into texture atlases.")
+    parser.add_argument("-s", "--screen-size", action="append", type=parse_screen_size, help="target screen size like 1280x960, can be repeated")
+    parser.add_argument("-o", "--output", default=atlas.BAKED_DIRECTORY, help="directory to write the atlases to")
+    parser.add_argument("-p", "--page-size", type=int, default=atlas.DEFAULT_PAGE_SIZE, help="maximum width and height of an atlas page")
+    parser.add_argument("--pack", nargs="?", const=asset_pack.DEFAULT_PACK, help="also pack every asset, including the atlases, into this file")
+    args = parser.parse_args()
+
+    for screen_size in args.screen_size or [parse_screen_size(size) for size in DEFAULT_SCREEN_SIZES]:
+        atlases.bake(screen_size, args.output, args.page_size)
+
+    if args.pack:
+        pack.build(args.pack)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import glob
+import os
+
+import pygame
+from engine import atlas
+from engine.sprites import SpriteSheet, load_spritesheet_data, load_image_data
+
+SPRITESHEET_PATTERN = "assets/sprites/**/*.json"
+IMAGE_PATTERN = "assets/images/*.json"
+
+
+def find_definitions(pattern: str) -> list[str]:
+    # files starting with an underscore are schemas, not definitions
+    filenames = glob.glob(pattern, recursive=True)
+    return sorted(filename.replace(os.sep, "/") for filename in filenames if not os.path.basename(filename).startswith("_"))
+
+
+def slice_spritesheet(filename: str) -> list[pygame.Surface]:
+    # same scaling and slicing as loading the sheet at runtime
+    data = load_spritesheet_data(filename)
+    image = pygame.image.load(data.image_filename)
+    image = pygame.transform.scale(image, (image.get_width() * data.scale_factor, image.get_height() * data.scale_factor))
+    return SpriteSheet(image, data).frames
+
+
+def scale_image(filename: str, screen_size: tuple[int, int]) -> pygame.Surface:
+    data = load_image_data(filename)
+    image = pygame.image.load(data.image_filename)
+    return pygame.transform.scale(image, atlas.get_image_size(data.width, data.height, screen_size))
+
+
+def bake(screen_size: tuple[int, int], output: str, page_size: int = atlas.DEFAULT_PAGE_SIZE) -> str:
+    packer = atlas.AtlasPacker(page_size)
+    for filename in find_definitions(SPRITESHEET_PATTERN):
+        packer.add(atlas.ENTRY_SPRITESHEET, filename, slice_spritesheet(filename))
+    for filename in find_definitions(IMAGE_PATTERN):
+        packer.add(atlas.ENTRY_IMAGE, filename, [scale_image(filename, screen_size)])
+
+    pages, entries = packer.pack()
+    index_filename = atlas.write_atlas(output, atlas.get_atlas_name(screen_size), pages, entries)
+    frame_count = sum(len(entry.frames) for entry in entries)
+    print(f"{index_filename}: {len(entries)} entries, {frame_count} frames, {len(pages)} page(s) {', '.join(f'{page.get_width()}x{page.get_height()}' for page in pages)}")
+    return index_filename
@@ -0,0 +1,40 @@
+import json
+import os
+
+import pygame
+from engine.resources import pack
+
+ASSETS_DIRECTORY = "assets"
+IMAGE_KINDS = {".png": pack.ENTRY_IMAGE_RGBA, ".jpg": pack.ENTRY_IMAGE_RGB, ".jpeg": pack.ENTRY_IMAGE_RGB}
+
+
+def find_assets(directory: str) -> list[str]:
+    # schemas are only for editing, and never loaded by the game
+    filenames = list[str]()
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if not filename.startswith("_"):
+                filenames.append(os.path.join(root, filename).replace(os.sep, "/"))
+    return sorted(filenames)
+
+
+def encode_asset(filename: str) -> tuple[int, bytes, int, int]:
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in IMAGE_KINDS:
+        kind = IMAGE_KINDS[extension]
+        image = pygame.image.load(filename)
+        return kind, pygame.image.tobytes(image, pack.IMAGE_FORMATS[kind]), image.get_width(), image.get_height()
+    if extension == ".json":
+        with open(filename) as file:
+            data = json.load(file)
+        data.pop("$schema", None)
+        return pack.ENTRY_JSON, json.dumps(data, separators=(",", ":")).encode("utf-8"), 0, 0
+    with open(filename, "rb") as file:
+        return pack.ENTRY_BYTES, file.read(), 0, 0
+
+
+def build(output: str = pack.DEFAULT_PACK, directory: str = ASSETS_DIRECTORY) -> str:
+    entries = [(filename, *encode_asset(filename)) for filename in find_assets(directory)]
+    pack.write_pack(output, entries)
+    print(f"{output}: {len(entries)} entries, {os.path.getsize(output) / 1_048_576:.1f} MB")
+    return output
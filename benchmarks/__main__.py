@@ -0,0 +1,34 @@
+import argparse
+import sys
+
+from . import harness
+from . import engine_paths, text_rendering, scenes, startup
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the engine benchmarks headless.")
+    parser.add_argument("-k", "--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("-r", "--repeats", type=int, default=harness.DEFAULT_REPEATS)
+    parser.add_argument("-o", "--output", help="write the results as json to this file")
+    parser.add_argument("-b", "--baseline", help="compare against the results saved in this file")
+    parser.add_argument("-t", "--threshold", type=float, default=harness.DEFAULT_THRESHOLD, help="allowed slowdown against the baseline, 0.10 is 10%%")
+    parser.add_argument("--startup-budget", type=float, help="also launch the game and fail when its first frame takes longer than this many ms")
+    args = parser.parse_args()
+
+    report = harness.run(args.filter, args.repeats)
+    if args.output:
+        harness.save(report, args.output)
+
+    if args.baseline:
+        regressions = harness.compare(report, harness.load(args.baseline), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+    if args.startup_budget is not None:
+        if not startup.check(startup.run(), args.startup_budget):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
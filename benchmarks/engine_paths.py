@@ -0,0 +1,302 @@
+import random
+
+import pygame
+
+from engine import Game, GameContext, GameSetup, collision, controllers, events, sprites, tilemap, timing
+from engine.animation import AnimationSystem
+from engine.game.state import GameState
+from engine.projectiles import ProjectileSystem
+from deltarune import resources
+
+from .harness import benchmark, init_display
+
+
+@benchmark("engine.game.init_frame", iterations=5000)
+def bench_init_frame():
+    screen = init_display()
+    game = Game(GameSetup("benchmark", [], headless=True))
+    state = GameState(screen)
+
+    def step():
+        # every frame after an update resets the key edges
+        state.input_consumed = True
+        game.init_frame(state)
+    return step
+
+
+@benchmark("engine.sprites.animated_sprite_update", iterations=20000)
+def bench_animated_sprite_update():
+    init_display()
+    sheet = sprites.load_spritesheet(resources.sprites.LINKLE_IDLE)
+    sprite = sprites.AnimatedSprite(sheet.frames, duration=1/12)
+
+    def step():
+        sprite.update(1/60)
+    return step
+
+
+@benchmark("engine.animation.update_1000", iterations=5000)
+def bench_animation_update():
+    # a crowd of sprites on the same sheet and clip, each started at its own time
+    init_display()
+    sheet = sprites.load_spritesheet(resources.sprites.LINKLE_IDLE)
+    clip = sheet.get_clip("idle")
+    animations = AnimationSystem()
+    for i in range(1000):
+        animations.play(sprites.AnimatedSprite(sheet.frames, clip=clip), started_at=-i * 7)
+    ticks = [0]
+
+    def step():
+        ticks[0] += 1000 / 60
+        animations.update(ticks[0])
+    return step
+
+
+@benchmark("engine.sprites.spritesheet_split", iterations=2000)
+def bench_spritesheet_split():
+    init_display()
+    sheet = sprites.load_spritesheet(resources.sprites.LINKLE_IDLE)
+
+    def step():
+        sheet.split()
+    return step
+
+
+@benchmark("engine.sprites.frame_variant", iterations=20000)
+def bench_frame_variant():
+    # mirrored and zoomed frames are made once, and looked up after that
+    init_display()
+    sheet = sprites.load_spritesheet(resources.sprites.LINKLE_IDLE)
+    frame = [0]
+
+    def step():
+        frame[0] = (frame[0] + 1) % len(sheet.frames)
+        sheet.get_frame(frame[0], (-1.5, 1.5))
+    return step
+
+
+@benchmark("engine.sprites.load_spritesheet", iterations=200)
+def bench_load_spritesheet():
+    init_display()
+
+    def step():
+        sprites.load_spritesheet(resources.sprites.LINKLE_IDLE)
+    return step
+
+
+def fill_projectiles(count: int) -> ProjectileSystem:
+    projectiles = ProjectileSystem()
+    rings, per_ring = count // 50, 50
+    for ring in range(rings):
+        projectiles.spawn_ring(0.5, 0.5, per_ring, 0.1 + ring * 0.001, 1000, 4 / 150, angle=ring * 0.1, spin=0.5)
+    return projectiles
+
+
+@benchmark("engine.projectiles.update_5000", iterations=2000)
+def bench_projectiles_update():
+    projectiles = fill_projectiles(5000)
+    x, y, vx, vy = (projectiles.x.copy(), projectiles.y.copy(), projectiles.vx.copy(), projectiles.vy.copy())
+
+    def step():
+        # bullets would drift out of bounds, so start every step from the same field
+        projectiles.x[:], projectiles.y[:], projectiles.vx[:], projectiles.vy[:] = x, y, vx, vy
+        projectiles.count = 5000
+        projectiles.update(1/60)
+    return step
+
+
+@benchmark("engine.projectiles.collide_5000", iterations=5000)
+def bench_projectiles_collide():
+    projectiles = fill_projectiles(5000)
+
+    def step():
+        projectiles.collide_circle(0.5, 0.6, 8 / 150)
+    return step
+
+
+@benchmark("engine.projectiles.draw_5000", iterations=200)
+def bench_projectiles_draw():
+    screen = init_display()
+    projectiles = fill_projectiles(5000)
+    image = pygame.Surface((8, 8), pygame.SRCALPHA)
+    pygame.draw.circle(image, "white", (4, 4), 4)
+
+    def step():
+        projectiles.draw(screen, pygame.Rect(490, 192, 300, 300), image, 0.5)
+    return step
+
+
+def fill_spatial_hash(count: int) -> collision.SpatialHash:
+    # the same scattered field every run
+    generator = random.Random(count)
+    space = collision.SpatialHash()
+    for i in range(count):
+        space.insert(i, pygame.Rect(generator.randint(0, 4000), generator.randint(0, 4000), generator.randint(8, 48), generator.randint(8, 48)))
+    return space
+
+
+@benchmark("engine.collision.query_rect_5000", iterations=20000)
+def bench_collision_query_rect():
+    space = fill_spatial_hash(5000)
+    rect = pygame.Rect(2000, 2000, 128, 128)
+
+    def step():
+        space.query_rect(rect)
+    return step
+
+
+@benchmark("engine.collision.move_5000", iterations=20000)
+def bench_collision_move():
+    space = fill_spatial_hash(5000)
+    rect = pygame.Rect(space.get_rect(0))
+    offsets = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+    moves = iter(range(1 << 62))
+
+    def step():
+        rect.move_ip(offsets[next(moves) % 4])
+        space.move(0, rect)
+    return step
+
+
+@benchmark("engine.collision.iter_pairs_5000", iterations=20)
+def bench_collision_iter_pairs():
+    space = fill_spatial_hash(5000)
+
+    def step():
+        for _ in space.iter_pairs():
+            pass
+    return step
+
+
+@benchmark("engine.tilemap.render_chunk", iterations=200)
+def bench_tilemap_render_chunk():
+    init_display()
+    meadow = tilemap.load_tilemap(resources.maps.MEADOW)
+
+    def step():
+        meadow.render_chunk(1, 1)
+    return step
+
+
+@benchmark("engine.tilemap.draw_scrolling", iterations=500)
+def bench_tilemap_draw_scrolling():
+    screen = init_display()
+    meadow = tilemap.load_tilemap(resources.maps.MEADOW)
+    chunks = tilemap.ChunkCache(meadow)
+    camera = tilemap.Camera(screen.get_size(), meadow.get_rect())
+    steps = iter(range(1 << 62))
+
+    def step():
+        # pans back and forth across the whole map, streaming chunks as it goes
+        x = next(steps) * 8 % (2 * meadow.get_rect().width)
+        camera.follow((min(x, 2 * meadow.get_rect().width - x), meadow.get_rect().centery))
+        chunks.stream(camera.get_view_rect(), meadow.get_chunk_pixel_size()[0] // 2)
+        tilemap.draw_tilemap(screen, chunks, camera)
+    return step
+
+
+class IdleStates:
+    def update(self, context: GameContext):
+        pass
+
+    def never(self, context: GameContext) -> bool:
+        return False
+
+
+@benchmark("engine.controllers.hierarchical_update", iterations=20000)
+def bench_hierarchical_update():
+    # a four level deep active path, next to a hundred inactive branches that should cost nothing
+    table = {"initial": "leaf", "states": {"root": {"update": "update", "states": {"middle": {"update": "update", "states": {"inner": {"transitions": [{"to": "root", "when": "never"}], "states": {"leaf": {"update": "update", "transitions": [{"to": "inner", "after": 1 << 30}]}}}}}}}}}
+    for i in range(100):
+        table["states"][f"inactive_{i}"] = {"update": "update", "states": {f"inactive_child_{i}": {"update": "update", "transitions": [{"to": "root", "when": "never"}]}}}
+    state = GameState(init_display())
+    machine = controllers.HierarchicalStateMachine(GameContext(state), controllers.create_states(table, IdleStates()), table["initial"])
+
+    def step():
+        machine.update()
+    return step
+
+
+class TimeoutStates:
+    def __init__(self):
+        self.entered = list[str]()
+
+    def enter(self, context: GameContext):
+        self.entered.append("x")
+
+
+@benchmark("engine.controllers.hierarchical_timeouts", iterations=2000)
+def bench_hierarchical_timeouts():
+    # a parent and its child time out on the same tick, only the parent transition is taken.
+    # stale timeouts already due in that dispatch used to be taken after it
+    table = {"initial": "p", "states": {"p": {"transitions": [{"to": "x", "after": 100}], "states": {"c": {"transitions": [{"to": "y", "after": 100}]}}}, "x": {"enter": "enter"}, "y": {}}}
+    state = GameState(init_display())
+    handler = TimeoutStates()
+    machine = controllers.HierarchicalStateMachine(GameContext(state), controllers.create_states(table, handler), table["initial"])
+
+    def step():
+        handler.entered.clear()
+        machine.start_from("p")
+        transitions = machine.transition_count
+        state.bus.dispatch(100)
+        if machine.get_active_path() != ("x",) or machine.transition_count != transitions + 1 or handler.entered != ["x"]:
+            raise AssertionError(f"nested timeouts ended in {machine.get_active_path()} after {machine.transition_count - transitions} transitions")
+    step()
+    return step
+
+
+class Tick(events.Event):
+    pass
+
+
+@benchmark("engine.events.dispatch_1000_timers", iterations=20000)
+def bench_events_dispatch():
+    # a thousand repeating timers spread over a second, so a few come due every step
+    bus = events.EventBus()
+    bus.subscribe(Tick, lambda event: None)
+    for i in range(1000):
+        bus.schedule(i, Tick(), interval=1000)
+    ticks = [0]
+
+    def step():
+        ticks[0] += 16
+        bus.dispatch(ticks[0])
+    return step
+
+
+@benchmark("engine.timing.advance_10000_timers", iterations=20000)
+def bench_timing_advance():
+    # ten thousand repeating timers over ten seconds, so only a few come due every step
+    scheduler = timing.Scheduler()
+    for i in range(10000):
+        scheduler.every(10000, lambda: None, delay=i)
+    ticks = [0]
+
+    def step():
+        ticks[0] += 16
+        scheduler.advance(ticks[0])
+    return step
+
+
+class Tweened:
+    def __init__(self):
+        self.value = 0.0
+        self.position = pygame.Vector2()
+
+
+@benchmark("engine.timing.tween_200", iterations=5000)
+def bench_timing_tween():
+    scheduler = timing.Scheduler()
+    targets = [Tweened() for _ in range(100)]
+    ticks = [0]
+
+    def step():
+        ticks[0] += 16
+        # restarted every second, so two hundred tweens are always running
+        if ticks[0] % 1008 == 16:
+            for target in targets:
+                scheduler.tween(target, "value", 100.0, 1000, timing.ease_out)
+                scheduler.tween(target, "position", pygame.Vector2(100, 100), 1000, timing.ease_in_out)
+        scheduler.advance(ticks[0])
+    return step
+
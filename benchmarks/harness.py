@@ -0,0 +1,98 @@
+import json
+import platform
+import statistics
+import time
+from typing import Callable
+
+import pygame
+
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 0.10
+
+
+class Benchmark:
+    def __init__(self, name: str, prepare: Callable[[], Callable[[], None]], iterations: int):
+        self.name = name
+        self.prepare = prepare
+        self.iterations = iterations
+
+
+BENCHMARKS = list[Benchmark]()
+
+
+def benchmark(name: str, iterations: int = 1000):
+    # the decorated function does the setup and returns the step to time
+    def register(prepare: Callable[[], Callable[[], None]]):
+        BENCHMARKS.append(Benchmark(name, prepare, iterations))
+        return prepare
+    return register
+
+
+def init_display(size: tuple[int, int] = (1280, 960)) -> pygame.Surface:
+    if not pygame.display.get_init():
+        pygame.init()
+    surface = pygame.display.get_surface()
+    if surface is None or surface.get_size() != size:
+        surface = pygame.display.set_mode(size)
+    return surface
+
+
+def measure(bench: Benchmark, repeats: int = DEFAULT_REPEATS) -> dict:
+    step = bench.prepare()
+    step()
+
+    rounds = []
+    for _ in range(repeats):
+        started_at = time.perf_counter_ns()
+        for _ in range(bench.iterations):
+            step()
+        rounds.append((time.perf_counter_ns() - started_at) / bench.iterations)
+
+    return {
+        "iterations": bench.iterations,
+        "repeats": repeats,
+        "median_ns": statistics.median(rounds),
+        "min_ns": min(rounds),
+        "mean_ns": statistics.fmean(rounds),
+    }
+
+
+def run(name_filter: str | None = None, repeats: int = DEFAULT_REPEATS) -> dict:
+    results = {}
+    for bench in BENCHMARKS:
+        if name_filter and name_filter not in bench.name:
+            continue
+        results[bench.name] = measure(bench, repeats)
+        print(f"{bench.name:<40} {results[bench.name]['median_ns'] / 1000:12.2f} us")
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def save(report: dict, filename: str):
+    with open(filename, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+def load(filename: str) -> dict:
+    with open(filename) as file:
+        return json.load(file)
+
+
+def compare(report: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    regressions = []
+    print(f"{'benchmark':<40} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, result in report["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:<40} {'-':>12} {result['median_ns'] / 1000:12.2f} {'new':>8}")
+            continue
+        change = result["median_ns"] / previous["median_ns"] - 1
+        flag = " !" if change > threshold else ""
+        print(f"{name:<40} {previous['median_ns'] / 1000:12.2f} {result['median_ns'] / 1000:12.2f} {change * 100:+7.1f}%{flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
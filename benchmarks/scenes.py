@@ -0,0 +1,70 @@
+from engine import Game, GameSetup, GameContext, Scene
+from engine.game.state import GameState
+from deltarune.scenes import Adventure, Coconut, Wip
+
+from .harness import benchmark, init_display
+
+
+class SceneRunner:
+    def __init__(self, scene: Scene):
+        self.scene = scene
+        self.game = Game(GameSetup("benchmark", [scene], headless=True))
+        self.state = GameState(init_display())
+        self.state.headless = True
+        self.context = GameContext(self.state)
+
+        # enter the scene the same way Game.run does on its first frame
+        self.game.init_frame(self.state)
+        scene.load(self.context)
+        scene.start(self.context)
+        self.frame()
+
+    def frame(self):
+        self.game.init_frame(self.state)
+        self.game.update_scene(self.state, self.scene, self.context)
+        self.game.init_draw(self.state)
+        self.scene.draw(self.context)
+        self.game.finish_frame(self.state)
+
+
+def enter_battle(scene: Adventure):
+    scene.state_machine.start_from("battle")
+
+
+@benchmark("scene.adventure.exploration", iterations=500)
+def bench_adventure_exploration():
+    runner = SceneRunner(Adventure())
+    return runner.frame
+
+
+@benchmark("scene.adventure.battle_strategy", iterations=500)
+def bench_adventure_battle_strategy():
+    runner = SceneRunner(Adventure())
+    enter_battle(runner.scene)
+    runner.frame()
+    return runner.frame
+
+
+@benchmark("scene.adventure.minigame", iterations=500)
+def bench_adventure_minigame():
+    runner = SceneRunner(Adventure())
+    scene = runner.scene
+
+    def step():
+        # restart the minigame before its timer ends the enemy turn
+        if not scene.state_machine.is_active("minigame") or scene.state_machine.get_ticks_elapsed("minigame") > 5000:
+            scene.state_machine.start_from("minigame")
+        runner.frame()
+    return step
+
+
+@benchmark("scene.coconut", iterations=500)
+def bench_coconut():
+    runner = SceneRunner(Coconut())
+    return runner.frame
+
+
+@benchmark("scene.wip", iterations=500)
+def bench_wip():
+    runner = SceneRunner(Wip())
+    return runner.frame
@@ -0,0 +1,51 @@
+import pygame
+from engine import text
+from deltarune import resources
+
+from .harness import benchmark, init_display
+
+SCREEN_RATIO = 2
+
+# the strings the battle hud draws every frame, with their target heights
+HUD_TEXTS = [
+    ("font", "100 / 100", "white", 10),
+    ("font", "HP", "white", 9),
+    ("name_font", "Linkle", "white", 15),
+] * 3 + [
+    ("font", "Fight", "yellow", 7),
+]
+
+
+def load_fonts():
+    return {
+        "font": pygame.font.Font(resources.fonts.JOYSTIX_MONOSPACE, 20),
+        "name_font": pygame.font.Font(resources.fonts.RETRO_GAMING, 30),
+    }
+
+
+@benchmark("text.hud.font_render", iterations=500)
+def bench_font_render():
+    screen = init_display()
+    fonts = load_fonts()
+
+    def step():
+        for font_name, content, color, height in HUD_TEXTS:
+            surface = fonts[font_name].render(content, False, color)
+            surface = pygame.transform.scale(surface, (height * SCREEN_RATIO * surface.get_width() / surface.get_height(), height * SCREEN_RATIO))
+            screen.blit(surface, (0, 0))
+    return step
+
+
+@benchmark("text.hud.text_renderer", iterations=500)
+def bench_text_renderer():
+    screen = init_display()
+    fonts = load_fonts()
+    renderers = {}
+    for font_name, _, color, height in HUD_TEXTS:
+        if (font_name, color, height) not in renderers:
+            renderers[(font_name, color, height)] = text.TextRenderer(fonts[font_name], color, height=height * SCREEN_RATIO)
+
+    def step():
+        for font_name, content, color, height in HUD_TEXTS:
+            screen.blit(renderers[(font_name, color, height)].render(content), (0, 0))
+    return step
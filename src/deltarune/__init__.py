@@ -1,2 +1,14 @@
-from . import scenes
-from . import inputs
\ No newline at end of file
+import importlib
+
+# subpackages are imported on first use, so importing one scene does not pull in the rest
+_LAZY_MODULES = ["characters", "controllers", "inputs", "resources", "scenes"]
+
+__all__ = list(_LAZY_MODULES)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{name}", __name__)
+    globals()[name] = module
+    return module
@@ -12,5 +12,7 @@ class Character:
         self.name = name
         self.max_hp = max_hp
         self.current_hp = current_hp
+        # what the hp bar shows, catching up with current_hp
+        self.displayed_hp = float(current_hp)
         self.primary_color = primary_color
         self.actions = actions
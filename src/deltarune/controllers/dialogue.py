@@ -1,40 +1,220 @@
+import re
+import pygame
 from engine import *
+from engine import Event, text
 
 DEFAULT_DIALOGUE_SPEED = 100
+DEFAULT_DIALOGUE_COLOR = "white"
+
+# markup accepted inside dialogue content:
+#   {speed=50}  milliseconds per character from this point on
+#   {pause=500} extra milliseconds before the next character
+#   {page}      forces the following text onto a new page
+MARKUP_PATTERN = re.compile(r"\{(speed|pause|page)(?:=(\d+))?\}")
+PAGE_BREAK = "\f"
+LINE_BREAK = "\n"
+
+
+class DialoguePage:
+    def __init__(self):
+        self.chars = list[str]()
+        self.positions = list[tuple[int, int]]()
+        self.reveal_at = list[int]()
+
+    def __len__(self):
+        return len(self.chars)
+
+    def append(self, char: str, position: tuple[int, int], reveal_at: int):
+        self.chars.append(char)
+        self.positions.append(position)
+        self.reveal_at.append(reveal_at)
+
+
+class DialogueFinished(Event):
+    def __init__(self, dialogue: "DialogueController"):
+        self.dialogue = dialogue
 
 
 class DialogueController(ControllerBase):
-    def __init__(self, context: GameContext):
+    def __init__(self, context: GameContext, font: Font, size: tuple[int, int], color: Color | str = DEFAULT_DIALOGUE_COLOR):
         super(DialogueController, self).__init__(context)
-        self.ticks = 0
+        self.atlas = text.get_glyph_atlas(font, color)
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
         self.started_at = 0
         self.content = ""
-        self.duration = 0
-        self.finished = False
+        self.pages = list[DialoguePage]()
+        self.page_idx = 0
+        self.page_started_at = 0
+        self.revealed = 0
+
+        # characters are revealed by a timer due at the next one, instead of checking every update
+        self.bus = context.get_event_bus()
+        self.scheduler = context.get_scheduler()
+        self.timer = None
+        self.announced = False
 
     def init_update(self):
-        self.ticks = self.context.scene.get_current_ticks()
-        if self.started_at and self.ticks - self.started_at > self.duration:
-            self.finished = True
-    
+        pass
+
     def finish_update(self):
         pass
 
     def start(self, content: str, duration: int = None):
-        self.started_at = self.ticks
+        plain_length = len(MARKUP_PATTERN.sub("", content))
+        speed = duration / max(plain_length, 1) if duration else DEFAULT_DIALOGUE_SPEED
+        self.started_at = self.context.scene.get_current_ticks()
         self.content = content
-        self.duration = duration if duration else len(content) * DEFAULT_DIALOGUE_SPEED
-        self.finished = False
-    
+        self.pages = self.layout(content, speed)
+        self.show_page(0)
+
     def clear(self):
+        self.scheduler.cancel(self.timer)
+        self.timer = None
+        self.announced = False
         self.started_at = 0
         self.content = ""
-        self.duration = 0
-        self.finished = False
-    
+        self.pages = []
+        self.page_idx = 0
+        self.revealed = 0
+        self.surface.fill((0, 0, 0, 0))
+
     def finish(self):
-        self.finished = True
-    
+        if self.pages:
+            self.show_page(len(self.pages) - 1)
+            self.reveal_until(None)
+
+    def advance(self):
+        if not self.is_page_finished:
+            self.reveal_until(None)
+        elif self.page_idx < len(self.pages) - 1:
+            self.show_page(self.page_idx + 1)
+
+    def draw(self, surface: pygame.Surface, position: tuple[float, float]):
+        if self.pages:
+            surface.blit(self.surface, position)
+
+    @property
+    def is_active(self):
+        return len(self.pages) > 0
+
+    @property
+    def is_page_finished(self):
+        return not self.pages or self.revealed == len(self.pages[self.page_idx])
+
     @property
     def is_finished(self):
-        return self.finished
\ No newline at end of file
+        return self.is_page_finished and self.page_idx == len(self.pages) - 1
+
+    def show_page(self, page_idx: int):
+        self.page_idx = page_idx
+        self.page_started_at = self.context.scene.get_current_ticks()
+        self.revealed = 0
+        self.surface.fill((0, 0, 0, 0))
+        self.reveal_until(0)
+
+    def reveal_until(self, elapsed: int | None):
+        # only blit the characters revealed since the last call
+        page = self.pages[self.page_idx]
+        end = self.revealed
+        while end < len(page) and (elapsed is None or page.reveal_at[end] <= elapsed):
+            end += 1
+        if end > self.revealed:
+            blits = []
+            for char, position in zip(page.chars[self.revealed:end], page.positions[self.revealed:end]):
+                source, area = self.atlas.get_glyph(char)
+                blits.append((source, position, area))
+            self.surface.blits(blits, doreturn=False)
+            self.revealed = end
+        self.schedule_reveal()
+
+    def schedule_reveal(self):
+        self.scheduler.cancel(self.timer)
+        self.timer = None
+        page = self.pages[self.page_idx]
+        if self.revealed < len(page):
+            self.timer = self.scheduler.at(self.page_started_at + page.reveal_at[self.revealed], self.on_reveal)
+        elif self.is_finished and not self.announced:
+            self.announced = True
+            self.bus.publish(DialogueFinished(self))
+
+    def on_reveal(self):
+        self.timer = None
+        self.reveal_until(self.scheduler.ticks - self.page_started_at)
+
+    def layout(self, content: str, speed: float) -> list[DialoguePage]:
+        width, height = self.surface.get_size()
+        line_height = self.atlas.height
+        lines_per_page = max(height // line_height, 1)
+
+        # split content into words of (char, delay) pairs, keeping breaks as their own words
+        words = list[list[tuple[str, float]]]()
+        word = list[tuple[str, float]]()
+        pending_delay = 0
+        position = 0
+        for match in [*MARKUP_PATTERN.finditer(content), None]:
+            end = match.start() if match else len(content)
+            for char in content[position:end]:
+                if char in (" ", LINE_BREAK):
+                    if word:
+                        words.append(word)
+                    words.append([(char, speed + pending_delay)])
+                    word = []
+                else:
+                    word.append((char, speed + pending_delay))
+                pending_delay = 0
+            if match is None:
+                break
+            position = match.end()
+            name, value = match.group(1), match.group(2)
+            if name == "speed":
+                speed = int(value) if value else DEFAULT_DIALOGUE_SPEED
+            elif name == "pause":
+                pending_delay += int(value) if value else 0
+            elif name == "page":
+                if word:
+                    words.append(word)
+                words.append([(PAGE_BREAK, 0)])
+                word = []
+        if word:
+            words.append(word)
+
+        # wrap words into lines and lines into pages, accumulating reveal times per page
+        pages = [DialoguePage()]
+        x, line, elapsed = 0, 0, 0
+        for word in words:
+            char = word[0][0]
+            if char == PAGE_BREAK:
+                if len(pages[-1]):
+                    pages.append(DialoguePage())
+                x, line, elapsed = 0, 0, 0
+                continue
+            if char == LINE_BREAK:
+                x, line = 0, line + 1
+                continue
+            if char == " " and x == 0:
+                continue
+
+            word_width = self.atlas.measure("".join(char for char, _ in word))
+            if x and x + word_width > width:
+                if char == " ":
+                    continue
+                x, line = 0, line + 1
+            if line >= lines_per_page:
+                pages.append(DialoguePage())
+                x, line, elapsed = 0, 0, 0
+
+            for char, delay in word:
+                advance = self.atlas.get_glyph(char)[1].width
+                if x and x + advance > width:
+                    # words wider than the box break at the character
+                    x, line = 0, line + 1
+                    if line >= lines_per_page:
+                        pages.append(DialoguePage())
+                        x, line, elapsed = 0, 0, 0
+                elapsed += delay
+                pages[-1].append(char, (x, line * line_height), int(elapsed))
+                x += advance
+
+        if len(pages) > 1 and not len(pages[-1]):
+            pages.pop()
+        return pages
@@ -1,55 +1,43 @@
 from engine import *
+from engine.inputs import load_action_map
+
+from .. import resources
 
 
 class PlayerInput:
-    def __init__(self, context: GameContext):
+    def __init__(self, context: GameContext, filename: str = resources.inputs.PLAYER):
         self.context = context
-    
+        self.actions = load_action_map(context, filename)
+        self.next_mask = self.actions.mask("right", "up")
+        self.previous_mask = self.actions.mask("left", "down")
+
     def get_move_axis(self):
-        keys_pressed = self.context.get_keys_pressed()
-        move_axis = Vector2(0, 0)
-        if keys_pressed[pygame.K_LEFT] or keys_pressed[pygame.K_a] or keys_pressed[pygame.K_j]:
-            move_axis.x -= 1
-        if keys_pressed[pygame.K_RIGHT] or keys_pressed[pygame.K_d] or keys_pressed[pygame.K_l]:
-            move_axis.x += 1
-        if keys_pressed[pygame.K_UP] or keys_pressed[pygame.K_w] or keys_pressed[pygame.K_i]:
-            move_axis.y -= 1
-        if keys_pressed[pygame.K_DOWN] or keys_pressed[pygame.K_s] or keys_pressed[pygame.K_k]:
-            move_axis.y += 1
-        return move_axis
-    
+        return Vector2(self.actions.get_axis("move_x"), self.actions.get_axis("move_y"))
+
     def is_next_button_down(self):
-        keys_down = self.context.get_keys_down()
-        return keys_down[pygame.K_RIGHT] or keys_down[pygame.K_d] or keys_down[pygame.K_l] or keys_down[pygame.K_UP] or keys_down[pygame.K_w] or keys_down[pygame.K_i]
-    
+        return self.actions.is_any_down(self.next_mask)
+
     def is_previous_button_down(self):
-        keys_down = self.context.get_keys_down()
-        return keys_down[pygame.K_LEFT] or keys_down[pygame.K_a] or keys_down[pygame.K_j] or keys_down[pygame.K_DOWN] or keys_down[pygame.K_s] or keys_down[pygame.K_k]
-    
+        return self.actions.is_any_down(self.previous_mask)
+
     def is_up_button_down(self):
-        keys_down = self.context.get_keys_down()
-        return keys_down[pygame.K_UP] or keys_down[pygame.K_w] or keys_down[pygame.K_i]
-    
+        return self.actions.is_down("up")
+
     def is_down_button_down(self):
-        keys_down = self.context.get_keys_down()
-        return keys_down[pygame.K_DOWN] or keys_down[pygame.K_s] or keys_down[pygame.K_k]
-    
+        return self.actions.is_down("down")
+
     def is_left_button_down(self):
-        keys_down = self.context.get_keys_down()
-        return keys_down[pygame.K_LEFT] or keys_down[pygame.K_a] or keys_down[pygame.K_j]
-    
+        return self.actions.is_down("left")
+
     def is_right_button_down(self):
-        keys_down = self.context.get_keys_down()
-        return keys_down[pygame.K_RIGHT] or keys_down[pygame.K_d] or keys_down[pygame.K_l]
-    
+        return self.actions.is_down("right")
+
     def is_confirm_button_down(self):
-        keys_down = self.context.get_keys_down()
-        return keys_down[pygame.K_SPACE] or keys_down[pygame.K_RETURN] or keys_down[pygame.K_z]
-    
+        # confirm and cancel are buffered, so a press made just before a state listens still counts
+        return self.actions.consume("confirm")
+
     def is_cancel_button_down(self):
-        keys_down = self.context.get_keys_down()
-        return keys_down[pygame.K_ESCAPE] or keys_down[pygame.K_LSHIFT] or keys_down[pygame.K_RSHIFT] or keys_down[pygame.K_x]
-    
+        return self.actions.consume("cancel")
+
     def is_menu_button_down(self):
-        keys_down = self.context.get_keys_down()
-        return keys_down[pygame.K_TAB] or keys_down[pygame.K_LCTRL] or keys_down[pygame.K_RCTRL] or keys_down[pygame.K_c]
+        return self.actions.is_down("menu")
@@ -1,5 +1,8 @@
 from . import fonts
 from . import images
+from . import inputs
+from . import maps
 from . import music
 from . import sounds
-from . import sprites
\ No newline at end of file
+from . import sprites
+from . import states
\ No newline at end of file
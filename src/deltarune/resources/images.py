@@ -1,5 +1,6 @@
-from engine.resources.resolution import image
+from engine.resources.resolution import asset, image
 
 COCONUT = image("coconut.jpg")
 LINKLE_PORTRAIT = image("linkle-portrait.jpg")
 WIP = image("wip.png")
+LINKLE_PORTRAIT_MANIFEST = asset("images/linkle-portrait.json")
@@ -0,0 +1,3 @@
+from engine.resources.resolution import asset
+
+PLAYER = asset("inputs/player.json")
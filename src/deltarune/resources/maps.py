@@ -0,0 +1,6 @@
+from engine.resources.resolution import asset
+
+def tilemap(name: str):
+    return asset(f"maps/{name}.json")
+
+MEADOW = tilemap("meadow")
@@ -0,0 +1,3 @@
+from engine.resources.resolution import asset
+
+ADVENTURE = asset("states/adventure.json")
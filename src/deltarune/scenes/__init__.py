@@ -1,3 +1,19 @@
-from .coconut import Coconut
-from .wip import Wip
-from .adventure import Adventure
+import importlib
+
+# each scene lives in its own module, imported only when that scene is asked for
+_LAZY_SCENES = {
+    "Coconut": ".coconut",
+    "Wip": ".wip",
+    "Adventure": ".adventure",
+    "Loading": ".loading",
+}
+
+__all__ = list(_LAZY_SCENES)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_SCENES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    scene = getattr(importlib.import_module(_LAZY_SCENES[name], __name__), name)
+    globals()[name] = scene
+    return scene
@@ -1,60 +1,109 @@
+import pygame
 from engine import *
+from engine import CachedLayer, assets, collision, controllers, text, tilemap, timing
+from engine.animation import AnimationSystem
+from engine.projectiles import ProjectileSystem
 from .. import resources
 from ..inputs import PlayerInput
 from ..characters import Character, CharacterAction
-from ..controllers.dialogue import DialogueController
+from ..controllers.dialogue import DialogueController, DialogueFinished
 
 PLAYER_SPEED = 200
+PLAYER_FEET_WIDTH = 1 / 2
+PLAYER_FEET_HEIGHT = 1 / 6
 PLAYER_MINIGAME_SPEED = 0.75
 DIALOGUE_SPEED = 100
 
-MAIN_STATE_EXPLORATION = 0
-MAIN_STATE_BATTLE = 1
+DIALOGUE_BOX_HEIGHT = 115
+DIALOGUE_BOX_PADDING_LEFT = 32
+DIALOGUE_BOX_PADDING_TOP = 16
+
+HUD_BORDER_COLOR = "#332033"
+HEALTHBAR_EMPTY_COLOR = "#800000"
+HEALTHBAR_DURATION = 400
+CHARA_MENU_HEIGHT = 40
+CHARA_MENU_ACTIVE_HEIGHT = 70
+
+ACTION_BASE_COLOR = "orange"
+ACTION_ACTIVE_COLOR = "yellow"
+
+MINIGAME_BOX_SIZE = 150
+MINIGAME_HITBOX_RADIUS = 8 / MINIGAME_BOX_SIZE
+MINIGAME_HITBOX_COLOR = "red"
+MINIGAME_HITBOX_HIT_COLOR = "white"
+MINIGAME_HITBOX_HIT_DURATION = 300
+BULLET_RADIUS = 4 / MINIGAME_BOX_SIZE
+BULLET_COLOR = "white"
+BULLET_DAMAGE = 5
+BULLET_LIFETIME = 4
+RING_INTERVAL = 30
+RING_BULLETS = 24
+RING_SPEED = 0.3
+AIMED_INTERVAL = 75
+AIMED_BULLETS = 5
+AIMED_SPREAD = 0.6
+AIMED_SPEED = 0.5
+
+HUD_FONT = assets.FontAsset(resources.fonts.JOYSTIX_MONOSPACE, 20)
+NAME_FONT = assets.FontAsset(resources.fonts.RETRO_GAMING, 30)
+LINKLE_PORTRAIT_IMAGE = assets.ManifestImageAsset(resources.images.LINKLE_PORTRAIT_MANIFEST)
+LINKLE_IDLE_SHEET = assets.SpriteSheetAsset(resources.sprites.LINKLE_IDLE)
+MEADOW_MAP = assets.TileMapAsset(resources.maps.MEADOW)
 
-PLAYER_TURN_STATE_STRATEGY = 0
-PLAYER_TURN_STATE_ACTION = 1
 
-PLAYER_TURN_ACTION_STATE_PREFACE = 0
-PLAYER_TURN_ACTION_STATE_ANIMATION = 1
-PLAYER_TURN_ACTION_STATE_CONCLUSION = 2
-
-ENEMY_TURN_STATE_PREFACE = 0
-ENEMY_TURN_STATE_MINIGAME = 1
-ENEMY_TURN_STATE_CONCLUSION = 2
-
-TURN_STATE_PLAYER = 0
-TURN_ENEMY = 1
+class Adventure(Scene):
+    keep_resident = True
 
+    @classmethod
+    def get_dependencies(cls, context: GameContext):
+        return [HUD_FONT, NAME_FONT, LINKLE_PORTRAIT_IMAGE, LINKLE_IDLE_SHEET, MEADOW_MAP]
 
-class Adventure(Scene):
     def load(self, context: GameContext):
         screen_rect = context.get_screen_rect()
+        screen_ratio = screen_rect.width // 640
+        asset_manager = context.get_assets()
+
+        self.font = asset_manager.get(HUD_FONT)
+        self.name_font = asset_manager.get(NAME_FONT)
+        self.dialogue_font = asset_manager.get(NAME_FONT)
 
-        self.font = Font(resources.fonts.JOYSTIX_MONOSPACE, 20)
-        self.name_font = Font(resources.fonts.RETRO_GAMING, 30)
-        self.dialogue_font = Font(resources.fonts.RETRO_GAMING, 30)
+        self.hp_text = text.TextRenderer(self.font, "white", height=10 * screen_ratio)
+        self.hp_label_text = text.TextRenderer(self.font, "white", height=9 * screen_ratio)
+        self.name_text = text.TextRenderer(self.name_font, "white", height=15 * screen_ratio)
+        self.action_label_text = text.TextRenderer(self.font, ACTION_ACTIVE_COLOR, height=7 * screen_ratio)
 
-        self.linkle_portrait = pygame.image.load(resources.images.LINKLE_PORTRAIT).convert_alpha()
-        self.linkle_portrait = pygame.transform.scale(self.linkle_portrait, (32 * screen_rect.width // 640, 24 * screen_rect.height // 480))
+        self.linkle_portrait = asset_manager.get(LINKLE_PORTRAIT_IMAGE)
 
-        self.girly_archer_sheet = sprites.load_spritesheet(resources.sprites.LINKLE_IDLE)
-        self.girly_archer = sprites.AnimatedSprite(self.girly_archer_sheet.frames, transform=TransformationData(anchor=anchors.bottomcenter), duration=1/12)
+        self.girly_archer_sheet = asset_manager.get(LINKLE_IDLE_SHEET)
+        self.girly_archer = sprites.AnimatedSprite(self.girly_archer_sheet.frames, transform=TransformationData(anchor=anchors.bottomcenter), clip=self.girly_archer_sheet.get_clip("idle"), variants=self.girly_archer_sheet.variants)
         self.sprite_group = pygame.sprite.Group()
         self.sprite_group.add(self.girly_archer)
 
+        # the map never changes, so its chunks and walls are kept while the scene is loaded
+        self.map = asset_manager.get(MEADOW_MAP)
+        self.map_chunks = tilemap.ChunkCache(self.map)
+        self.camera = tilemap.Camera(screen_rect.size, self.map.get_rect())
+        self.world = collision.SpatialHash()
+        for i, wall in enumerate(self.map.get_solid_rects() + collision.create_bounds(self.map.get_rect())):
+            self.world.insert(("wall", i), wall)
+
+        bullet_size = 2 * BULLET_RADIUS * MINIGAME_BOX_SIZE * screen_ratio
+        self.bullet_image = pygame.Surface((bullet_size, bullet_size), pygame.SRCALPHA)
+        pygame.draw.circle(self.bullet_image, BULLET_COLOR, (bullet_size / 2, bullet_size / 2), bullet_size / 2)
+
     def start(self, context: GameContext) -> None:
         # inputs
         self.input = PlayerInput(context)
-
-        # state machines
-        self.main_state = StateMachineController(context, MAIN_STATE_EXPLORATION)
-        self.turn_state = StateMachineController(context, TURN_STATE_PLAYER)
-        self.player_turn_state = StateMachineController(context, PLAYER_TURN_STATE_STRATEGY)
-        self.player_turn_action_state = StateMachineController(context, PLAYER_TURN_ACTION_STATE_PREFACE)
-        self.enemy_turn_state = StateMachineController(context, ENEMY_TURN_STATE_PREFACE)
+        self.scheduler = context.get_scheduler()
 
         # controllers
-        self.dialogue = DialogueController(context)
+        screen_rect = context.get_screen_rect()
+        screen_ratio = screen_rect.width // 640
+        dialogue_size = (screen_rect.width - 2 * DIALOGUE_BOX_PADDING_LEFT * screen_ratio, (DIALOGUE_BOX_HEIGHT - 2 * DIALOGUE_BOX_PADDING_TOP) * screen_ratio)
+        self.dialogue = DialogueController(context, self.dialogue_font, dialogue_size)
+        # dialogue states end on the finished event, instead of checking the dialogue every update
+        self.dialogue_finished = False
+        context.get_event_bus().subscribe(DialogueFinished, self.on_dialogue_finished)
 
         # data
         # characters
@@ -82,7 +131,10 @@ class Adventure(Scene):
             ],
         )
         # exploration
-        self.player_pos = Vector2(100, 200)
+        self.player_pos = self.map.get_spawn_position()
+        self.previous_player_pos = Vector2(self.player_pos)
+        self.camera.follow(self.player_pos)
+        self.drawn_camera_offset = None
         # battle
         self.player_team = [self.linkle_chara, self.linkle_chara, self.linkle_chara]
         self.enemy_team = ["linkle", "linkle", "linkle"]
@@ -92,256 +144,330 @@ class Adventure(Scene):
         # player turn action
         self.player_turn_action_queue = list[BattleAction]()
         self.player_turn_action = None
-        self.player_turn_action_animation_started_at = None
         # enemy minigame
         self.player_hitbox_pos = Vector2(0.5, 0.5)
+        self.previous_player_hitbox_pos = Vector2(self.player_hitbox_pos)
+        self.player_hitbox_color = Color(MINIGAME_HITBOX_COLOR)
+        self.projectiles = ProjectileSystem()
+        self.minigame_updates = 0
+        # rendering
+        self.hud_state = None
+        self.hud_border_layer = CachedLayer((screen_rect.width, 4 * screen_ratio))
+        self.hud_panel_layers = [CachedLayer((screen_rect.width // 3, (CHARA_MENU_ACTIVE_HEIGHT + 2) * screen_ratio)) for _ in self.player_team]
+
+        # animations run on the scene clock, which starts over with every start
+        self.animations = AnimationSystem()
+        for sprite in self.sprite_group:
+            self.animations.play(sprite)
+
+        # state machine, with exploration and the battle flow defined in data
+        self.state_machine = controllers.load_state_machine(context, resources.states.ADVENTURE, self)
 
         # music
-        pygame.mixer.music.load(resources.music.SECRET)
-        pygame.mixer.music.play(-1)
+        context.play_music(resources.music.SECRET)
 
     def update(self, context: GameContext) -> None:
-        current_ticks = context.scene.get_current_ticks()
-        dt = context.get_delta_time()
+        # keep the last simulated positions for interpolated drawing
+        self.previous_player_pos = Vector2(self.player_pos)
+        self.previous_player_hitbox_pos = Vector2(self.player_hitbox_pos)
 
-        self.main_state.init_update()
-        self.turn_state.init_update()
-        self.player_turn_state.init_update()
-        self.player_turn_action_state.init_update()
-        self.enemy_turn_state.init_update()
         self.dialogue.init_update()
+        with context.profile("adventure.state_machine"):
+            self.state_machine.update()
+        self.dialogue.finish_update()
 
-        if self.main_state.is_current(MAIN_STATE_EXPLORATION):
-            if self.input.is_confirm_button_down():
-                self.main_state.transition_to(MAIN_STATE_BATTLE)
-
-            move_axis = self.input.get_move_axis()
-
-            if move_axis.length_squared() > 0:
-                self.player_pos = self.player_pos + move_axis.normalize() * PLAYER_SPEED * dt
-
-        elif self.main_state.is_current(MAIN_STATE_BATTLE) and self.turn_state.is_current(TURN_STATE_PLAYER):
-            if self.turn_state.is_entering:
-                self.player_turn_state.start_from(PLAYER_TURN_STATE_STRATEGY)
-
-            if self.player_turn_state.is_current(PLAYER_TURN_STATE_STRATEGY):
-                if self.player_turn_state.is_entering:
-                    self.menu_option_cursor = 0
-                    self.menu_chara_cursor = 0
-
-                if self.input.is_cancel_button_down() and self.menu_chara_cursor == 0:
-                    self.main_state.transition_to(MAIN_STATE_EXPLORATION)
-
-                if self.input.is_confirm_button_down():
-                    if self.menu_chara_cursor == len(self.player_team) - 1:
-                        self.player_turn_state.transition_to(PLAYER_TURN_STATE_ACTION)
-                    caller = self.player_team[self.menu_chara_cursor]
-                    action = caller.actions[self.menu_option_cursor]
-                    self.player_turn_action_queue.append(BattleAction(caller, action))
-                    self.menu_chara_cursor = min(self.menu_chara_cursor + 1, len(self.player_team) - 1)
-                    self.menu_option_cursor = 0
-
-                elif self.input.is_next_button_down():
-                    self.menu_option_cursor = (self.menu_option_cursor + 1) % len(self.player_team[self.menu_chara_cursor].actions)
-
-                elif self.input.is_previous_button_down():
-                    self.menu_option_cursor = (self.menu_option_cursor - 1) % len(self.player_team[self.menu_chara_cursor].actions)
-
-                elif self.input.is_cancel_button_down() and self.menu_chara_cursor > 0:
-                    self.player_turn_action_queue.pop()
-                    self.menu_chara_cursor = max(0, (self.menu_chara_cursor - 1))
-                    self.menu_option_cursor = 0
-
-            elif self.player_turn_state.is_current(PLAYER_TURN_STATE_ACTION):
-                if self.player_turn_state.is_entering:
-                    self.player_turn_action = None
-                    self.player_turn_action_state.start_from(PLAYER_TURN_ACTION_STATE_PREFACE)
-
-                if self.player_turn_action_state.is_current(PLAYER_TURN_ACTION_STATE_PREFACE):
-                    if self.player_turn_action_state.is_entering:
-                        self.player_turn_action = self.player_turn_action_queue.pop(0)
-                        self.dialogue.start(f"{self.player_turn_action.caller.name} will {self.player_turn_action.action.name}.")
-
-                    if self.dialogue.is_finished and self.input.is_confirm_button_down():
-                        self.player_turn_action_state.transition_to(PLAYER_TURN_ACTION_STATE_ANIMATION)
-                    elif self.input.is_confirm_button_down():
-                        self.dialogue.finish()
-
-                    if self.player_turn_action_state.is_exiting:
-                        self.dialogue.clear()
-
-                elif self.player_turn_action_state.is_current(PLAYER_TURN_ACTION_STATE_ANIMATION):
-                    if self.player_turn_action_state.ticks_elapsed > 2000:
-                        self.player_turn_action_state.transition_to(PLAYER_TURN_ACTION_STATE_CONCLUSION)
-
-                elif self.player_turn_action_state.is_current(PLAYER_TURN_ACTION_STATE_CONCLUSION):
-                    if self.player_turn_action_state.is_entering:
-                        self.dialogue.start(f"{self.player_turn_action.caller.name} did {self.player_turn_action.action.name}.")
-
-                    if self.dialogue.is_finished and self.input.is_confirm_button_down():
-                        if len(self.player_turn_action_queue) == 0:
-                            self.player_turn_action_state.exit()
-                            self.turn_state.transition_to(TURN_ENEMY)
-                        else:
-                            self.player_turn_action_state.transition_to(PLAYER_TURN_ACTION_STATE_PREFACE)
-                    elif self.input.is_confirm_button_down():
-                        self.dialogue.finish()
-
-                    if self.player_turn_action_state.is_exiting:
-                        self.dialogue.clear()
-
-        elif self.main_state.is_current(MAIN_STATE_BATTLE) and self.turn_state.is_current(TURN_ENEMY):
-            if self.turn_state.is_entering:
-                self.enemy_turn_state.start_from(ENEMY_TURN_STATE_PREFACE)
-
-            if self.enemy_turn_state.is_current(ENEMY_TURN_STATE_PREFACE):
-                if self.enemy_turn_state.is_entering:
-                    self.dialogue.start(f"Minion will attack! Prepare to dodge it all.")
-
-                if self.dialogue.is_finished and self.input.is_confirm_button_down():
-                    self.enemy_turn_state.transition_to(ENEMY_TURN_STATE_MINIGAME)
-                elif self.input.is_confirm_button_down():
-                    self.dialogue.finish()
-                
-                if self.enemy_turn_state.is_exiting:
-                    self.dialogue.clear()
-            
-            elif self.enemy_turn_state.is_current(ENEMY_TURN_STATE_MINIGAME):
-                if self.enemy_turn_state.is_entering:
-                    self.enemy_turn_minigame_started_at = current_ticks
-                    self.player_hitbox_pos = Vector2(0.5, 0.5)
-
-                move_axis = self.input.get_move_axis()
-                
-                if move_axis.length_squared() > 0:
-                    self.player_hitbox_pos = self.player_hitbox_pos + move_axis.normalize() * PLAYER_MINIGAME_SPEED * dt
-                    self.player_hitbox_pos.x = min(max(.08, self.player_hitbox_pos.x), .92)
-                    self.player_hitbox_pos.y = min(max(.08, self.player_hitbox_pos.y), .92)
-
-                if self.enemy_turn_state.ticks_elapsed > 10000:
-                    self.enemy_turn_state.transition_to(ENEMY_TURN_STATE_CONCLUSION)
-
-            elif self.enemy_turn_state.is_current(ENEMY_TURN_STATE_CONCLUSION):
-                if self.enemy_turn_state.is_entering:
-                    self.dialogue.start(f"Minion did attack.")
-
-                if self.dialogue.is_finished and self.input.is_confirm_button_down():
-                    self.enemy_turn_state.exit()
-                    self.turn_state.transition_to(TURN_STATE_PLAYER)
-                elif self.input.is_confirm_button_down():
-                    self.dialogue.finish()
-
-                if self.enemy_turn_state.is_exiting:
-                    self.dialogue.clear()
+        self.animations.update(context.scene.get_current_ticks())
 
-        self.dialogue.finish_update()
-        self.enemy_turn_state.finish_update()
-        self.player_turn_action_state.finish_update()
-        self.player_turn_state.finish_update()
-        self.turn_state.finish_update()
-        self.main_state.finish_update()
+    # exploration
+
+    def update_exploration(self, context: GameContext):
+        dt = context.get_delta_time()
+        move_axis = self.input.get_move_axis()
+
+        if move_axis.length_squared() > 0:
+            self.player_pos = self.player_pos + collision.move_and_slide(self.world, self.get_player_feet_rect(), move_axis.normalize() * PLAYER_SPEED * dt)
+
+        # the sheet faces right, walking left shows it mirrored
+        facing = -1 if move_axis.x < 0 else 1 if move_axis.x > 0 else self.girly_archer.transform.scale.x
+        if facing != self.girly_archer.transform.scale.x:
+            self.girly_archer.set_scale((facing, 1))
+
+        # render the chunks the camera is heading to a few at a time, before they are seen
+        self.camera.follow(self.player_pos)
+        self.map_chunks.stream(self.camera.get_view_rect(), self.map.get_chunk_pixel_size()[0] // 2)
+
+    def is_confirm_button_down(self, context: GameContext) -> bool:
+        return self.input.is_confirm_button_down()
+
+    # player turn
+
+    def enter_strategy(self, context: GameContext):
+        self.menu_option_cursor = 0
+        self.menu_chara_cursor = 0
 
-        self.girly_archer.set_position(self.player_pos)
-        self.sprite_group.update(dt)
+    def update_strategy(self, context: GameContext):
+        if self.input.is_confirm_button_down():
+            caller = self.player_team[self.menu_chara_cursor]
+            action = caller.actions[self.menu_option_cursor]
+            self.player_turn_action_queue.append(BattleAction(caller, action))
+            self.menu_chara_cursor = min(self.menu_chara_cursor + 1, len(self.player_team) - 1)
+            self.menu_option_cursor = 0
+
+        elif self.input.is_next_button_down():
+            self.menu_option_cursor = (self.menu_option_cursor + 1) % len(self.player_team[self.menu_chara_cursor].actions)
+
+        elif self.input.is_previous_button_down():
+            self.menu_option_cursor = (self.menu_option_cursor - 1) % len(self.player_team[self.menu_chara_cursor].actions)
+
+        elif self.input.is_cancel_button_down() and self.menu_chara_cursor > 0:
+            self.player_turn_action_queue.pop()
+            self.menu_chara_cursor = max(0, (self.menu_chara_cursor - 1))
+            self.menu_option_cursor = 0
+
+    def is_strategy_cancelled(self, context: GameContext) -> bool:
+        return self.input.is_cancel_button_down() and self.menu_chara_cursor == 0
+
+    def is_strategy_chosen(self, context: GameContext) -> bool:
+        # every member of the team has queued an action
+        return len(self.player_turn_action_queue) == len(self.player_team)
+
+    def enter_action_preface(self, context: GameContext):
+        self.player_turn_action = self.player_turn_action_queue.pop(0)
+        self.dialogue.start(f"{self.player_turn_action.caller.name} will {self.player_turn_action.action.name}.")
+
+    def enter_action_conclusion(self, context: GameContext):
+        self.dialogue.start(f"{self.player_turn_action.caller.name} did {self.player_turn_action.action.name}.")
+
+    def is_action_queue_empty(self, context: GameContext) -> bool:
+        return len(self.player_turn_action_queue) == 0
+
+    # enemy turn
+
+    def enter_enemy_preface(self, context: GameContext):
+        self.dialogue.start(f"Minion will attack! Prepare to dodge it all.")
+
+    def enter_minigame(self, context: GameContext):
+        self.player_hitbox_pos = Vector2(0.5, 0.5)
+        self.previous_player_hitbox_pos = Vector2(self.player_hitbox_pos)
+        self.player_hitbox_color = Color(MINIGAME_HITBOX_COLOR)
+        self.projectiles.clear()
+        self.minigame_updates = 0
+
+    def update_minigame(self, context: GameContext):
+        dt = context.get_delta_time()
+        move_axis = self.input.get_move_axis()
+
+        if move_axis.length_squared() > 0:
+            self.player_hitbox_pos = self.player_hitbox_pos + move_axis.normalize() * PLAYER_MINIGAME_SPEED * dt
+            self.player_hitbox_pos.x = min(max(.08, self.player_hitbox_pos.x), .92)
+            self.player_hitbox_pos.y = min(max(.08, self.player_hitbox_pos.y), .92)
+
+        with context.profile("adventure.projectiles"):
+            self.update_projectiles(dt)
+
+    def exit_minigame(self, context: GameContext):
+        self.projectiles.clear()
+
+    def enter_enemy_conclusion(self, context: GameContext):
+        self.dialogue.start(f"Minion did attack.")
+
+    # dialogue states
+
+    def update_dialogue(self, context: GameContext):
+        # confirming a finished dialogue is a transition, otherwise it shows more of it
+        if self.input.is_confirm_button_down():
+            self.dialogue.advance()
+
+    def exit_dialogue(self, context: GameContext):
+        self.dialogue.clear()
+        self.dialogue_finished = False
+
+    def on_dialogue_finished(self, event: DialogueFinished):
+        if event.dialogue is self.dialogue:
+            self.dialogue_finished = True
+
+    def is_dialogue_confirmed(self, context: GameContext) -> bool:
+        return self.dialogue_finished and self.input.is_confirm_button_down()
+
+    def update_projectiles(self, dt: float):
+        # patterns are keyed on the update count, so replays spawn the same bullets
+        updates = self.minigame_updates
+        self.minigame_updates += 1
+        if updates % RING_INTERVAL == 0:
+            wave = updates // RING_INTERVAL
+            spin = 0.8 if wave % 2 == 0 else -0.8
+            self.projectiles.spawn_ring(0.5, 0.1, RING_BULLETS, RING_SPEED, BULLET_LIFETIME, BULLET_RADIUS, angle=wave * 0.2, spin=spin)
+        if updates % AIMED_INTERVAL == AIMED_INTERVAL // 2:
+            origin_x = 0.1 if updates // AIMED_INTERVAL % 2 == 0 else 0.9
+            self.projectiles.spawn_aimed(origin_x, 0.1, self.player_hitbox_pos.x, self.player_hitbox_pos.y, AIMED_BULLETS, AIMED_SPREAD, AIMED_SPEED, BULLET_LIFETIME, BULLET_RADIUS)
+
+        self.projectiles.update(dt)
+
+        hits = self.projectiles.collide_circle(self.player_hitbox_pos.x, self.player_hitbox_pos.y, MINIGAME_HITBOX_RADIUS)
+        hit_count = int(hits.sum())
+        if hit_count > 0:
+            self.projectiles.remove(hits)
+            target = self.player_team[0]
+            target.current_hp = max(0, target.current_hp - hit_count * BULLET_DAMAGE)
+            # the bar drains towards the new hp while the hitbox flashes
+            self.scheduler.tween(target, "displayed_hp", target.current_hp, HEALTHBAR_DURATION, timing.ease_out)
+            self.player_hitbox_color = Color(MINIGAME_HITBOX_HIT_COLOR)
+            self.scheduler.tween(self, "player_hitbox_color", Color(MINIGAME_HITBOX_COLOR), MINIGAME_HITBOX_HIT_DURATION, timing.ease_in)
+
+    def get_player_feet_rect(self) -> Rect:
+        # only the feet collide, so the player can walk right up to what is above them
+        player_rect = self.girly_archer.rect
+        feet_rect = Rect(0, 0, player_rect.width * PLAYER_FEET_WIDTH, player_rect.height * PLAYER_FEET_HEIGHT)
+        feet_rect.midbottom = self.player_pos
+        return feet_rect
 
     def draw(self, context: GameContext) -> None:
         screen = context.get_screen()
-        current_ticks = context.scene.get_current_ticks()
         screen_rect = context.get_screen_rect()
         screen_ratio = screen_rect.width // 640
-
+        alpha = context.get_interpolation_alpha()
+        player_pos = self.previous_player_pos.lerp(self.player_pos, alpha)
+
+        # the battle hud is static until one of its inputs changes. it is checked once the step
+        # is over, so hp tweens have been applied, and the screen is cleared as a full redraw would be
+        hud_state = (
+            self.state_machine.get_active_path()[:3],
+            self.menu_chara_cursor,
+            self.menu_option_cursor,
+            tuple((chara.current_hp, round(chara.displayed_hp)) for chara in self.player_team),
+        )
+        if hud_state != self.hud_state:
+            self.hud_state = hud_state
+            if not context.is_full_redraw():
+                context.request_full_redraw()
+                screen.fill("black")
+
+        is_exploring = self.state_machine.is_active("exploration")
+        if is_exploring:
+            self.camera.follow(player_pos)
+        camera_offset = self.camera.get_offset()
+
+        # static layers only need drawing when the whole screen is redrawn, and the map when the camera moves
+        if context.is_full_redraw() or (is_exploring and camera_offset != self.drawn_camera_offset):
+            if is_exploring:
+                with context.profile("adventure.tilemap"):
+                    context.mark_dirty(tilemap.draw_tilemap(screen, self.map_chunks, self.camera))
+                self.drawn_camera_offset = camera_offset
+            if self.state_machine.is_active("battle"):
+                self.draw_battle_hud(context)
+            context.save_background()
+
+        self.girly_archer.set_position(self.camera.to_screen(player_pos))
         self.sprite_group.draw(screen)
+        context.mark_dirty(*(sprite.rect.copy() for sprite in self.sprite_group))
+
+        if self.state_machine.is_active("battle"):
+            dialogue_box_top = screen_rect.bottom - DIALOGUE_BOX_HEIGHT * screen_ratio
+            dialogue_position = (screen_rect.left + DIALOGUE_BOX_PADDING_LEFT * screen_ratio, dialogue_box_top + DIALOGUE_BOX_PADDING_TOP * screen_ratio)
+            self.dialogue.draw(screen, dialogue_position)
+            context.mark_dirty(pygame.Rect(dialogue_position, self.dialogue.surface.get_size()))
 
-        if self.main_state.is_current(MAIN_STATE_BATTLE):
-            surface_border_color = "#332033"
-            dialogue_box_height = 115 * screen_ratio
-            dialogue_box_top = screen_rect.bottom - dialogue_box_height
-            dialogue_box_left = screen_rect.left
-            pygame.draw.line(screen, surface_border_color, (screen_rect.left, dialogue_box_top), (screen_rect.right, dialogue_box_top), 2 * screen_ratio)
-            if self.dialogue.started_at:
-                dialogue_ticks = current_ticks - self.dialogue.started_at
-                dialogue_target = min(dialogue_ticks * len(self.dialogue.content) // self.dialogue.duration, len(self.dialogue.content))
-                dialogue_slice = self.dialogue.content if self.dialogue.finished else self.dialogue.content[:dialogue_target]
-                dialogue_text = self.dialogue_font.render(dialogue_slice, False, "white")
-                screen.blit(dialogue_text, (dialogue_box_left + 32 * screen_ratio, dialogue_box_top + 16 * screen_ratio))
-
-            for i, chara in enumerate(self.player_team):
-                is_chara_active = i == self.menu_chara_cursor and self.player_turn_state.is_current(PLAYER_TURN_STATE_STRATEGY)
-                chara_menu_color = chara.primary_color if is_chara_active else surface_border_color
-
-                chara_menu_width = screen_rect.width // 3
-                chara_menu_height = 70 * screen_ratio if is_chara_active else 40 * screen_ratio
-                chara_menu_top = screen_rect.bottom - chara_menu_height - dialogue_box_height
-                chara_menu_bottom = chara_menu_top + chara_menu_height
-                chara_menu_padding_top = 7 * screen_ratio
-                chara_menu_padding_right = 9 * screen_ratio
-                chara_menu_left = i * chara_menu_width
-                chara_menu_right = chara_menu_left + chara_menu_width
-                chara_menu_border = 2 * screen_ratio
-                chara_menu_lines_left = chara_menu_left + chara_menu_border / 3
-                chara_menu_lines_top = chara_menu_top + chara_menu_border / 3
-                chara_menu_lines_right = chara_menu_right - chara_menu_border * 2 / 3
-                pygame.draw.lines(screen, chara_menu_color, False, [(chara_menu_lines_left, chara_menu_bottom), (chara_menu_lines_left, chara_menu_lines_top), (chara_menu_lines_right, chara_menu_lines_top), (chara_menu_lines_right, chara_menu_bottom)], 2 * screen_ratio)
-                chara_hp_text_height = 10 * screen_ratio
-                chara_hp_text = self.font.render(f"{chara.current_hp} / {chara.max_hp}", False, "white")
-                chara_hp_text = pygame.transform.scale(chara_hp_text, (chara_hp_text_height * chara_hp_text.get_width() / chara_hp_text.get_height(), chara_hp_text_height))
-                screen.blit(chara_hp_text, (chara_menu_right - chara_hp_text.get_width() - chara_menu_padding_right, chara_menu_top + chara_menu_padding_top))
-
-                chara_menu_healthbar_width = 76 * screen_ratio
-                chara_menu_healthbar_height = 9 * screen_ratio
-                chara_menu_healthbar_margin_top = 3 * screen_ratio
-                chara_menu_healthbar_margin_left = 4 * screen_ratio
-                chara_menu_healthbar_left = chara_menu_right - chara_menu_healthbar_width - chara_menu_padding_right
-                chara_menu_healthbar_top = chara_menu_top + chara_menu_padding_top + chara_hp_text.get_height() + chara_menu_healthbar_margin_top
-                pygame.draw.rect(screen, chara.primary_color, (chara_menu_healthbar_left, chara_menu_healthbar_top, chara_menu_healthbar_width, chara_menu_healthbar_height))
-                chara_hp_label_text_height = 9 * screen_ratio
-                chara_hp_label_text = self.font.render(f"HP", False, "white")
-                chara_hp_label_text = pygame.transform.scale(chara_hp_label_text, (chara_hp_label_text_height * chara_hp_label_text.get_width() / chara_hp_label_text.get_height(), chara_hp_label_text_height))
-                screen.blit(chara_hp_label_text, (chara_menu_healthbar_left - chara_menu_healthbar_margin_left - chara_hp_label_text.get_width(), chara_menu_healthbar_top))
-
-                chara_name_text_height = 15 * screen_ratio
-                chara_name_text = self.name_font.render(chara.name, False, "white")
-                chara_name_text = pygame.transform.scale(chara_name_text, (chara_name_text_height * chara_name_text.get_width() / chara_name_text.get_height(), chara_name_text_height))
-                screen.blit(chara_name_text, (chara_menu_left + 51 * screen_ratio, chara_menu_top + 13 * screen_ratio))
-
-                screen.blit(self.linkle_portrait, (chara_menu_left + 13 * screen_ratio, chara_menu_top + 10 * screen_ratio))
-
-                if is_chara_active:
-                    for i, action in enumerate(chara.actions):
-                        is_action_active = i == self.menu_option_cursor
-
-                        action_base_color = "orange"
-                        action_active_color = "yellow"
-                        action_box_margin_bottom = 6 * screen_ratio
-                        action_box_height = 26 * screen_ratio
-                        action_box_width = 32 * screen_ratio
-                        action_box_gap = 4 * screen_ratio
-                        action_items_width = len(chara.actions) * action_box_width + (len(chara.actions) - 1) * action_box_gap
-                        action_box_left = chara_menu_left + chara_menu_width / 2 - action_items_width / 2 + (action_box_width + action_box_gap) * i
-                        action_box_top = chara_menu_bottom - action_box_height - action_box_margin_bottom
-                        action_box_bottom = action_box_top + action_box_height
-                        action_color = action_active_color if is_action_active else action_base_color
-                        pygame.draw.rect(screen, action_color, (action_box_left, action_box_top, action_box_width, action_box_height), 2 * screen_ratio, 1 * screen_ratio)
-
-                        if is_action_active:
-                            action_label_text_height = 7 * screen_ratio
-                            action_label_text = self.font.render(action.name, False, action_color)
-                            action_label_text = pygame.transform.scale(action_label_text, (action_label_text_height * action_label_text.get_width() / action_label_text.get_height(), action_label_text_height))
-                            screen.blit(action_label_text, (action_box_left + action_box_width / 2 - action_label_text.get_width() / 2, action_box_bottom))
-            
-            if self.turn_state.is_current(TURN_ENEMY) and self.enemy_turn_state.is_current(ENEMY_TURN_STATE_MINIGAME):
-                minigame_box_width = 150 * screen_ratio
-                minigame_box_height = 150 * screen_ratio
+            if self.state_machine.is_active("minigame"):
+                minigame_box_width = MINIGAME_BOX_SIZE * screen_ratio
+                minigame_box_height = MINIGAME_BOX_SIZE * screen_ratio
                 minigame_box_left = screen_rect.centerx - minigame_box_width // 2
                 minigame_box_top = screen_rect.top + 96 * screen_ratio
-                pygame.draw.rect(screen, "black", (minigame_box_left, minigame_box_top, minigame_box_width, minigame_box_height))
-                pygame.draw.rect(screen, "white", (minigame_box_left, minigame_box_top, minigame_box_width, minigame_box_height), 4 * screen_ratio)
+                minigame_box_rect = pygame.Rect(minigame_box_left, minigame_box_top, minigame_box_width, minigame_box_height)
+                pygame.draw.rect(screen, "black", minigame_box_rect)
+                self.projectiles.draw(screen, minigame_box_rect, self.bullet_image, alpha)
+                pygame.draw.rect(screen, "white", minigame_box_rect, 4 * screen_ratio)
+
+                player_hitbox_pos = self.previous_player_hitbox_pos.lerp(self.player_hitbox_pos, alpha)
+                pygame.draw.circle(screen, self.player_hitbox_color, (minigame_box_left + player_hitbox_pos.x * minigame_box_width, minigame_box_top + player_hitbox_pos.y * minigame_box_height), MINIGAME_HITBOX_RADIUS * minigame_box_width)
+                context.mark_dirty(minigame_box_rect)
 
-                pygame.draw.circle(screen, "red", (minigame_box_left + self.player_hitbox_pos.x * minigame_box_width, minigame_box_top + self.player_hitbox_pos.y * minigame_box_height), 8 * screen_ratio)
+    def draw_battle_hud(self, context: GameContext) -> None:
+        screen = context.get_screen()
+        screen_rect = context.get_screen_rect()
+        screen_ratio = screen_rect.width // 640
+
+        dialogue_box_top = screen_rect.bottom - DIALOGUE_BOX_HEIGHT * screen_ratio
+        border = self.hud_border_layer.update(None, self.render_hud_border, screen_ratio)
+        screen.blit(border, (screen_rect.left, dialogue_box_top - border.get_height() // 2))
+
+        panel_width = screen_rect.width // 3
+        panel_top = dialogue_box_top - CHARA_MENU_ACTIVE_HEIGHT * screen_ratio
+        for i, chara in enumerate(self.player_team):
+            is_chara_active = i == self.menu_chara_cursor and self.state_machine.is_active("strategy")
+            panel_key = (is_chara_active, self.menu_option_cursor if is_chara_active else None, chara.name, chara.current_hp, round(chara.displayed_hp), chara.max_hp)
+            panel = self.hud_panel_layers[i].update(panel_key, self.render_chara_panel, chara, is_chara_active, screen_ratio)
+            screen.blit(panel, (i * panel_width, panel_top))
+
+    def render_hud_border(self, surface: pygame.Surface, screen_ratio: int) -> None:
+        center = surface.get_height() // 2
+        pygame.draw.line(surface, HUD_BORDER_COLOR, (0, center), (surface.get_width(), center), 2 * screen_ratio)
+
+    def render_chara_panel(self, surface: pygame.Surface, chara: Character, is_chara_active: bool, screen_ratio: int) -> None:
+        chara_menu_color = chara.primary_color if is_chara_active else HUD_BORDER_COLOR
+
+        chara_menu_width = surface.get_width()
+        chara_menu_height = CHARA_MENU_ACTIVE_HEIGHT * screen_ratio if is_chara_active else CHARA_MENU_HEIGHT * screen_ratio
+        chara_menu_bottom = CHARA_MENU_ACTIVE_HEIGHT * screen_ratio
+        chara_menu_top = chara_menu_bottom - chara_menu_height
+        chara_menu_padding_top = 7 * screen_ratio
+        chara_menu_padding_right = 9 * screen_ratio
+        chara_menu_left = 0
+        chara_menu_right = chara_menu_left + chara_menu_width
+        chara_menu_border = 2 * screen_ratio
+        chara_menu_lines_left = chara_menu_left + chara_menu_border / 3
+        chara_menu_lines_top = chara_menu_top + chara_menu_border / 3
+        chara_menu_lines_right = chara_menu_right - chara_menu_border * 2 / 3
+        pygame.draw.lines(surface, chara_menu_color, False, [(chara_menu_lines_left, chara_menu_bottom), (chara_menu_lines_left, chara_menu_lines_top), (chara_menu_lines_right, chara_menu_lines_top), (chara_menu_lines_right, chara_menu_bottom)], 2 * screen_ratio)
+        chara_hp_text = self.hp_text.render(f"{chara.current_hp} / {chara.max_hp}")
+        surface.blit(chara_hp_text, (chara_menu_right - chara_hp_text.get_width() - chara_menu_padding_right, chara_menu_top + chara_menu_padding_top))
+
+        chara_menu_healthbar_width = 76 * screen_ratio
+        chara_menu_healthbar_height = 9 * screen_ratio
+        chara_menu_healthbar_margin_top = 3 * screen_ratio
+        chara_menu_healthbar_margin_left = 4 * screen_ratio
+        chara_menu_healthbar_left = chara_menu_right - chara_menu_healthbar_width - chara_menu_padding_right
+        chara_menu_healthbar_top = chara_menu_top + chara_menu_padding_top + chara_hp_text.get_height() + chara_menu_healthbar_margin_top
+        chara_menu_healthbar_filled_width = round(chara_menu_healthbar_width * min(max(chara.displayed_hp / chara.max_hp, 0), 1))
+        pygame.draw.rect(surface, HEALTHBAR_EMPTY_COLOR, (chara_menu_healthbar_left, chara_menu_healthbar_top, chara_menu_healthbar_width, chara_menu_healthbar_height))
+        pygame.draw.rect(surface, chara.primary_color, (chara_menu_healthbar_left, chara_menu_healthbar_top, chara_menu_healthbar_filled_width, chara_menu_healthbar_height))
+        chara_hp_label_text = self.hp_label_text.render("HP")
+        surface.blit(chara_hp_label_text, (chara_menu_healthbar_left - chara_menu_healthbar_margin_left - chara_hp_label_text.get_width(), chara_menu_healthbar_top))
+
+        chara_name_text = self.name_text.render(chara.name)
+        surface.blit(chara_name_text, (chara_menu_left + 51 * screen_ratio, chara_menu_top + 13 * screen_ratio))
+
+        surface.blit(self.linkle_portrait, (chara_menu_left + 13 * screen_ratio, chara_menu_top + 10 * screen_ratio))
+
+        if is_chara_active:
+            for i, action in enumerate(chara.actions):
+                is_action_active = i == self.menu_option_cursor
+
+                action_box_margin_bottom = 6 * screen_ratio
+                action_box_height = 26 * screen_ratio
+                action_box_width = 32 * screen_ratio
+                action_box_gap = 4 * screen_ratio
+                action_items_width = len(chara.actions) * action_box_width + (len(chara.actions) - 1) * action_box_gap
+                action_box_left = chara_menu_left + chara_menu_width / 2 - action_items_width / 2 + (action_box_width + action_box_gap) * i
+                action_box_top = chara_menu_bottom - action_box_height - action_box_margin_bottom
+                action_box_bottom = action_box_top + action_box_height
+                action_color = ACTION_ACTIVE_COLOR if is_action_active else ACTION_BASE_COLOR
+                pygame.draw.rect(surface, action_color, (action_box_left, action_box_top, action_box_width, action_box_height), 2 * screen_ratio, 1 * screen_ratio)
+
+                if is_action_active:
+                    action_label_text = self.action_label_text.render(action.name)
+                    surface.blit(action_label_text, (action_box_left + action_box_width / 2 - action_label_text.get_width() / 2, action_box_bottom))
 
     def exit(self, context: GameContext):
+        # leaving runs the exit handlers of the active states, which clear the dialogue and projectiles
+        self.state_machine.stop()
+        self.animations.clear()
+        self.drawn_camera_offset = None
+
         # stop music
-        pygame.mixer.music.stop()
+        context.stop_music()
+
+    def unload(self, context: GameContext):
+        self.map_chunks.clear()
 
 
 class BattleAction:
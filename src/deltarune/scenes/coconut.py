@@ -1,12 +1,21 @@
 import random
 from engine import *
+from engine import assets, collision
 from .. import resources
 
+COCONUT_IMAGE = assets.ImageAsset(resources.images.COCONUT, alpha=False)
+
 
 class Coconut(Scene):
+    keep_resident = True
+
+    @classmethod
+    def get_dependencies(cls, context: GameContext):
+        return [COCONUT_IMAGE]
+
     def load(self, context: GameContext):
         # load image used for the coconut
-        self.coconut_image = pygame.image.load(resources.images.COCONUT).convert()
+        self.coconut_image = context.get_assets().get(COCONUT_IMAGE)
 
     def start(self, context: GameContext) -> None:
         # get from context
@@ -21,26 +30,35 @@ class Coconut(Scene):
         # calc random coconut inital position
         self.limits = Vector2(screen.get_width() - self.coconut_image.get_width(), screen.get_height() - self.coconut_image.get_height())
         self.coconut_pos = Vector2(random.randint(0, int(self.limits.x)), random.randint(0, int(self.limits.y)))
+        self.previous_coconut_pos = Vector2(self.coconut_pos)
+
+        # walls around the screen for the coconut to bounce off
+        self.walls = collision.SpatialHash()
+        for i, wall in enumerate(collision.create_bounds(screen.get_rect())):
+            self.walls.insert(i, wall)
 
     def update(self, context: GameContext) -> None:
         # get grom context
         dt = context.get_delta_time()
 
-        # flip coconut direction if touchings bounds
-        if self.coconut_pos.x < 0 or self.coconut_pos.x > self.limits.x:
-            self.coconut_dir.x = -self.coconut_dir.x
-        if self.coconut_pos.y < 0 or self.coconut_pos.y > self.limits.y:
-            self.coconut_dir.y = -self.coconut_dir.y
-        
-        # update coconut position
-        self.coconut_pos = self.coconut_pos + self.coconut_dir * dt * self.coconut_speed
+        # move coconut up to the wall in its way, and flip its direction off of it
+        velocity = self.coconut_dir * dt * self.coconut_speed
+        hit = self.walls.sweep(self.coconut_image.get_rect(topleft=self.coconut_pos), velocity)
+        self.previous_coconut_pos = self.coconut_pos
+        if hit is None:
+            self.coconut_pos = self.coconut_pos + velocity
+        else:
+            self.coconut_pos = self.coconut_pos + velocity * hit.time
+            self.coconut_dir = self.coconut_dir.reflect(hit.normal)
 
     def draw(self, context: GameContext) -> None:
         # get grom context
         screen = context.get_screen()
+        alpha = context.get_interpolation_alpha()
 
-        # draw coconut
-        screen.blit(self.coconut_image, self.coconut_pos)
+        # draw coconut between its last two simulated positions
+        coconut_pos = self.previous_coconut_pos.lerp(self.coconut_pos, alpha)
+        context.mark_dirty(screen.blit(self.coconut_image, coconut_pos))
 
     def exit(self, context: GameContext):
         # no logic for exiting
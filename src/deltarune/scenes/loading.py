@@ -0,0 +1,40 @@
+import pygame
+from engine import *
+
+BAR_WIDTH = 400
+BAR_HEIGHT = 16
+BAR_COLOR = "white"
+
+
+class Loading(Scene):
+    def load(self, context: GameContext):
+        # uses only the default font, so there is nothing to wait for
+        self.font_main = pygame.font.Font(None, 32)
+        self.text_loading = self.font_main.render("Loading...", True, "white")
+
+    def start(self, context: GameContext) -> None:
+        # init state
+        self.progress = 0.0
+
+    def update(self, context: GameContext) -> None:
+        self.progress = context.get_loading_progress()
+
+    def draw(self, context: GameContext) -> None:
+        # get from context
+        screen = context.get_screen()
+        screen_rect = context.get_screen_rect()
+
+        # draw loading text and an outlined progress bar
+        bar_rect = Rect(0, 0, BAR_WIDTH, BAR_HEIGHT)
+        bar_rect.center = screen_rect.center
+        if context.is_full_redraw():
+            screen.blit(self.text_loading, (screen_rect.centerx - self.text_loading.get_width() // 2, bar_rect.top - self.text_loading.get_height() - 10))
+            pygame.draw.rect(screen, BAR_COLOR, bar_rect.inflate(6, 6), 1)
+            context.save_background()
+
+        fill_rect = Rect(bar_rect.topleft, (int(BAR_WIDTH * self.progress), BAR_HEIGHT))
+        context.mark_dirty(pygame.draw.rect(screen, BAR_COLOR, fill_rect))
+
+    def exit(self, context: GameContext):
+        # no logic for exiting
+        pass
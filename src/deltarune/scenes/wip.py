@@ -1,25 +1,43 @@
 import random
+import pygame
 from engine import *
+from engine import assets, text
 from .. import resources
 
+MAIN_FONT = assets.SysFontAsset("Arial", 24)
+WIP_IMAGE = assets.ImageAsset(resources.images.WIP)
+KOJIMA_SOUND = assets.SoundAsset(resources.sounds.KOJIMA)
+
 
 class Wip(Scene):
+    keep_resident = True
+
+    @classmethod
+    def get_dependencies(cls, context: GameContext):
+        return [MAIN_FONT, WIP_IMAGE, KOJIMA_SOUND]
+
+    def get_next_scenes(self, context: GameContext):
+        # any scene can be picked with the number keys
+        return [i for i in range(context.scene.get_count()) if not context.scene.is_current(i)]
+
     def load(self, context: GameContext):
         # get from context
         screen_rect = context.get_screen_rect()
+        asset_manager = context.get_assets()
 
         # load font from system
-        self.font_main = pygame.font.SysFont("Arial", 24)
+        self.font_main = asset_manager.get(MAIN_FONT)
+        self.text_main = text.TextRenderer(self.font_main, "white")
 
         # load image to use
-        self.image_wip = pygame.image.load(resources.images.WIP).convert_alpha()
+        self.image_wip = asset_manager.get(WIP_IMAGE)
         self.image_wip = pygame.transform.scale(self.image_wip, (screen_rect.width, screen_rect.width * self.image_wip.get_height() / self.image_wip.get_width()))
         
         # pre-render texts
         self.text_press_spacebar_anytime = self.font_main.render("Press Spacebar Anytime", True, "white")
 
         # load sounds
-        self.sound_kojima = pygame.mixer.Sound(resources.sounds.KOJIMA)
+        self.sound_kojima = asset_manager.get(KOJIMA_SOUND)
 
     def start(self, context: GameContext) -> None:
         # init state
@@ -27,13 +45,12 @@ class Wip(Scene):
         self.time_elapsed = 0
 
         # play secret music
-        pygame.mixer.music.load(resources.music.SECRET)
-        pygame.mixer.music.play(-1)
+        context.play_music(resources.music.SECRET)
 
     def update(self, context: GameContext) -> None:
         # get from context
         keys_down = context.get_keys_down()
-        current_time = context.scene.get_current_ticks()
+        current_time = context.scene.get_current_time()
         unescaled_current_ticks = context.get_unscaled_current_ticks()
         pause_started_at = context.get_pause_started_at()
         keys_pressed = context.get_keys_pressed()
@@ -61,19 +78,21 @@ class Wip(Scene):
         screen = context.get_screen()
         screen_rect = context.get_screen_rect()
 
-        # draw wip image
-        screen.blit(self.image_wip, (0, screen_rect.centery - self.image_wip.get_height() // 2))
-        screen.blit(self.text_press_spacebar_anytime, (screen_rect.centerx - self.text_press_spacebar_anytime.get_width() // 2, screen_rect.bottom - self.text_press_spacebar_anytime.get_height() - 20))
+        # draw static wip image and texts
+        if context.is_full_redraw():
+            screen.blit(self.image_wip, (0, screen_rect.centery - self.image_wip.get_height() // 2))
+            screen.blit(self.text_press_spacebar_anytime, (screen_rect.centerx - self.text_press_spacebar_anytime.get_width() // 2, screen_rect.bottom - self.text_press_spacebar_anytime.get_height() - 20))
+            context.save_background()
         
         # draw elapsed time counter
-        seconds_text = self.font_main.render("You've been in here for {} seconds".format(int(self.time_elapsed)), False, "white")
-        screen.blit(seconds_text, (screen_rect.centerx - seconds_text.get_width() // 2, screen_rect.bottom - seconds_text.get_height() - 50))
+        seconds_text = self.text_main.render("You've been in here for {} seconds".format(int(self.time_elapsed)))
+        context.mark_dirty(screen.blit(seconds_text, (screen_rect.centerx - seconds_text.get_width() // 2, screen_rect.bottom - seconds_text.get_height() - 50)))
         
         # draw paused elapsed time counter
         if context.is_paused():
-            paused_seconds_text = self.font_main.render("You've been paused for {} seconds".format(int(self.paused_time_elapsed)), False, "white")
-            screen.blit(paused_seconds_text, (screen_rect.centerx - seconds_text.get_width() // 2, screen_rect.bottom - seconds_text.get_height() - 80))
+            paused_seconds_text = self.text_main.render("You've been paused for {} seconds".format(int(self.paused_time_elapsed)))
+            context.mark_dirty(screen.blit(paused_seconds_text, (screen_rect.centerx - seconds_text.get_width() // 2, screen_rect.bottom - seconds_text.get_height() - 80)))
 
     def exit(self, context: GameContext):
         # stop music
-        pygame.mixer.music.stop()
+        context.stop_music()
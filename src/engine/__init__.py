@@ -1,6 +1,49 @@
-from .game import Game, GameSetup, GameContext
-from .scenes import Scene
-from .pygame import Vector2, Rect, Color, Font
-from .transformation import TransformationData
-from .controllers import ControllerBase, StateMachineController
-from . import anchors, sprites
\ No newline at end of file
+import importlib
+
+from .startup import STARTUP
+
+# names are imported on first use, so importing engine alone stays cheap. star imports
+# resolve every name in __all__, so it stays small and other modules are imported by name
+_LAZY_ATTRIBUTES = {
+    "Game": ".game",
+    "GameSetup": ".game",
+    "GameContext": ".game",
+    "Scene": ".scenes",
+    "lazy_scene": ".scenes",
+    "Vector2": ".pygame",
+    "Rect": ".pygame",
+    "Color": ".pygame",
+    "Font": ".pygame",
+    "TransformationData": ".transformation",
+    "CachedLayer": ".layers",
+    "ControllerBase": ".controllers",
+    "StateMachineController": ".controllers",
+    "HierarchicalStateMachine": ".controllers",
+    "Event": ".events",
+    "EventBus": ".events",
+}
+_LAZY_MODULES = ["anchors", "assets", "atlas", "collision", "controllers", "events", "game", "inputs", "layers", "profiling", "pygame", "resources", "scenes", "sprites", "text", "tilemap", "timing", "transformation"]
+
+__all__ = [
+    "Game", "GameSetup", "GameContext",
+    "Scene",
+    "Vector2", "Rect", "Color", "Font",
+    "TransformationData",
+    "ControllerBase", "StateMachineController",
+    "anchors", "sprites",
+]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    elif name in _LAZY_MODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
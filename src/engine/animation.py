@@ -0,0 +1,129 @@
+import numpy as np
+from pygame import Surface
+
+from .sprites import ONCE, AnimatedSprite, AnimationClip
+
+# groups this large get their steps from numpy, smaller ones are cheaper in a plain loop
+VECTORIZE_THRESHOLD = 48
+
+
+class AnimationGroup:
+    def __init__(self, frames: list[Surface], clip: AnimationClip):
+        # sprites sharing frames and a clip, so one pass finds the step of every one of them
+        self.frames = frames
+        self.clip = clip
+        self.sprites = list[AnimatedSprite]()
+        self.started_at = list[float]()
+        self.indices = dict[AnimatedSprite, int]()
+
+        # numpy copies of the above, rebuilt after sprites join or leave
+        self.ends = np.array(clip.ends, dtype=np.float64)
+        self.sequence = np.array(clip.sequence, dtype=np.int64)
+        self.started_at_array = None
+        self.steps = None
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def add(self, sprite: AnimatedSprite, started_at: float):
+        self.indices[sprite] = len(self.sprites)
+        self.sprites.append(sprite)
+        self.started_at.append(started_at)
+        self.started_at_array = None
+
+    def remove(self, sprite: AnimatedSprite):
+        # the last sprite takes the place of the removed one
+        i = self.indices.pop(sprite)
+        last_sprite, last_started_at = self.sprites.pop(), self.started_at.pop()
+        if last_sprite is not sprite:
+            self.sprites[i] = last_sprite
+            self.started_at[i] = last_started_at
+            self.indices[last_sprite] = i
+        self.started_at_array = None
+
+    def update(self, ticks: float):
+        if len(self.sprites) >= VECTORIZE_THRESHOLD:
+            self.update_vectorized(ticks)
+            return
+        clip = self.clip
+        for sprite, started_at in zip(self.sprites, self.started_at):
+            sprite.elapsed = ticks - started_at
+            frame = clip.get_frame(sprite.elapsed)
+            if frame != sprite.current_frame:
+                sprite.show_frame(frame)
+
+    def update_vectorized(self, ticks: float):
+        if self.started_at_array is None:
+            self.started_at_array = np.array(self.started_at, dtype=np.float64)
+            self.steps = np.full(len(self.sprites), -1, dtype=np.int64)
+
+        clip = self.clip
+        elapsed = np.maximum(ticks - self.started_at_array, 0)
+        if clip.mode != ONCE:
+            elapsed %= clip.length
+        if clip.uniform_duration is not None:
+            steps = (elapsed // clip.uniform_duration).astype(np.int64)
+        else:
+            steps = np.searchsorted(self.ends, elapsed, side="right")
+        np.minimum(steps, len(clip.sequence) - 1, out=steps)
+
+        # only the sprites that moved on to another step are touched from python
+        changed = np.flatnonzero(steps != self.steps)
+        self.steps = steps
+        if changed.size == 0:
+            return
+        sprites = self.sprites
+        for i, frame in zip(changed.tolist(), self.sequence[steps[changed]].tolist()):
+            sprite = sprites[i]
+            sprite.elapsed = ticks - self.started_at[i]
+            sprite.show_frame(frame)
+
+
+class AnimationSystem:
+    def __init__(self):
+        # sprites are grouped by their frames and clip, the two things that decide a frame
+        self.groups = dict[tuple[int, AnimationClip], AnimationGroup]()
+        self.playing = dict[AnimatedSprite, AnimationGroup]()
+        self.ticks = 0.0
+
+    def __len__(self):
+        return len(self.playing)
+
+    def play(self, sprite: AnimatedSprite, clip: AnimationClip | None = None, started_at: float | None = None):
+        # sprites in a group share its clock, and differ only by when they started
+        self.stop(sprite)
+        clip = clip or sprite.clip
+        key = (id(sprite.frames), clip)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = AnimationGroup(sprite.frames, clip)
+        started_at = self.ticks if started_at is None else started_at
+        group.add(sprite, started_at)
+        self.playing[sprite] = group
+        sprite.clip = clip
+        sprite.animator = self
+        sprite.elapsed = self.ticks - started_at
+        sprite.set_frame(clip.get_frame(sprite.elapsed))
+
+    def stop(self, sprite: AnimatedSprite):
+        group = self.playing.pop(sprite, None)
+        if group is None:
+            return
+        group.remove(sprite)
+        if not group.sprites:
+            del self.groups[(id(group.frames), group.clip)]
+        sprite.animator = None
+
+    def is_playing(self, sprite: AnimatedSprite) -> bool:
+        return sprite in self.playing
+
+    def update(self, ticks: float):
+        self.ticks = ticks
+        for group in self.groups.values():
+            group.update(ticks)
+
+    def clear(self):
+        for sprite in self.playing:
+            sprite.animator = None
+        self.groups.clear()
+        self.playing.clear()
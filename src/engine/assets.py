@@ -0,0 +1,284 @@
+import os
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Iterable
+
+from . import pygame
+from .sprites import SpriteSheet, load_spritesheet_data, create_spritesheet, load_image_data
+from .tilemap import TileMap, load_tilemap_data, create_tilemap
+from .resources.pack import load_image_resource, get_resource_source
+from .atlas import BakedAtlas, get_baked_atlas, get_screen_size, get_image_size
+
+DEFAULT_WORKERS = 4
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+def get_surface_size(surface: pygame.Surface) -> int:
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class Asset(ABC):
+    # assets are identified by what they load and how, so equal requests share one load
+    def __init__(self, *key):
+        self.key = (type(self).__name__, *key)
+
+    def __eq__(self, other):
+        return isinstance(other, Asset) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"{type(self).__name__}{self.key[1:]}"
+
+    @abstractmethod
+    def read(self) -> Any:
+        # runs on a worker thread: file io and decoding only
+        pass
+
+    def finish(self, raw: Any) -> Any:
+        # runs on the main thread: anything that needs the display
+        return raw
+
+    def get_size(self, value: Any) -> int:
+        # approximate bytes kept in memory by the loaded value
+        return 0
+
+
+class ImageAsset(Asset):
+    def __init__(self, path: str, alpha: bool = True):
+        super(ImageAsset, self).__init__(path, alpha)
+        self.path = path
+        self.alpha = alpha
+
+    def read(self) -> pygame.Surface:
+        return load_image_resource(self.path)
+
+    def finish(self, raw: pygame.Surface) -> pygame.Surface:
+        return raw.convert_alpha() if self.alpha else raw.convert()
+
+    def get_size(self, value: pygame.Surface) -> int:
+        return get_surface_size(value)
+
+
+class FontAsset(Asset):
+    def __init__(self, path: str, size: int):
+        super(FontAsset, self).__init__(path, size)
+        self.path = path
+        self.size = size
+
+    def read(self) -> pygame.font.Font:
+        return pygame.font.Font(get_resource_source(self.path), self.size)
+
+    def get_size(self, value: pygame.font.Font) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+
+class SysFontAsset(Asset):
+    def __init__(self, name: str, size: int):
+        super(SysFontAsset, self).__init__(name, size)
+        self.name = name
+        self.size = size
+
+    def read(self) -> pygame.font.Font:
+        return pygame.font.SysFont(self.name, self.size)
+
+
+class SoundAsset(Asset):
+    def __init__(self, path: str):
+        super(SoundAsset, self).__init__(path)
+        self.path = path
+
+    def read(self) -> pygame.mixer.Sound:
+        return pygame.mixer.Sound(get_resource_source(self.path))
+
+    def get_size(self, value: pygame.mixer.Sound) -> int:
+        frequency, size, channels = pygame.mixer.get_init() or (0, 0, 0)
+        return int(value.get_length() * frequency * channels * abs(size) // 8)
+
+
+class ManifestImageAsset(Asset):
+    # an image manifest gives the size on the reference screen, scaled to the current one
+    def __init__(self, path: str):
+        super(ManifestImageAsset, self).__init__(path)
+        self.path = path
+
+    def read(self):
+        data = load_image_data(self.path)
+        atlas = get_baked_atlas()
+        if atlas is not None and atlas.has(self.path, self.path, data.image_filename):
+            return data, atlas
+        return data, load_image_resource(data.image_filename)
+
+    def finish(self, raw) -> pygame.Surface:
+        data, source = raw
+        if isinstance(source, BakedAtlas):
+            return source.get_frames(self.path)[0]
+        return pygame.transform.scale(source.convert_alpha(), get_image_size(data.width, data.height, get_screen_size()))
+
+    def get_size(self, value: pygame.Surface) -> int:
+        return get_surface_size(value)
+
+
+class SpriteSheetAsset(Asset):
+    def __init__(self, path: str):
+        super(SpriteSheetAsset, self).__init__(path)
+        self.path = path
+
+    def read(self):
+        # baked sheets skip decoding and scaling, loose ones are read as they are
+        data = load_spritesheet_data(self.path)
+        atlas = get_baked_atlas()
+        if atlas is not None and atlas.has(self.path, self.path, data.image_filename):
+            return data, atlas
+        return data, load_image_resource(data.image_filename)
+
+    def finish(self, raw) -> SpriteSheet:
+        data, source = raw
+        if isinstance(source, BakedAtlas):
+            frames = source.get_frames(self.path)
+            return SpriteSheet(frames[0].get_parent(), data, frames)
+        return create_spritesheet(source, data)
+
+    def get_size(self, value: SpriteSheet) -> int:
+        return sum(get_surface_size(frame) for frame in value.frames)
+
+
+class TileMapAsset(Asset):
+    def __init__(self, path: str):
+        super(TileMapAsset, self).__init__(path)
+        self.path = path
+
+    def read(self):
+        data = load_tilemap_data(self.path)
+        return data, load_image_resource(data.tileset_filename)
+
+    def finish(self, raw) -> TileMap:
+        data, image = raw
+        return create_tilemap(image, data)
+
+    def get_size(self, value: TileMap) -> int:
+        # chunks are rendered and cached by whoever draws the map, only the tileset is counted here
+        return get_surface_size(value.tileset)
+
+
+class AssetManager:
+    def __init__(self, workers: int = DEFAULT_WORKERS, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.pending = dict[Asset, Future]()
+
+        # loaded assets in least recently used order, with their users and sizes
+        self.loaded = OrderedDict[Asset, Any]()
+        self.ref_counts = dict[Asset, int]()
+        self.sizes = dict[Asset, int]()
+        self.memory_budget = memory_budget
+        self.bytes_resident = 0
+
+        # instrumentation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def preload(self, assets: Iterable[Asset]):
+        for asset in assets:
+            if asset in self.loaded:
+                self.loaded.move_to_end(asset)
+                self.hits += 1
+            elif asset not in self.pending:
+                self.pending[asset] = self.executor.submit(asset.read)
+                self.misses += 1
+
+    def acquire(self, assets: Iterable[Asset]):
+        # referenced assets are never evicted, unreferenced ones stay cached until the budget needs room
+        assets = list(assets)
+        for asset in assets:
+            self.ref_counts[asset] = self.ref_counts.get(asset, 0) + 1
+        self.preload(assets)
+
+    def release(self, assets: Iterable[Asset]):
+        for asset in assets:
+            ref_count = self.ref_counts.get(asset, 0) - 1
+            if ref_count > 0:
+                self.ref_counts[asset] = ref_count
+            else:
+                self.ref_counts.pop(asset, None)
+        self.evict()
+
+    def evict(self):
+        if self.bytes_resident <= self.memory_budget:
+            return
+        for asset in list(self.loaded):
+            if asset in self.ref_counts:
+                continue
+            del self.loaded[asset]
+            self.bytes_resident -= self.sizes.pop(asset)
+            self.evictions += 1
+            if self.bytes_resident <= self.memory_budget:
+                break
+
+    def process(self, budget_ms: float | None = None) -> int:
+        # hand decoded assets over to the main thread, within the given time budget
+        started_at = perf_counter()
+        finished = 0
+        for asset, future in list(self.pending.items()):
+            if budget_ms is not None and (perf_counter() - started_at) * 1000 >= budget_ms:
+                break
+            if future.done():
+                self.finish(asset)
+                finished += 1
+        return finished
+
+    def finish(self, asset: Asset):
+        # waits for the worker when the asset is still being read, and raises its errors here.
+        # a failed read is no longer pending, so it raises once and a later get reads it again
+        raw = self.pending.pop(asset).result()
+        value = self.loaded[asset] = asset.finish(raw)
+        self.sizes[asset] = asset.get_size(value)
+        self.bytes_resident += self.sizes[asset]
+        self.evict()
+        return value
+
+    def get(self, asset: Asset) -> Any:
+        if asset in self.loaded:
+            self.loaded.move_to_end(asset)
+            return self.loaded[asset]
+        if asset not in self.pending:
+            self.preload([asset])
+        return self.finish(asset)
+
+    def wait(self, assets: Iterable[Asset]):
+        for asset in assets:
+            self.get(asset)
+
+    def is_loaded(self, assets: Iterable[Asset]) -> bool:
+        return all(asset in self.loaded for asset in assets)
+
+    def get_progress(self, assets: Iterable[Asset]) -> float:
+        assets = list(assets)
+        if not assets:
+            return 1.0
+        ready = sum(1 for asset in assets if asset in self.loaded or (asset in self.pending and self.pending[asset].done()))
+        return ready / len(assets)
+
+    def get_hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    def get_stats(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.get_hit_rate(),
+            "entries": len(self.loaded),
+            "bytes_resident": self.bytes_resident,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.pending.clear()
+        self.loaded.clear()
+        self.sizes.clear()
+        self.bytes_resident = 0
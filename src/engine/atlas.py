@@ -0,0 +1,195 @@
+import os
+import struct
+import threading
+
+from . import pygame
+from .pygame import Rect, Surface
+from .resources.pack import has_resource, read_resource, load_raw_image_resource, get_resource_mtime
+
+# baked atlases are pages of packed frames plus a binary index of where every frame is.
+# index layout: a header, every page with its size, then every entry with its frame rects.
+# pages are stored as raw rgba pixels, so loading them is a plain read with no decoding
+BAKED_DIRECTORY = "assets/baked"
+INDEX_MAGIC = b"DRAT"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sHHH")
+INDEX_STRING = struct.Struct("<H")
+INDEX_PAGE = struct.Struct("<HH")
+PAGE_FORMAT = "RGBA"
+INDEX_ENTRY = struct.Struct("<BH")
+INDEX_FRAME = struct.Struct("<HHHHH")
+
+ENTRY_SPRITESHEET = 0
+ENTRY_IMAGE = 1
+
+DEFAULT_PAGE_SIZE = 2048
+PAGE_PADDING = 1
+
+# images declare their size on the 640x480 screen the layouts are designed for
+REFERENCE_SIZE = (640, 480)
+
+
+def get_atlas_name(screen_size: tuple[int, int]):
+    return f"atlas-{screen_size[0]}x{screen_size[1]}"
+
+
+def get_image_size(width: int, height: int, screen_size: tuple[int, int]):
+    return width * screen_size[0] // REFERENCE_SIZE[0], height * screen_size[1] // REFERENCE_SIZE[1]
+
+
+class AtlasEntry:
+    def __init__(self, kind: int, name: str, frames: list[tuple[int, Rect]]):
+        self.kind = kind
+        self.name = name
+        self.frames = frames
+
+
+class AtlasPacker:
+    def __init__(self, page_size: int = DEFAULT_PAGE_SIZE):
+        self.page_size = page_size
+        self.items = list[tuple[int, str, list[Surface]]]()
+
+    def add(self, kind: int, name: str, frames: list[Surface]):
+        self.items.append((kind, name, frames))
+
+    def pack(self) -> tuple[list[Surface], list[AtlasEntry]]:
+        # shelf packing: tallest frames first, filling rows left to right
+        placements = dict[tuple[int, int], tuple[int, Rect]]()
+        frames = [(i, j, frame) for i, (_, _, item_frames) in enumerate(self.items) for j, frame in enumerate(item_frames)]
+        frames.sort(key=lambda frame: frame[2].get_height(), reverse=True)
+
+        page_rects = list[list[tuple[Rect, Surface]]]([[]])
+        x = y = shelf_height = 0
+        for i, j, frame in frames:
+            width, height = frame.get_size()
+            if width > self.page_size or height > self.page_size:
+                raise ValueError(f"frame of {self.items[i][1]} is larger than a {self.page_size}px page")
+            if x + width > self.page_size:
+                x, y, shelf_height = 0, y + shelf_height + PAGE_PADDING, 0
+            if y + height > self.page_size:
+                page_rects.append([])
+                x = y = shelf_height = 0
+            rect = Rect(x, y, width, height)
+            page_rects[-1].append((rect, frame))
+            placements[(i, j)] = (len(page_rects) - 1, rect)
+            x += width + PAGE_PADDING
+            shelf_height = max(shelf_height, height)
+
+        # pages are cropped to what they actually use
+        pages = list[Surface]()
+        for rects in page_rects:
+            used = rects[0][0].unionall([rect for rect, _ in rects]) if rects else Rect(0, 0, 1, 1)
+            page = Surface((used.right, used.bottom), pygame.SRCALPHA)
+            page.fill((0, 0, 0, 0))
+            for rect, frame in rects:
+                page.blit(frame, rect)
+            pages.append(page)
+
+        entries = [AtlasEntry(kind, name, [placements[(i, j)] for j in range(len(item_frames))]) for i, (kind, name, item_frames) in enumerate(self.items)]
+        return pages, entries
+
+
+def write_atlas(directory: str, name: str, pages: list[Surface], entries: list[AtlasEntry]) -> str:
+    os.makedirs(directory, exist_ok=True)
+    page_filenames = [f"{name}-{i}.rgba" for i in range(len(pages))]
+    for page, page_filename in zip(pages, page_filenames):
+        with open(os.path.join(directory, page_filename), "wb") as file:
+            file.write(pygame.image.tobytes(page, PAGE_FORMAT))
+
+    index_filename = os.path.join(directory, f"{name}.idx")
+    with open(index_filename, "wb") as file:
+        file.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(pages), len(entries)))
+        for page, page_filename in zip(pages, page_filenames):
+            encoded = page_filename.encode("utf-8")
+            file.write(INDEX_STRING.pack(len(encoded)) + encoded)
+            file.write(INDEX_PAGE.pack(*page.get_size()))
+        for entry in entries:
+            encoded = entry.name.encode("utf-8")
+            file.write(INDEX_ENTRY.pack(entry.kind, len(encoded)) + encoded)
+            file.write(INDEX_STRING.pack(len(entry.frames)))
+            for page_idx, rect in entry.frames:
+                file.write(INDEX_FRAME.pack(page_idx, rect.x, rect.y, rect.width, rect.height))
+    return index_filename
+
+
+class BakedAtlas:
+    def __init__(self, index_filename: str):
+        self.index_filename = index_filename
+        self.baked_at = get_resource_mtime(index_filename)
+        self.entries = dict[str, AtlasEntry]()
+        self.converted = False
+
+        data = read_resource(index_filename)
+        magic, version, page_count, entry_count = INDEX_HEADER.unpack_from(data, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f"{index_filename} is not a version {INDEX_VERSION} atlas index")
+        offset = INDEX_HEADER.size
+
+        directory = os.path.dirname(index_filename)
+        self.pages = list[Surface]()
+        for _ in range(page_count):
+            offset, page_filename = self.read_string(data, offset)
+            size = INDEX_PAGE.unpack_from(data, offset)
+            offset += INDEX_PAGE.size
+            self.pages.append(load_raw_image_resource(os.path.join(directory, page_filename), size, PAGE_FORMAT))
+
+        for _ in range(entry_count):
+            kind, name_length = INDEX_ENTRY.unpack_from(data, offset)
+            offset += INDEX_ENTRY.size
+            name = data[offset:offset + name_length].decode("utf-8")
+            offset += name_length
+            frame_count, = INDEX_STRING.unpack_from(data, offset)
+            offset += INDEX_STRING.size
+            frames = list[tuple[int, Rect]]()
+            for _ in range(frame_count):
+                page_idx, x, y, width, height = INDEX_FRAME.unpack_from(data, offset)
+                offset += INDEX_FRAME.size
+                frames.append((page_idx, Rect(x, y, width, height)))
+            self.entries[name] = AtlasEntry(kind, name, frames)
+
+    @staticmethod
+    def read_string(data: bytes, offset: int) -> tuple[int, str]:
+        length, = INDEX_STRING.unpack_from(data, offset)
+        offset += INDEX_STRING.size
+        return offset + length, data[offset:offset + length].decode("utf-8")
+
+    def has(self, name: str, *sources: str) -> bool:
+        # entries older than their sources are stale and ignored until the next bake
+        if name not in self.entries:
+            return False
+        return all(get_resource_mtime(source) <= self.baked_at for source in sources)
+
+    def convert(self):
+        # needs the display, so it runs on the main thread the first time a frame is used
+        with _baked_atlases_lock:
+            if not self.converted:
+                self.pages = [page.convert_alpha() for page in self.pages]
+                self.converted = True
+
+    def get_frames(self, name: str) -> list[Surface]:
+        self.convert()
+        return [self.pages[page_idx].subsurface(rect) for page_idx, rect in self.entries[name].frames]
+
+
+_baked_atlases = dict[tuple[int, int], BakedAtlas | None]()
+_baked_atlases_lock = threading.RLock()
+
+
+def get_screen_size() -> tuple[int, int]:
+    surface = pygame.display.get_surface()
+    return surface.get_size() if surface is not None else REFERENCE_SIZE
+
+
+def get_baked_atlas(directory: str = BAKED_DIRECTORY) -> BakedAtlas | None:
+    # atlases are baked per screen size, and shared by every asset read from them
+    screen_size = get_screen_size()
+    with _baked_atlases_lock:
+        if screen_size not in _baked_atlases:
+            index_filename = os.path.join(directory, f"{get_atlas_name(screen_size)}.idx")
+            _baked_atlases[screen_size] = BakedAtlas(index_filename) if has_resource(index_filename) else None
+        return _baked_atlases[screen_size]
+
+
+def clear_baked_atlases():
+    with _baked_atlases_lock:
+        _baked_atlases.clear()
@@ -0,0 +1,224 @@
+import math
+from typing import Hashable, Iterator
+
+from pygame import Rect, Vector2
+from pygame.sprite import Sprite
+
+from .transformation import TransformationData
+
+DEFAULT_CELL_SIZE = 64
+
+
+class SweepHit:
+    def __init__(self, item: Hashable, time: float, normal: Vector2):
+        # time is the fraction of the movement done before touching, normal points away from the item
+        self.item = item
+        self.time = time
+        self.normal = normal
+
+
+class SpatialHash:
+    def __init__(self, cell_size: int = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = dict[tuple[int, int], set[Hashable]]()
+        self.rects = dict[Hashable, Rect]()
+        self.cell_ranges = dict[Hashable, tuple[int, int, int, int]]()
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.rects
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def get_rect(self, item: Hashable) -> Rect:
+        return self.rects[item]
+
+    def get_cell_range(self, rect: Rect) -> tuple[int, int, int, int]:
+        # cells touched by the rect, right and bottom edges are exclusive like in pygame
+        size = self.cell_size
+        return rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size
+
+    def insert(self, item: Hashable, rect: Rect):
+        if item in self.rects:
+            self.move(item, rect)
+            return
+        self.rects[item] = Rect(rect)
+        cell_range = self.get_cell_range(rect)
+        self.cell_ranges[item] = cell_range
+        self.add_to_cells(item, cell_range)
+
+    def move(self, item: Hashable, rect: Rect):
+        # most moves stay within the same cells, and only update the stored rect
+        self.rects[item].update(rect)
+        cell_range = self.get_cell_range(rect)
+        previous_range = self.cell_ranges[item]
+        if cell_range != previous_range:
+            self.remove_from_cells(item, previous_range)
+            self.add_to_cells(item, cell_range)
+            self.cell_ranges[item] = cell_range
+
+    def remove(self, item: Hashable):
+        self.remove_from_cells(item, self.cell_ranges.pop(item))
+        del self.rects[item]
+
+    def clear(self):
+        self.cells.clear()
+        self.rects.clear()
+        self.cell_ranges.clear()
+
+    def add_to_cells(self, item: Hashable, cell_range: tuple[int, int, int, int]):
+        left, top, right, bottom = cell_range
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell is None:
+                    cell = self.cells[(cell_x, cell_y)] = set[Hashable]()
+                cell.add(item)
+
+    def remove_from_cells(self, item: Hashable, cell_range: tuple[int, int, int, int]):
+        left, top, right, bottom = cell_range
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                cell = self.cells[(cell_x, cell_y)]
+                cell.discard(item)
+                if not cell:
+                    del self.cells[(cell_x, cell_y)]
+
+    def get_candidates(self, rect: Rect) -> set[Hashable]:
+        # everything sharing a cell with the rect, without checking for an actual overlap
+        candidates = set[Hashable]()
+        left, top, right, bottom = self.get_cell_range(rect)
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell:
+                    candidates.update(cell)
+        return candidates
+
+    def query_rect(self, rect: Rect) -> list[Hashable]:
+        rects = self.rects
+        return [item for item in self.get_candidates(rect) if rect.colliderect(rects[item])]
+
+    def query_point(self, point: Vector2 | tuple[float, float]) -> list[Hashable]:
+        x, y = int(point[0]), int(point[1])
+        cell = self.cells.get((x // self.cell_size, y // self.cell_size), ())
+        return [item for item in cell if self.rects[item].collidepoint(x, y)]
+
+    def query_circle(self, center: Vector2 | tuple[float, float], radius: float) -> list[Hashable]:
+        x, y = center
+        bounds = Rect(math.floor(x - radius), math.floor(y - radius), math.ceil(2 * radius) + 1, math.ceil(2 * radius) + 1)
+        return [item for item in self.get_candidates(bounds) if circle_collides_rect(x, y, radius, self.rects[item])]
+
+    def iter_pairs(self) -> Iterator[tuple[Hashable, Hashable]]:
+        # every overlapping pair once, only comparing items that share a cell. a pair is
+        # reported by the one cell holding the top left corner of their overlap
+        rects = self.rects
+        size = self.cell_size
+        for (cell_x, cell_y), cell in self.cells.items():
+            if len(cell) < 2:
+                continue
+            items = list(cell)
+            for i, first in enumerate(items):
+                first_rect = rects[first]
+                for second in items[i + 1:]:
+                    second_rect = rects[second]
+                    if first_rect.colliderect(second_rect) and max(first_rect.left, second_rect.left) // size == cell_x and max(first_rect.top, second_rect.top) // size == cell_y:
+                        yield first, second
+
+    def sweep(self, rect: Rect, velocity: Vector2 | tuple[float, float], ignore: Hashable | None = None) -> SweepHit | None:
+        # the earliest item hit by the rect moving by velocity, checking only the cells along the way
+        # grown by a pixel, so touching items and movement lost to rounding are still covered
+        dx, dy = velocity
+        bounds = rect.union(rect.move(dx, dy)).inflate(2, 2)
+        hit = None
+        for item in self.get_candidates(bounds):
+            if item is ignore:
+                continue
+            item_hit = sweep_rect(rect, velocity, self.rects[item])
+            if item_hit is not None and (hit is None or item_hit[0] < hit.time):
+                hit = SweepHit(item, *item_hit)
+        return hit
+
+    def insert_sprite(self, sprite: Sprite):
+        self.insert(sprite, sprite.rect)
+
+    def move_sprite(self, sprite: Sprite):
+        self.move(sprite, sprite.rect)
+
+
+def circle_collides_rect(x: float, y: float, radius: float, rect: Rect) -> bool:
+    closest_x = min(max(x, rect.left), rect.right)
+    closest_y = min(max(y, rect.top), rect.bottom)
+    dx, dy = x - closest_x, y - closest_y
+    return dx * dx + dy * dy <= radius * radius
+
+
+def sweep_rect(rect: Rect, velocity: Vector2 | tuple[float, float], target: Rect) -> tuple[float, Vector2] | None:
+    # swept aabb, the time in 0..1 the moving rect first touches the target and the target face normal
+    dx, dy = velocity
+    if dx == 0 and dy == 0:
+        return None
+
+    if dx > 0:
+        entry_x, exit_x = target.left - rect.right, target.right - rect.left
+    else:
+        entry_x, exit_x = target.right - rect.left, target.left - rect.right
+    if dy > 0:
+        entry_y, exit_y = target.top - rect.bottom, target.bottom - rect.top
+    else:
+        entry_y, exit_y = target.bottom - rect.top, target.top - rect.bottom
+
+    if dx == 0:
+        if rect.right <= target.left or rect.left >= target.right:
+            return None
+        entry_time_x, exit_time_x = -math.inf, math.inf
+    else:
+        entry_time_x, exit_time_x = entry_x / dx, exit_x / dx
+    if dy == 0:
+        if rect.bottom <= target.top or rect.top >= target.bottom:
+            return None
+        entry_time_y, exit_time_y = -math.inf, math.inf
+    else:
+        entry_time_y, exit_time_y = entry_y / dy, exit_y / dy
+
+    entry_time = max(entry_time_x, entry_time_y)
+    exit_time = min(exit_time_x, exit_time_y)
+    if entry_time >= exit_time or entry_time < 0 or entry_time > 1:
+        return None
+
+    if entry_time_x > entry_time_y:
+        normal = Vector2(-1 if dx > 0 else 1, 0)
+    else:
+        normal = Vector2(0, -1 if dy > 0 else 1)
+    return entry_time, normal
+
+
+def get_transformed_rect(transform: TransformationData, size: tuple[float, float]) -> Rect:
+    # the bounds of something of this size after the transform is scaled and anchored, rotation is ignored
+    rect = Rect(0, 0, round(size[0] * abs(transform.scale.x)), round(size[1] * abs(transform.scale.y)))
+    transform.apply_position_to_rect(rect)
+    return rect
+
+
+def move_and_slide(space: SpatialHash, rect: Rect, velocity: Vector2 | tuple[float, float], ignore: Hashable | None = None, iterations: int = 2) -> Vector2:
+    # how far the rect can move, stopping at what it hits and sliding along it with the rest of the movement
+    moved = Vector2()
+    remaining = Vector2(velocity)
+    for _ in range(iterations):
+        hit = space.sweep(rect.move(moved), remaining, ignore)
+        if hit is None:
+            return moved + remaining
+        moved += remaining * hit.time
+        remaining *= 1 - hit.time
+        remaining -= hit.normal * remaining.dot(hit.normal)
+    return moved
+
+
+def create_bounds(rect: Rect, thickness: int = DEFAULT_CELL_SIZE) -> list[Rect]:
+    # walls just outside the rect, to keep things inside of it
+    return [
+        Rect(rect.left - thickness, rect.top - thickness, rect.width + 2 * thickness, thickness),
+        Rect(rect.left - thickness, rect.bottom, rect.width + 2 * thickness, thickness),
+        Rect(rect.left - thickness, rect.top, thickness, rect.height),
+        Rect(rect.right, rect.top, thickness, rect.height),
+    ]
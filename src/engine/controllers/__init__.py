@@ -1,2 +1,3 @@
 from .base import ControllerBase 
-from .statemachine import StateMachineController
\ No newline at end of file
+from .statemachine import StateMachineController
+from .hierarchical import HierarchicalStateMachine, StateDefinition, TransitionDefinition, StateTimeout, create_states, load_state_machine
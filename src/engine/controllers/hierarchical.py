@@ -0,0 +1,216 @@
+from typing import Any, Callable
+
+from .base import ControllerBase
+from ..events import Event, TimerHandle
+from ..game.context.game import GameContext
+from ..resources.json import load_json_resource
+
+Handler = Callable[[GameContext], None]
+Guard = Callable[[GameContext], bool]
+
+
+def load_state_machine(context: GameContext, filename: str, handler: Any):
+    data_dict = load_json_resource(filename)
+    return HierarchicalStateMachine(context, create_states(data_dict, handler), data_dict["initial"])
+
+
+def create_states(table: dict, handler: Any) -> dict[str, "StateDefinition"]:
+    # states are nested tables, their enter/update/exit handlers and guards are method names on the handler
+    states = dict[str, StateDefinition]()
+
+    def resolve(name: str | None):
+        return getattr(handler, name) if name is not None else None
+
+    def add(name: str, entry: dict, parent: StateDefinition | None):
+        if name in states:
+            raise ValueError(f"state {name!r} is defined more than once")
+        state = states[name] = StateDefinition(name, parent, entry.get("initial"), resolve(entry.get("enter")), resolve(entry.get("update")), resolve(entry.get("exit")))
+        for transition in entry.get("transitions", []):
+            guards = transition.get("when", [])
+            guards = [guards] if isinstance(guards, str) else guards
+            state.transitions.append(TransitionDefinition(transition["to"], [resolve(guard) for guard in guards], transition.get("after")))
+        for child_name, child_entry in entry.get("states", {}).items():
+            add(child_name, child_entry, state)
+
+    for name, entry in table["states"].items():
+        add(name, entry, None)
+
+    for state in states.values():
+        if state.initial is None and state.children:
+            state.initial = state.children[0].name
+        for transition in state.transitions:
+            if transition.target not in states:
+                raise ValueError(f"state {state.name!r} has a transition to the unknown state {transition.target!r}")
+    return states
+
+
+class StateTimeout(Event):
+    def __init__(self, machine: "HierarchicalStateMachine", transition: "TransitionDefinition"):
+        self.machine = machine
+        self.transition = transition
+
+
+class TransitionDefinition:
+    def __init__(self, target: str, guards: list[Guard] | None = None, after: int | None = None):
+        # taken once every guard passes and, with after, once the state has been active for that many ticks
+        self.target = target
+        self.guards = guards or []
+        self.after = after
+
+
+class StateDefinition:
+    def __init__(self, name: str, parent: "StateDefinition | None" = None, initial: str | None = None, enter: Handler | None = None, update: Handler | None = None, exit: Handler | None = None, transitions: list[TransitionDefinition] | None = None):
+        self.name = name
+        self.parent = parent
+        self.initial = initial
+        self.enter = enter
+        self.update = update
+        self.exit = exit
+        self.transitions = transitions or []
+        self.children = list[StateDefinition]()
+        self.depth = 0 if parent is None else parent.depth + 1
+        if parent is not None:
+            parent.children.append(self)
+
+    def get_path(self) -> list["StateDefinition"]:
+        path = list[StateDefinition]()
+        state = self
+        while state is not None:
+            path.append(state)
+            state = state.parent
+        path.reverse()
+        return path
+
+
+class HierarchicalStateMachine(ControllerBase):
+    def __init__(self, context: GameContext, states: dict[str, StateDefinition], initial: str, auto_start: bool = True):
+        super(HierarchicalStateMachine, self).__init__(context)
+        self.states = states
+        self.initial = initial
+
+        # the active path goes from a top level state down to a leaf, and is all that is ever visited
+        self.active = list[StateDefinition]()
+        self.active_names = set[str]()
+        self.entered_at = dict[str, int]()
+        self.next_state = None
+        self.transition_count = 0
+
+        # timed transitions wait on timers instead of checking the clock every update
+        self.bus = context.get_event_bus()
+        self.timers = dict[str, list[TimerHandle]]()
+        self.expired = set[TransitionDefinition]()
+        self.bus.subscribe(StateTimeout, self.on_timeout)
+        if auto_start:
+            self.start_from(initial)
+
+    def init_update(self):
+        pass
+
+    def finish_update(self):
+        pass
+
+    def update(self):
+        # transitions are checked from the leaf up, and the first one taken ends the step.
+        # otherwise every active state updates, from the outermost in
+        context = self.context
+        if self.next_state is not None:
+            self.change_to(self.pop_next_state())
+            return
+
+        for state in reversed(self.active):
+            for transition in state.transitions:
+                if transition.after is not None and transition not in self.expired:
+                    continue
+                if all(guard(context) for guard in transition.guards):
+                    self.change_to(transition.target)
+                    return
+
+        for state in self.active:
+            if state.update is not None:
+                state.update(context)
+                if self.next_state is not None:
+                    break
+
+        # handlers can pick a target the table cannot express
+        if self.next_state is not None:
+            self.change_to(self.pop_next_state())
+
+    def on_timeout(self, event: StateTimeout):
+        # without guards the transition is taken right away, otherwise once they pass. timeouts
+        # of states left earlier in the same dispatch are stale
+        if event.machine is not self or not any(event.transition in state.transitions for state in self.active):
+            return
+        if event.transition.guards:
+            self.expired.add(event.transition)
+        else:
+            self.change_to(event.transition.target)
+
+    def pop_next_state(self) -> str:
+        next_state, self.next_state = self.next_state, None
+        return next_state
+
+    def transition_to(self, name: str):
+        self.next_state = name
+
+    def start_from(self, name: str):
+        self.stop()
+        self.change_to(name)
+
+    def stop(self):
+        for state in reversed(self.active[:]):
+            self.exit_state(state)
+        self.next_state = None
+
+    def change_to(self, name: str):
+        target_path = self.states[name].get_path()
+
+        # states shared by both paths stay active, unless the target itself is active and has to be entered again
+        shared = 0
+        while shared < min(len(self.active), len(target_path)) and self.active[shared] is target_path[shared]:
+            shared += 1
+        if shared == len(target_path):
+            shared -= 1
+
+        for state in reversed(self.active[shared:]):
+            self.exit_state(state)
+        for state in target_path[shared:]:
+            self.enter_state(state)
+
+        state = target_path[-1]
+        while state.initial is not None:
+            state = self.states[state.initial]
+            self.enter_state(state)
+        self.transition_count += 1
+
+    def enter_state(self, state: StateDefinition):
+        self.active.append(state)
+        self.active_names.add(state.name)
+        entered_at = self.entered_at[state.name] = self.context.scene.get_current_ticks()
+        timed = [transition for transition in state.transitions if transition.after is not None]
+        if timed:
+            self.timers[state.name] = [self.bus.schedule_at(entered_at + transition.after, StateTimeout(self, transition)) for transition in timed]
+        if state.enter is not None:
+            state.enter(self.context)
+
+    def exit_state(self, state: StateDefinition):
+        if state.exit is not None:
+            state.exit(self.context)
+        self.active.pop()
+        self.active_names.discard(state.name)
+        del self.entered_at[state.name]
+        for timer in self.timers.pop(state.name, ()):
+            self.bus.cancel(timer)
+        self.expired.difference_update(state.transitions)
+
+    def is_active(self, name: str) -> bool:
+        return name in self.active_names
+
+    def get_current(self) -> str | None:
+        return self.active[-1].name if self.active else None
+
+    def get_active_path(self) -> tuple[str, ...]:
+        return tuple(state.name for state in self.active)
+
+    def get_ticks_elapsed(self, name: str | None = None) -> int:
+        name = name or self.get_current()
+        return self.context.scene.get_current_ticks() - self.entered_at[name]
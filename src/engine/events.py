@@ -0,0 +1,72 @@
+from collections import defaultdict
+from typing import Callable, TypeVar
+
+from .timing import TimerHandle, TimerQueue
+
+E = TypeVar("E", bound="Event")
+
+
+class Event:
+    # subclasses are the event types subscribers listen to
+    pass
+
+
+class EventBus:
+    def __init__(self):
+        self.subscribers = defaultdict[type, list[Callable[[Event], None]]](list)
+        self.queue = list[Event]()
+        self.timers = TimerQueue()
+        self.ticks = 0.0
+        self.delivered = 0
+
+    def subscribe(self, event_type: type[E], callback: Callable[[E], None]) -> Callable[[E], None]:
+        self.subscribers[event_type].append(callback)
+        return callback
+
+    def unsubscribe(self, event_type: type[E], callback: Callable[[E], None]):
+        callbacks = self.subscribers.get(event_type)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+
+    def publish(self, event: Event):
+        # delivered with the next dispatch, never in the middle of whoever published it
+        self.queue.append(event)
+
+    def schedule(self, delay: float, event: Event, interval: float | None = None) -> TimerHandle:
+        # published once the scene clock reaches the due tick, and again every interval when given
+        return self.schedule_at(self.ticks + delay, event, interval)
+
+    def schedule_at(self, due: float, event: Event, interval: float | None = None) -> TimerHandle:
+        return self.timers.push(due, event, interval)
+
+    def cancel(self, timer: TimerHandle | None):
+        self.timers.cancel(timer)
+
+    def dispatch(self, ticks: float):
+        self.ticks = ticks
+        due = list(self.timers.pop_due(ticks))
+
+        # events published while delivering wait for the next dispatch
+        queue, self.queue = self.queue, list[Event]()
+        for event in queue:
+            self.deliver(event)
+        # timers cancelled by an earlier delivery of this dispatch are dropped, even if already due
+        for timer in due:
+            if not timer.cancelled:
+                self.deliver(timer.payload)
+
+    def deliver(self, event: Event):
+        for callback in self.subscribers.get(type(event), ()):
+            callback(event)
+        self.delivered += 1
+
+    def set_ticks(self, ticks: float):
+        self.ticks = ticks
+
+    def clear(self):
+        # scene ticks start over with every scene, so nothing scheduled or subscribed carries over
+        self.subscribers.clear()
+        self.queue.clear()
+        self.timers.clear()
+        self.ticks = 0.0
+
@@ -1,3 +1,7 @@
+import os
+
+from ... import pygame
+from ...resources.pack import get_resource_source
 from .scene import SceneContext
 from ..state import GameState
 
@@ -17,6 +21,46 @@ class GameContext:
     def quit(self):
         self.state.running = False
 
+    def is_headless(self):
+        return self.state.headless
+
+    def get_frame_count(self):
+        return self.state.frame_count
+
+    def get_update_count(self):
+        return self.state.update_count
+
+    def play_music(self, filename: str, loops: int = -1):
+        # headless runs never stream music
+        if not self.state.headless:
+            pygame.mixer.music.load(get_resource_source(filename), os.path.splitext(filename)[1][1:])
+            pygame.mixer.music.play(loops)
+
+    def stop_music(self):
+        if not self.state.headless:
+            pygame.mixer.music.stop()
+
+    def get_assets(self):
+        return self.state.assets
+
+    def get_event_bus(self):
+        return self.state.bus
+
+    def get_scheduler(self):
+        return self.state.scheduler
+
+    def is_loading(self):
+        return self.state.loading
+
+    def get_loading_progress(self):
+        return self.state.assets.get_progress(self.state.scene_dependencies.get(self.state.current_scene_idx, []))
+
+    def get_profiler(self):
+        return self.state.profiler
+
+    def profile(self, name: str):
+        return self.state.profiler.zone(name)
+
     def is_paused(self):
         return self.state.paused
 
@@ -29,6 +73,23 @@ class GameContext:
     def get_screen(self):
         return self.state.screen
 
+    def is_dirty_rects_enabled(self):
+        return self.state.dirty_rects_enabled
+
+    def is_full_redraw(self):
+        return not self.state.dirty_rects_enabled or self.state.full_redraw
+
+    def request_full_redraw(self):
+        self.state.full_redraw = True
+
+    def mark_dirty(self, *rects):
+        if self.state.dirty_rects_enabled:
+            self.state.dirty_rects.extend(rects)
+
+    def save_background(self):
+        if self.state.dirty_rects_enabled:
+            self.state.background = self.state.screen.copy()
+
     def get_events(self):
         return self.state.events
 
@@ -50,6 +111,9 @@ class GameContext:
     def get_delta_time(self):
         return self.state.delta_time
 
+    def get_interpolation_alpha(self):
+        return self.state.interpolation_alpha
+
     def get_keys_pressed(self):
         return self.state.keys_pressed
 
@@ -59,11 +123,17 @@ class GameContext:
     def get_keys_up(self):
         return self.state.keys_up
 
+    def get_joysticks(self):
+        return self.state.joysticks
+
+    def get_key_changed_frame(self, key: int):
+        return self.state.keys.get_changed_frame(key)
+
     def is_any_key_pressed(self):
         return any(self.state.keys_pressed)
 
     def is_any_key_down(self):
-        return any(value for value in self.state.keys_down.values())
+        return self.state.keys_down.any()
 
     def is_any_key_up(self):
-        return any(value for value in self.state.keys_up.values())
+        return self.state.keys_up.any()
@@ -12,6 +12,9 @@ class SceneContext:
     def get_idx(self):
         return self.state.current_scene_idx
 
+    def get_count(self):
+        return self.state.scene_count
+
     def get_current_ticks(self):
         return self.state.current_ticks - self.state.current_scene_started
 
@@ -1,54 +1,111 @@
+import os
 from .. import pygame
 
-from .key_utils import create_key_tracking_dict
 from .setup import GameSetup
 from .state import GameState
 from .context.game import GameContext
+from ..time_source import SystemTimeSource, VirtualTimeSource
+from ..inputs import InputSource, LiveInputSource
+from ..scenes import Scene, create_scene, get_scene_class
+from ..startup import STARTUP
+from ..assets import AssetManager
+from ..profiling import Profiler, OVERLAY_KEY, EXPORT_KEY
+
+DEFAULT_TRACE_FILENAME = "trace.json"
+STEP_TOLERANCE = 1e-6
 
 class Game:
     def __init__(self, setup: GameSetup):
         self.setup = setup
+        self.input_source = self.create_input_source()
+        self.profiler_overlay = None
+
+        # scenes given as factories are only created when first needed
+        self.scenes = list[Scene | None]([None] * len(setup.scenes))
+        self.loading_scene = None
+
+    def get_scene(self, scene_idx: int) -> Scene:
+        if self.scenes[scene_idx] is None:
+            self.scenes[scene_idx] = create_scene(self.setup.scenes[scene_idx])
+        return self.scenes[scene_idx]
+
+    def get_loading_scene(self) -> Scene:
+        if self.loading_scene is None:
+            self.loading_scene = create_scene(self.setup.loading_scene)
+        return self.loading_scene
+
+    def create_input_source(self) -> InputSource:
+        # replays carry their own timing, live input is timed by the real or virtual clock.
+        # recording and replaying are only imported by the runs that use them
+        if self.setup.replay_input:
+            from ..inputs.recording import InputPlayer
+            source = InputPlayer(self.setup.replay_input)
+        elif self.setup.headless:
+            source = LiveInputSource(VirtualTimeSource(self.setup.simulation_rate))
+        else:
+            source = LiveInputSource(SystemTimeSource())
+
+        if self.setup.record_input:
+            from ..inputs.recording import InputRecorder
+            source = InputRecorder(source, self.setup.record_input)
+        return source
 
     def init_pygame(self):
+        # headless runs render to an offscreen dummy display without sound output
+        if self.setup.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
         pygame.init()
         pygame.font.init()
         pygame.mixer.init()
+
+        # a packed build reads its assets from one mapped file, otherwise from loose files
+        if self.setup.asset_pack:
+            from ..resources.pack import mount_pack
+            mount_pack(self.setup.asset_pack)
     
     def init_screen(self):
-        screen = pygame.display.set_mode((1280, 960))
+        if self.setup.vsync and not self.setup.headless:
+            screen = pygame.display.set_mode((1280, 960), pygame.SCALED, vsync=1)
+        else:
+            screen = pygame.display.set_mode((1280, 960))
         pygame.display.set_caption(self.setup.title)
         return screen
     
     def init_frame(self, state: GameState):
+        # capture the input and timing of this frame
+        frame = self.input_source.poll()
+
         # capture information for the timers
-        state.unescaled_delta_ticks = pygame.time.get_ticks() - state.unscaled_current_ticks
-        state.unscaled_current_ticks = pygame.time.get_ticks()
+        state.unescaled_delta_ticks = frame.ticks - state.unscaled_current_ticks
+        state.unscaled_current_ticks = frame.ticks
         if not state.paused:
-            state.delta_ticks = state.unescaled_delta_ticks
-            state.current_ticks = state.current_ticks + state.delta_ticks
-            state.delta_time = state.delta_ticks / 1000
-            state.current_time = state.current_ticks / 1000
+            state.simulation_accumulator += state.unescaled_delta_ticks
             state.pause_started_at = 0
-        else:
-            state.delta_ticks = 0
-            state.delta_time = 0
-            if not state.pause_started_at:
-                state.pause_started_at = state.unscaled_current_ticks
+        elif not state.pause_started_at:
+            state.pause_started_at = state.unscaled_current_ticks
+
+        # work done outside of the simulation, like loading a scene, should not be caught up on
+        if state.loading_hitch:
+            state.simulation_accumulator = min(state.simulation_accumulator, self.setup.simulation_step)
+            state.loading_hitch = False
 
-        # initialize key tracking for the given grame
-        state.keys_pressed = pygame.key.get_pressed()
-        state.keys_down = create_key_tracking_dict()
-        state.keys_up = create_key_tracking_dict()
+        # initialize key tracking for the given grame, keeping the edges no update has seen yet
+        state.keys_pressed = frame.keys_pressed
+        state.joysticks = frame.joysticks
+        if state.input_consumed:
+            self.clear_input_edges(state)
 
         # process events initially for basic logical captures
-        state.events = pygame.event.get()
-        for event in state.events:
+        state.events.extend(frame.events)
+        for event in frame.events:
             if event.type == pygame.QUIT:
                 state.running = False
             if event.type == pygame.KEYDOWN:
-                state.keys_down[event.key] = True
+                state.keys.press(event, state.frame_count)
+                self.handle_profiler_key(state, event.key)
             if event.type == pygame.KEYUP:
-                state.keys_up[event.key] = True
+                state.keys.release(event, state.frame_count)
 
         # scene management initialization per frame
         if state.next_scene_idx != None:
@@ -58,44 +115,273 @@ class Game:
             state.current_scene_started = state.current_ticks
             state.entering_scene = True
 
+        # scenes always start from a fully redrawn screen
+        if state.entering_scene:
+            state.full_redraw = True
+
+        # start collecting the dirty rects of this frame
+        state.previous_dirty_rects = state.dirty_rects
+        state.dirty_rects = []
+
+    def handle_profiler_key(self, state: GameState, key: int):
+        if not state.profiler.enabled:
+            return
+        if key == OVERLAY_KEY:
+            self.profiler_overlay.toggle()
+        elif key == EXPORT_KEY:
+            state.profiler.export_chrome_trace(self.setup.trace_filename or DEFAULT_TRACE_FILENAME)
+
+    def clear_input_edges(self, state: GameState):
+        state.keys.clear_edges()
+        state.events = []
+        state.input_consumed = False
+
+
+    def update_scene(self, state: GameState, scene: Scene, context: GameContext):
+        # paused scenes still update to handle input, but their clock stands still
+        if state.paused:
+            state.delta_ticks = 0
+            state.delta_time = 0
+            state.simulation_accumulator = 0
+            state.interpolation_alpha = 1
+            state.update_count += 1
+            self.update_scene_step(state, scene, context)
+            state.input_consumed = True
+            return
+
+        # run as many fixed steps as the elapsed time allows, up to the catch-up limit. steps
+        # are not whole ticks, so a frame of exactly one step may be short by a rounding error
+        step = self.setup.simulation_step
+        updates = 0
+        while state.simulation_accumulator >= step - STEP_TOLERANCE:
+            if updates == self.setup.max_updates_per_frame:
+                state.simulation_accumulator %= step
+                break
+
+            if state.input_consumed:
+                self.clear_input_edges(state)
+
+            state.simulation_accumulator -= step
+            state.delta_ticks = step
+            # counted in steps, so the scene clock lands on whole ticks like timers expect
+            state.simulation_steps += 1
+            state.current_ticks = state.simulation_steps * 1000 / self.setup.simulation_rate
+            state.delta_time = step / 1000
+            state.current_time = state.current_ticks / 1000
+            state.update_count += 1
+            self.update_scene_step(state, scene, context)
+            state.input_consumed = True
+            updates += 1
+
+        state.interpolation_alpha = max(state.simulation_accumulator, 0) / step
+
+    def update_scene_step(self, state: GameState, scene: Scene, context: GameContext):
+        # timers and tweens due by this step run before the scene updates, so it reads tweened
+        # values as of this step. timers it schedules for this same tick run on the next step.
+        # the events published along the way are delivered once the update is done
+        scene_ticks = state.current_ticks - state.current_scene_started
+        state.bus.set_ticks(scene_ticks)
+        state.scheduler.advance(scene_ticks)
+        scene.update(context)
+        state.bus.dispatch(scene_ticks)
+
+    def enter_scene(self, state: GameState, scene: Scene, context: GameContext):
+        # resident scenes kept everything from their first load, so they only start again
+        if state.current_scene_idx in state.scene_dependencies:
+            scene.start(context)
+            self.prewarm_scenes(state, scene, context)
+            return
+
+        # start reading the scene assets in the background, holding them while the scene is loaded
+        dependencies = scene.get_dependencies(context)
+        state.assets.acquire(dependencies)
+        state.scene_dependencies[state.current_scene_idx] = dependencies
+
+        # show the loading scene while they are not ready, when there is one. recorded
+        # and replayed runs always wait instead, as worker timing is not reproducible
+        uses_loading_scene = self.setup.loading_scene is not None and not self.setup.record_input and not self.setup.replay_input
+        if uses_loading_scene and not state.assets.is_loaded(dependencies):
+            state.loading = True
+            self.get_loading_scene().load(context)
+            self.get_loading_scene().start(context)
+            return
+
+        state.assets.wait(dependencies)
+        self.load_scene(state, scene, context)
+
+    def continue_loading(self, state: GameState, scene: Scene, context: GameContext) -> Scene:
+        loading_scene = self.get_loading_scene()
+        state.assets.process(self.setup.asset_budget_ms)
+        if not state.assets.is_loaded(state.scene_dependencies[state.current_scene_idx]):
+            return loading_scene
+
+        # everything is ready, so the scene enters without blocking on io
+        loading_scene.exit(context)
+        state.bus.clear()
+        state.scheduler.clear()
+        state.loading = False
+        state.entering_scene = True
+        state.full_redraw = True
+        state.current_scene_started = state.current_ticks
+        self.load_scene(state, scene, context)
+        return scene
+
+    def load_scene(self, state: GameState, scene: Scene, context: GameContext):
+        scene.load(context)
+        scene.start(context)
+        state.loading_hitch = True
+        self.prewarm_scenes(state, scene, context)
+
+    def prewarm_scenes(self, state: GameState, scene: Scene, context: GameContext):
+        # read the assets of the scenes likely to come next, without holding them. scenes not
+        # created yet are left that way, their dependencies come from their class
+        for scene_idx in scene.get_next_scenes(context):
+            if scene_idx in state.scene_dependencies:
+                continue
+            next_scene = self.scenes[scene_idx] or get_scene_class(self.setup.scenes[scene_idx])
+            if next_scene is not None:
+                state.assets.preload(next_scene.get_dependencies(context))
+
+    def exit_scene(self, state: GameState, scene: Scene, context: GameContext):
+        scene.exit(context)
+        state.bus.clear()
+        state.scheduler.clear()
+        if not scene.keep_resident:
+            self.unload_scene(state, state.current_scene_idx, context)
+
+    def unload_scene(self, state: GameState, scene_idx: int, context: GameContext):
+        if scene_idx not in state.scene_dependencies:
+            return
+        self.get_scene(scene_idx).unload(context)
+        state.assets.release(state.scene_dependencies.pop(scene_idx))
+
+    def init_draw(self, state: GameState):
         # clean screen for this frame
-        state.screen.fill("black")
+        if not state.dirty_rects_enabled or state.full_redraw:
+            state.screen.fill("black")
+            state.background = None
+            return
+
+        # restore only the regions drawn over on the previous frame
+        for rect in state.previous_dirty_rects:
+            if state.background is not None:
+                state.screen.blit(state.background, rect, rect)
+            else:
+                state.screen.fill("black", rect)
     
     def finish_frame(self, state: GameState):
         # clean up scene management flags
         state.entering_scene = False
         state.exiting_scene = False
 
+        # count frames and stop once the configured amount has run
+        state.frame_count += 1
+        if self.setup.max_frames and state.frame_count >= self.setup.max_frames:
+            state.running = False
+
+        # headless runs have nothing to present and no reason to wait
+        if state.headless:
+            state.full_redraw = False
+            state.clock.tick()
+            return
+
         # show screen changes
-        pygame.display.flip()
+        state.profiler.begin("present")
+        if not state.dirty_rects_enabled or state.full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(state.previous_dirty_rects + state.dirty_rects)
+        state.full_redraw = False
+        state.profiler.end()
+
+        # limit frame rate when a cap is configured
+        state.profiler.begin("wait")
+        if self.setup.frame_rate:
+            state.clock.tick(self.setup.frame_rate)
+        else:
+            state.clock.tick()
+        state.profiler.end()
 
-        # limit frame rate by 60 per seconds
-        state.clock.tick(60)
+    def draw_profiler_overlay(self, state: GameState):
+        if self.profiler_overlay:
+            overlay_rect = self.profiler_overlay.draw(state.screen)
+            if overlay_rect and state.dirty_rects_enabled:
+                state.dirty_rects.append(overlay_rect)
     
-    def finish_pygame(self):
+    def finish_startup_trace(self):
+        STARTUP.mark("first_frame")
+        if self.setup.startup_trace:
+            STARTUP.print_report()
+        if self.setup.startup_trace_filename:
+            STARTUP.export(self.setup.startup_trace_filename)
+
+    def finish_pygame(self, state: GameState, context: GameContext):
+        for scene_idx in list(state.scene_dependencies):
+            self.unload_scene(state, scene_idx, context)
+        if state.profiler.enabled and self.setup.trace_filename:
+            state.profiler.export_chrome_trace(self.setup.trace_filename)
+        self.input_source.close()
+        state.assets.shutdown()
+        if self.setup.asset_pack:
+            from ..resources.pack import unmount_pack
+            unmount_pack()
         pygame.quit()
     
     def run(self):
+        STARTUP.mark("import")
         self.init_pygame()
         screen = self.init_screen()
+        STARTUP.mark("init")
         state = GameState(screen)
+        state.dirty_rects_enabled = self.setup.dirty_rects
+        state.headless = self.setup.headless
+        state.scene_count = len(self.setup.scenes)
+        state.profiler = profiler = Profiler(enabled=self.setup.profiling)
+        state.assets = AssetManager(workers=self.setup.asset_workers, memory_budget=self.setup.asset_memory_budget)
+        if self.setup.profiling:
+            from ..profiling_overlay import ProfilerOverlay
+            self.profiler_overlay = ProfilerOverlay(profiler, state.assets)
         game_context = GameContext(state)
 
         while state.running:
+            profiler.begin_frame()
+
+            profiler.begin("input")
             self.init_frame(state)
+            profiler.end()
             
-            current_scene = self.setup.scenes[state.current_scene_idx]
+            current_scene = self.get_scene(state.current_scene_idx)
 
             if state.entering_scene:
-                current_scene.load(game_context)
-                current_scene.start(game_context)
+                profiler.begin("load")
+                self.enter_scene(state, current_scene, game_context)
+                profiler.end()
+
+            if state.loading:
+                profiler.begin("load")
+                current_scene = self.continue_loading(state, current_scene, game_context)
+                profiler.end()
             
-            current_scene.update(game_context)
+            profiler.begin("update")
+            self.update_scene(state, current_scene, game_context)
+            profiler.end()
+
+            profiler.begin("draw")
+            self.init_draw(state)
             current_scene.draw(game_context)
+            self.draw_profiler_overlay(state)
+            profiler.end()
 
             if state.exiting_scene:
-                current_scene.exit(game_context)
+                self.exit_scene(state, current_scene, game_context)
+            elif state.assets.pending and not state.loading:
+                state.assets.process(self.setup.asset_budget_ms)
             
             self.finish_frame(state)
+            profiler.end_frame()
+
+            if not STARTUP.is_finished:
+                self.finish_startup_trace()
 
-        self.finish_pygame()
+        self.finish_pygame(state, game_context)
+        return state
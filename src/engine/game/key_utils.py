@@ -1,26 +1,81 @@
+from array import array
+
 from .. import pygame
 
+# sdl has 512 scancodes, which are the slots of every key table. keys without a known
+# scancode get one of the slots after them instead, one per key code
+SCANCODE_COUNT = 512
+UNKNOWN_SLOT_COUNT = 64
+SLOT_COUNT = SCANCODE_COUNT + UNKNOWN_SLOT_COUNT
+
+
+def create_keys_pressed() -> pygame.key.ScancodeWrapper:
+    return pygame.key.ScancodeWrapper((False,) * SCANCODE_COUNT)
+
+
+class KeyEdges:
+    def __init__(self, scancodes: dict[int, int]):
+        self.scancodes = scancodes
+        self.flags = bytearray(SLOT_COUNT)
+        self.touched = list[int]()
+
+    def __getitem__(self, key: int) -> bool:
+        # keys never seen in an event have no scancode yet, so they cannot be set
+        scancode = self.scancodes.get(key)
+        return scancode is not None and self.flags[scancode] != 0
+
+    def set(self, scancode: int):
+        if not self.flags[scancode]:
+            self.flags[scancode] = 1
+            self.touched.append(scancode)
+
+    def clear(self):
+        # only reset the slots set since the last clear
+        for scancode in self.touched:
+            self.flags[scancode] = 0
+        self.touched.clear()
+
+    def any(self) -> bool:
+        return len(self.touched) > 0
+
+
+class KeyState:
+    def __init__(self):
+        self.scancodes = dict[int, int]()
+        self.unknown_slots = dict[int, int]()
+        self.down = KeyEdges(self.scancodes)
+        self.up = KeyEdges(self.scancodes)
+        self.changed_at = array("q", bytes(8 * SLOT_COUNT))
+
+    def press(self, event: pygame.event.Event, frame: int):
+        scancode = self.register(event)
+        if scancode is not None:
+            self.down.set(scancode)
+            self.changed_at[scancode] = frame
+
+    def release(self, event: pygame.event.Event, frame: int):
+        scancode = self.register(event)
+        if scancode is not None:
+            self.up.set(scancode)
+            self.changed_at[scancode] = frame
+
+    def register(self, event: pygame.event.Event) -> int | None:
+        # key codes follow the keyboard layout, so their scancode is learned from events.
+        # 0 is sdl's unknown scancode, shared by every key it cannot place
+        scancode = getattr(event, "scancode", 0)
+        if not 0 < scancode < SCANCODE_COUNT:
+            scancode = self.unknown_slots.get(event.key)
+            if scancode is None:
+                if len(self.unknown_slots) == UNKNOWN_SLOT_COUNT:
+                    return None
+                scancode = self.unknown_slots[event.key] = SCANCODE_COUNT + len(self.unknown_slots)
+        self.scancodes[event.key] = scancode
+        return scancode
+
+    def clear_edges(self):
+        self.down.clear()
+        self.up.clear()
 
-KEYS_TO_TRACK = [
-    # Todas las letras
-    pygame.K_a, pygame.K_b, pygame.K_c, pygame.K_d, pygame.K_e, pygame.K_f,
-    pygame.K_g, pygame.K_h, pygame.K_i, pygame.K_j, pygame.K_k, pygame.K_l,
-    pygame.K_m, pygame.K_n, pygame.K_o, pygame.K_p, pygame.K_q, pygame.K_r,
-    pygame.K_s, pygame.K_t, pygame.K_u, pygame.K_v, pygame.K_w, pygame.K_x,
-    pygame.K_y, pygame.K_z,
-    # Todos los números
-    pygame.K_0, pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5,
-    pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9,
-    # Teclas direccionales
-    pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT,
-    # Teclas recurrentes
-    pygame.K_SPACE, pygame.K_RETURN, pygame.K_ESCAPE, pygame.K_TAB,
-    # Teclas de función
-    pygame.K_F1, pygame.K_F2, pygame.K_F3, pygame.K_F4, pygame.K_F5, pygame.K_F6,
-    pygame.K_F7, pygame.K_F8, pygame.K_F9, pygame.K_F10, pygame.K_F11, pygame.K_F12,
-    # Teclas modificadores
-    pygame.K_LSHIFT, pygame.K_LCTRL, pygame.K_LALT, pygame.K_RSHIFT, pygame.K_RCTRL, pygame.K_RALT,
-]
-
-def create_key_tracking_dict():
-    return { key: False for key in KEYS_TO_TRACK }
+    def get_changed_frame(self, key: int) -> int | None:
+        scancode = self.scancodes.get(key)
+        return None if scancode is None else self.changed_at[scancode]
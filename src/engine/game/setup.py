@@ -1,9 +1,50 @@
-from ..scenes import Scene
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # scenes import the game context, so they are only named here for type checkers
+    from ..scenes import Scene, SceneFactory
 
 
 class GameSetup:
     def __init__(self,
                  title: str,
-                 scenes: list[Scene]):
+                 scenes: list["Scene | SceneFactory"],
+                 loading_scene: "Scene | SceneFactory | None" = None,
+                 asset_workers: int = 4,
+                 asset_budget_ms: float = 4,
+                 asset_memory_budget: int = 256 * 1024 * 1024,
+                 asset_pack: str | None = None,
+                 dirty_rects: bool = False,
+                 simulation_rate: int = 60,
+                 max_updates_per_frame: int = 5,
+                 frame_rate: int | None = 60,
+                 vsync: bool = False,
+                 headless: bool = False,
+                 max_frames: int | None = None,
+                 record_input: str | None = None,
+                 replay_input: str | None = None,
+                 profiling: bool = False,
+                 trace_filename: str | None = None,
+                 startup_trace: bool = False,
+                 startup_trace_filename: str | None = None):
         self.title = title
         self.scenes = scenes
+        self.loading_scene = loading_scene
+        self.asset_workers = asset_workers
+        self.asset_budget_ms = asset_budget_ms
+        self.asset_memory_budget = asset_memory_budget
+        self.asset_pack = asset_pack
+        self.dirty_rects = dirty_rects
+        self.simulation_rate = simulation_rate
+        self.simulation_step = 1000 / simulation_rate
+        self.max_updates_per_frame = max_updates_per_frame
+        self.frame_rate = frame_rate
+        self.vsync = vsync
+        self.headless = headless
+        self.max_frames = max_frames
+        self.record_input = record_input
+        self.replay_input = replay_input
+        self.profiling = profiling
+        self.trace_filename = trace_filename
+        self.startup_trace = startup_trace
+        self.startup_trace_filename = startup_trace_filename
@@ -1,21 +1,42 @@
 from .. import pygame
-from .key_utils import create_key_tracking_dict
+from .key_utils import KeyState, create_keys_pressed
+from ..profiling import Profiler
+from ..assets import Asset, AssetManager
+from ..events import EventBus
+from ..inputs.source import JoystickState
+from ..timing import Scheduler
 
 
 class GameState:
     def __init__(self, screen: pygame.Surface):
-        # run flag
+        # run flags
         self.running = True
+        self.headless = False
+        self.frame_count = 0
+        self.update_count = 0
         
         # pygame internals
         self.screen = screen
         self.clock = pygame.time.Clock()
         self.events = list[pygame.event.Event]()
+        self.profiler = Profiler(enabled=False)
+
+        # dirty rect rendering
+        self.dirty_rects_enabled = False
+        self.full_redraw = True
+        self.background: pygame.Surface | None = None
+        self.dirty_rects = list[pygame.Rect]()
+        self.previous_dirty_rects = list[pygame.Rect]()
 
         # key tracking
-        self.keys_pressed = create_key_tracking_dict()
-        self.keys_down = create_key_tracking_dict()
-        self.keys_up = create_key_tracking_dict()
+        self.keys = KeyState()
+        self.keys_pressed = create_keys_pressed()
+        self.keys_down = self.keys.down
+        self.keys_up = self.keys.up
+        self.input_consumed = False
+
+        # joystick snapshots, polled with the keyboard so recordings capture them
+        self.joysticks = tuple[JoystickState, ...]()
 
         # unescaled timer
         self.unscaled_current_ticks = 0
@@ -29,10 +50,26 @@ class GameState:
         self.paused = False
         self.pause_started_at = 0
 
+        # fixed timestep simulation
+        self.simulation_accumulator = 0.0
+        self.simulation_steps = 0
+        self.interpolation_alpha = 1.0
+        self.loading_hitch = False
+
         # scene management
+        self.scene_count = 0
         self.current_scene_idx = 0
         self.current_scene_started = 0
         self.next_scene_idx = None
         self.previous_scene_idx = None
         self.entering_scene = True
         self.exiting_scene = False
+
+        # asset loading
+        self.assets = AssetManager()
+        self.loading = False
+        self.scene_dependencies = dict[int, list[Asset]]()
+
+        # events, timers and tweens of the current scene
+        self.bus = EventBus()
+        self.scheduler = Scheduler()
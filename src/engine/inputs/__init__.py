@@ -0,0 +1,22 @@
+import importlib
+
+from .source import FrameInput, InputSource, JoystickState, LiveInputSource
+
+# recording, replaying and action maps are imported on first use, as most runs need none of them
+_LAZY_ATTRIBUTES = {
+    "InputRecorder": ".recording",
+    "InputPlayer": ".recording",
+    "ActionMap": ".actions",
+    "ActionMapData": ".actions",
+    "load_action_map": ".actions",
+}
+
+__all__ = ["FrameInput", "InputSource", "JoystickState", "LiveInputSource", *_LAZY_ATTRIBUTES]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,210 @@
+import json
+
+from .. import pygame
+from ..resources.json import load_json_resource
+from ..game.context.game import GameContext
+
+DEFAULT_BUFFER_MS = 0
+DEFAULT_AXIS_THRESHOLD = 0.5
+NEVER = float("-inf")
+
+
+def load_action_map(context: GameContext, filename: str):
+    data_dict = load_json_resource(filename)
+    return ActionMap(context, ActionMapData(**data_dict))
+
+
+class ActionMapData:
+    def __init__(self, actions: dict[str, dict], axes: dict[str, list[str]] | None = None, buffer_ms: float = DEFAULT_BUFFER_MS, axis_threshold: float = DEFAULT_AXIS_THRESHOLD):
+        self.actions = actions
+        self.axes = axes or {}
+        self.buffer_ms = buffer_ms
+        self.axis_threshold = axis_threshold
+
+    def to_dict(self):
+        return {
+            "buffer_ms": self.buffer_ms,
+            "axis_threshold": self.axis_threshold,
+            "actions": self.actions,
+            "axes": self.axes,
+        }
+
+
+class ActionMap:
+    def __init__(self, context: GameContext, data: ActionMapData):
+        self.context = context
+        self.data = data
+
+        # every action owns one bit, so sets of actions are plain int masks
+        self.bits = {name: 1 << i for i, name in enumerate(data.actions)}
+        self.action_count = len(self.bits)
+        self.compile()
+
+        # state resolved once per update step
+        self.resolved_update = None
+        self.pressed_mask = 0
+        self.down_mask = 0
+        self.up_mask = 0
+        self.gamepad_mask = 0
+        self.values = [0.0] * self.action_count
+        self.down_at = [NEVER] * self.action_count
+        self.consumed_update = [None] * self.action_count
+
+    def compile(self):
+        # flatten the bindings into (code, bit) pairs so resolving is a few tight loops
+        self.key_bindings = list[tuple[int, int]]()
+        self.button_bindings = list[tuple[int, int]]()
+        self.axis_bindings = list[tuple[int, int, int]]()
+        self.hat_bindings = list[tuple[int, int, int, int]]()
+        for name, binding in self.data.actions.items():
+            bit = self.bits[name]
+            for key_name in binding.get("keys", []):
+                self.key_bindings.append((pygame.key.key_code(key_name), bit))
+            for button in binding.get("buttons", []):
+                self.button_bindings.append((button, bit))
+            for axis in binding.get("axes", []):
+                self.axis_bindings.append((axis["axis"], axis["direction"], bit.bit_length() - 1))
+            for hat in binding.get("hats", []):
+                self.hat_bindings.append((hat["hat"], hat.get("x", 0), hat.get("y", 0), bit))
+
+        self.axis_masks = {name: (self.bits[negative], self.bits[positive]) for name, (negative, positive) in self.data.axes.items()}
+        self.resolved_update = None
+
+    def resolve(self):
+        context = self.context
+        self.resolved_update = context.get_update_count()
+
+        # keyboard
+        keys_pressed = context.get_keys_pressed()
+        keys_down = context.get_keys_down()
+        keys_up = context.get_keys_up()
+        pressed = down = up = 0
+        for key, bit in self.key_bindings:
+            if keys_pressed[key]:
+                pressed |= bit
+            if keys_down[key]:
+                down |= bit
+            if keys_up[key]:
+                up |= bit
+
+        # gamepads come as snapshots taken with the frame input, so their edges come from
+        # the previous step and recordings replay them
+        values = self.values
+        for i in range(self.action_count):
+            values[i] = 0.0
+        gamepad = 0
+        for joystick in context.get_joysticks():
+            buttons, axes, hats = joystick.buttons, joystick.axes, joystick.hats
+            for button, bit in self.button_bindings:
+                if button < len(buttons) and buttons[button]:
+                    gamepad |= bit
+            for axis, direction, idx in self.axis_bindings:
+                if axis < len(axes):
+                    value = axes[axis] * direction
+                    if value >= self.data.axis_threshold:
+                        gamepad |= 1 << idx
+                        values[idx] = max(values[idx], value)
+            for hat, x, y, bit in self.hat_bindings:
+                if hat < len(hats):
+                    hat_x, hat_y = hats[hat]
+                    if (x == 0 or hat_x == x) and (y == 0 or hat_y == y):
+                        gamepad |= bit
+        down |= gamepad & ~self.gamepad_mask
+        up |= self.gamepad_mask & ~gamepad
+        self.gamepad_mask = gamepad
+        pressed |= gamepad
+
+        self.pressed_mask = pressed
+        self.down_mask = down
+        self.up_mask = up
+
+        # digital bindings always count as fully pressed, analog ones keep their strength
+        ticks = context.get_current_ticks()
+        for i in range(self.action_count):
+            bit = 1 << i
+            if pressed & bit and values[i] == 0.0:
+                values[i] = 1.0
+            if down & bit:
+                self.down_at[i] = ticks
+
+    def ensure_resolved(self):
+        if self.resolved_update != self.context.get_update_count():
+            self.resolve()
+
+    def mask(self, *names: str) -> int:
+        result = 0
+        for name in names:
+            result |= self.bits[name]
+        return result
+
+    def is_pressed(self, name: str) -> bool:
+        self.ensure_resolved()
+        return self.pressed_mask & self.bits[name] != 0
+
+    def is_down(self, name: str) -> bool:
+        self.ensure_resolved()
+        return self.down_mask & self.bits[name] != 0
+
+    def is_up(self, name: str) -> bool:
+        self.ensure_resolved()
+        return self.up_mask & self.bits[name] != 0
+
+    def is_any_pressed(self, mask: int) -> bool:
+        self.ensure_resolved()
+        return self.pressed_mask & mask != 0
+
+    def is_any_down(self, mask: int) -> bool:
+        self.ensure_resolved()
+        return self.down_mask & mask != 0
+
+    def is_any_up(self, mask: int) -> bool:
+        self.ensure_resolved()
+        return self.up_mask & mask != 0
+
+    def get_value(self, name: str) -> float:
+        self.ensure_resolved()
+        return self.values[self.bits[name].bit_length() - 1]
+
+    def get_axis(self, name: str) -> float:
+        negative, positive = self.axis_masks[name]
+        self.ensure_resolved()
+        values = self.values
+        return values[positive.bit_length() - 1] - values[negative.bit_length() - 1]
+
+    def is_buffered(self, name: str) -> bool:
+        # a press stays usable for a short window, so early inputs are not lost
+        self.ensure_resolved()
+        down_at = self.down_at[self.bits[name].bit_length() - 1]
+        return self.context.get_current_ticks() - down_at <= self.data.buffer_ms
+
+    def consume(self, name: str) -> bool:
+        # a buffered press is used once, but every check within the step that used it sees it
+        idx = self.bits[name].bit_length() - 1
+        update = self.context.get_update_count()
+        if self.consumed_update[idx] == update:
+            return True
+        if not self.is_buffered(name):
+            return False
+        self.down_at[idx] = NEVER
+        self.consumed_update[idx] = update
+        return True
+
+    def bind(self, name: str, key: str | None = None, button: int | None = None):
+        binding = self.data.actions[name]
+        if key is not None and key not in binding.setdefault("keys", []):
+            binding["keys"].append(key)
+        if button is not None and button not in binding.setdefault("buttons", []):
+            binding["buttons"].append(button)
+        self.compile()
+
+    def unbind(self, name: str, key: str | None = None, button: int | None = None):
+        binding = self.data.actions[name]
+        if key is not None and key in binding.get("keys", []):
+            binding["keys"].remove(key)
+        if button is not None and button in binding.get("buttons", []):
+            binding["buttons"].remove(button)
+        self.compile()
+
+    def save(self, filename: str):
+        with open(filename, "w") as file:
+            json.dump({"$schema": "./_schema.json", **self.data.to_dict()}, file, indent=2)
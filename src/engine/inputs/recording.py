@@ -0,0 +1,145 @@
+import struct
+
+from .. import pygame
+from .source import FrameInput, InputSource, JoystickState
+
+# log layout: a header, then one record per frame with its ticks, optional snapshots
+# of the pressed keys and of the joysticks (each only when it changed) and the frame's events
+LOG_MAGIC = b"DRIN"
+LOG_VERSION = 2
+LOG_HEADER = struct.Struct("<4sH")
+FRAME_HEADER = struct.Struct("<dBH")
+EVENT_HEADER = struct.Struct("<HiHIB")
+JOYSTICK_COUNT = struct.Struct("<B")
+JOYSTICK_HEADER = struct.Struct("<BBB")
+FRAME_KEYS_CHANGED = 1
+FRAME_JOYSTICKS_CHANGED = 2
+KEY_COUNT = 512
+KEY_STATE_SIZE = KEY_COUNT // 8
+
+RECORDED_EVENT_TYPES = (pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP)
+
+
+def pack_keys(keys_pressed) -> bytes:
+    packed = bytearray(KEY_STATE_SIZE)
+    for scancode, pressed in enumerate(keys_pressed):
+        if pressed and scancode < KEY_COUNT:
+            packed[scancode >> 3] |= 1 << (scancode & 7)
+    return bytes(packed)
+
+
+def unpack_keys(packed: bytes) -> pygame.key.ScancodeWrapper:
+    return pygame.key.ScancodeWrapper(bool(packed[scancode >> 3] & (1 << (scancode & 7))) for scancode in range(KEY_COUNT))
+
+
+def pack_joysticks(joysticks: tuple[JoystickState, ...]) -> bytes:
+    # axes keep their full precision, so replays resolve the same analog values
+    packed = bytearray(JOYSTICK_COUNT.pack(len(joysticks)))
+    for joystick in joysticks:
+        packed += JOYSTICK_HEADER.pack(len(joystick.buttons), len(joystick.axes), len(joystick.hats))
+        packed += bytes(joystick.buttons)
+        packed += struct.pack(f"<{len(joystick.axes)}d", *joystick.axes)
+        packed += struct.pack(f"<{2 * len(joystick.hats)}b", *(value for hat in joystick.hats for value in hat))
+    return bytes(packed)
+
+
+def unpack_joysticks(data: bytes, offset: int) -> tuple[tuple[JoystickState, ...], int]:
+    joysticks = list[JoystickState]()
+    count, = JOYSTICK_COUNT.unpack_from(data, offset)
+    offset += JOYSTICK_COUNT.size
+    for _ in range(count):
+        button_count, axis_count, hat_count = JOYSTICK_HEADER.unpack_from(data, offset)
+        offset += JOYSTICK_HEADER.size
+        buttons = tuple(bool(button) for button in data[offset:offset + button_count])
+        offset += button_count
+        axes = struct.unpack_from(f"<{axis_count}d", data, offset)
+        offset += 8 * axis_count
+        hat_values = struct.unpack_from(f"<{2 * hat_count}b", data, offset)
+        offset += 2 * hat_count
+        joysticks.append(JoystickState(buttons, axes, tuple(zip(hat_values[::2], hat_values[1::2]))))
+    return tuple(joysticks), offset
+
+
+def pack_event(event: pygame.event.Event) -> bytes:
+    unicode = getattr(event, "unicode", "").encode("utf-8")[:255]
+    header = EVENT_HEADER.pack(event.type, getattr(event, "key", 0), getattr(event, "mod", 0), getattr(event, "scancode", 0), len(unicode))
+    return header + unicode
+
+
+class InputRecorder(InputSource):
+    def __init__(self, source: InputSource, filename: str):
+        self.source = source
+        self.file = open(filename, "wb")
+        self.file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+        self.previous_keys = None
+        self.previous_joysticks = pack_joysticks(())
+
+    def poll(self) -> FrameInput:
+        frame = self.source.poll()
+
+        keys = pack_keys(frame.keys_pressed)
+        joysticks = pack_joysticks(frame.joysticks)
+        flags = FRAME_KEYS_CHANGED if keys != self.previous_keys else 0
+        if joysticks != self.previous_joysticks:
+            flags |= FRAME_JOYSTICKS_CHANGED
+        events = [event for event in frame.events if event.type in RECORDED_EVENT_TYPES]
+
+        self.file.write(FRAME_HEADER.pack(frame.ticks, flags, len(events)))
+        if flags & FRAME_KEYS_CHANGED:
+            self.file.write(keys)
+            self.previous_keys = keys
+        if flags & FRAME_JOYSTICKS_CHANGED:
+            self.file.write(joysticks)
+            self.previous_joysticks = joysticks
+        for event in events:
+            self.file.write(pack_event(event))
+        return frame
+
+    def close(self):
+        self.file.close()
+        self.source.close()
+
+
+class InputPlayer(InputSource):
+    def __init__(self, filename: str):
+        with open(filename, "rb") as file:
+            self.data = file.read()
+        magic, version = LOG_HEADER.unpack_from(self.data, 0)
+        if magic != LOG_MAGIC or version != LOG_VERSION:
+            raise ValueError(f"{filename} is not a version {LOG_VERSION} input log")
+        self.offset = LOG_HEADER.size
+        self.keys_pressed = unpack_keys(bytes(KEY_STATE_SIZE))
+        self.joysticks = tuple[JoystickState, ...]()
+        self.ticks = 0.0
+
+    @property
+    def is_finished(self):
+        return self.offset >= len(self.data)
+
+    def poll(self) -> FrameInput:
+        # once the log runs out the game is asked to quit
+        if self.is_finished:
+            return FrameInput(self.ticks, self.keys_pressed, [pygame.event.Event(pygame.QUIT)], self.joysticks)
+
+        self.ticks, flags, event_count = FRAME_HEADER.unpack_from(self.data, self.offset)
+        self.offset += FRAME_HEADER.size
+        if flags & FRAME_KEYS_CHANGED:
+            self.keys_pressed = unpack_keys(self.data[self.offset:self.offset + KEY_STATE_SIZE])
+            self.offset += KEY_STATE_SIZE
+        if flags & FRAME_JOYSTICKS_CHANGED:
+            self.joysticks, self.offset = unpack_joysticks(self.data, self.offset)
+
+        events = []
+        for _ in range(event_count):
+            event_type, key, mod, scancode, unicode_length = EVENT_HEADER.unpack_from(self.data, self.offset)
+            self.offset += EVENT_HEADER.size
+            unicode = self.data[self.offset:self.offset + unicode_length].decode("utf-8")
+            self.offset += unicode_length
+            if event_type == pygame.QUIT:
+                events.append(pygame.event.Event(event_type))
+            else:
+                events.append(pygame.event.Event(event_type, key=key, mod=mod, scancode=scancode, unicode=unicode))
+
+        # live input is ignored while replaying, except for closing the window
+        events.extend(event for event in pygame.event.get() if event.type == pygame.QUIT)
+        return FrameInput(self.ticks, self.keys_pressed, events, self.joysticks)
@@ -0,0 +1,60 @@
+from abc import ABC, abstractmethod
+
+from .. import pygame
+from ..time_source import SystemTimeSource, VirtualTimeSource
+
+JOYSTICK_DEVICE_EVENTS = (pygame.JOYDEVICEADDED, pygame.JOYDEVICEREMOVED)
+
+
+class JoystickState:
+    def __init__(self, buttons: tuple[bool, ...], axes: tuple[float, ...], hats: tuple[tuple[int, int], ...]):
+        # a snapshot of one joystick, taken once per frame like the keyboard
+        self.buttons = buttons
+        self.axes = axes
+        self.hats = hats
+
+
+def read_joystick(joystick: pygame.joystick.JoystickType) -> JoystickState:
+    return JoystickState(
+        tuple(bool(joystick.get_button(i)) for i in range(joystick.get_numbuttons())),
+        tuple(joystick.get_axis(i) for i in range(joystick.get_numaxes())),
+        tuple(joystick.get_hat(i) for i in range(joystick.get_numhats())),
+    )
+
+
+class FrameInput:
+    def __init__(self, ticks: float, keys_pressed: pygame.key.ScancodeWrapper, events: list[pygame.event.Event], joysticks: tuple[JoystickState, ...] = ()):
+        self.ticks = ticks
+        self.keys_pressed = keys_pressed
+        self.events = events
+        self.joysticks = joysticks
+
+
+class InputSource(ABC):
+    @abstractmethod
+    def poll(self) -> FrameInput:
+        pass
+
+    def close(self):
+        pass
+
+
+class LiveInputSource(InputSource):
+    def __init__(self, time_source: SystemTimeSource | VirtualTimeSource):
+        self.time_source = time_source
+        # opened on the first poll, once pygame is initialized, and again when devices change
+        self.joysticks = None
+
+    def poll(self) -> FrameInput:
+        self.time_source.advance()
+        ticks = self.time_source.get_ticks()
+        keys_pressed = pygame.key.get_pressed()
+        events = pygame.event.get()
+        if self.joysticks is None or any(event.type in JOYSTICK_DEVICE_EVENTS for event in events):
+            self.refresh_joysticks()
+        return FrameInput(ticks, keys_pressed, events, tuple(read_joystick(joystick) for joystick in self.joysticks))
+
+    def refresh_joysticks(self):
+        self.joysticks = list[pygame.joystick.JoystickType]()
+        if pygame.joystick.get_init():
+            self.joysticks.extend(pygame.joystick.Joystick(i) for i in range(pygame.joystick.get_count()))
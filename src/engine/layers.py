@@ -0,0 +1,28 @@
+from typing import Any, Callable
+
+from . import pygame
+from .pygame import Surface
+
+
+class CachedLayer:
+    def __init__(self, size: tuple[int, int]):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.key = None
+        self.valid = False
+        self.render_count = 0
+
+    def update(self, key: Any, render: Callable[..., None], *args) -> Surface:
+        # re-render only when the inputs the layer depends on change
+        if not self.valid or key != self.key:
+            self.surface.fill((0, 0, 0, 0))
+            render(self.surface, *args)
+            self.key = key
+            self.valid = True
+            self.render_count += 1
+        return self.surface
+
+    def invalidate(self):
+        self.valid = False
+
+    def get_size(self):
+        return self.surface.get_size()
@@ -0,0 +1,109 @@
+import json
+from array import array
+from collections import deque
+from time import perf_counter_ns
+
+from . import pygame
+
+PHASES = ("input", "update", "draw", "present", "wait")
+PHASE_COLORS = ("#4a90d9", "#50c878", "#f5a623", "#d0021b", "#555555")
+DEFAULT_CAPACITY = 600
+DEFAULT_ZONE_CAPACITY = DEFAULT_CAPACITY * 32
+
+OVERLAY_KEY = pygame.K_F3
+EXPORT_KEY = pygame.K_F4
+
+
+class NullZone:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+NULL_ZONE = NullZone()
+
+
+class Zone:
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.begin(self.name)
+        return self
+
+    def __exit__(self, *args):
+        self.profiler.end()
+        return False
+
+
+class Profiler:
+    def __init__(self, enabled: bool = True, capacity: int = DEFAULT_CAPACITY, zone_capacity: int = DEFAULT_ZONE_CAPACITY):
+        self.enabled = enabled
+        self.capacity = capacity
+
+        # per frame timings, stored in preallocated ring buffers
+        self.frame_times = array("q", bytes(8 * capacity))
+        self.phase_times = {phase: array("q", bytes(8 * capacity)) for phase in PHASES}
+        self.frame_idx = 0
+        self.frame_count = 0
+        self.frame_started_at = 0
+
+        # completed zones as (name, started_at, duration, depth) for trace export
+        self.zones = deque(maxlen=zone_capacity)
+        self.zone_stack = list[tuple[str, int]]()
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_started_at = perf_counter_ns()
+        for phase in PHASES:
+            self.phase_times[phase][self.frame_idx] = 0
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.frame_times[self.frame_idx] = perf_counter_ns() - self.frame_started_at
+        self.frame_idx = (self.frame_idx + 1) % self.capacity
+        self.frame_count += 1
+
+    def begin(self, name: str):
+        if self.enabled:
+            self.zone_stack.append((name, perf_counter_ns()))
+
+    def end(self):
+        if not self.enabled or not self.zone_stack:
+            return
+        name, started_at = self.zone_stack.pop()
+        duration = perf_counter_ns() - started_at
+        self.zones.append((name, started_at, duration, len(self.zone_stack)))
+        if name in self.phase_times and not self.zone_stack:
+            self.phase_times[name][self.frame_idx] += duration
+
+    def zone(self, name: str) -> Zone | NullZone:
+        return Zone(self, name) if self.enabled else NULL_ZONE
+
+    def get_recent_frame_times(self, count: int | None = None) -> list[int]:
+        available = min(self.frame_count, self.capacity)
+        count = available if count is None else min(count, available)
+        return [self.frame_times[(self.frame_idx - count + i) % self.capacity] for i in range(count)]
+
+    def get_percentile(self, percentile: float) -> int:
+        times = sorted(self.get_recent_frame_times())
+        if not times:
+            return 0
+        return times[min(int(len(times) * percentile / 100), len(times) - 1)]
+
+    def get_fps(self) -> float:
+        times = self.get_recent_frame_times(60)
+        return len(times) * 1_000_000_000 / sum(times) if times and sum(times) else 0.0
+
+    def export_chrome_trace(self, filename: str):
+        events = [
+            {"name": name, "ph": "X", "ts": started_at / 1000, "dur": duration / 1000, "pid": 0, "tid": 0, "args": {"depth": depth}}
+            for name, started_at, duration, depth in self.zones
+        ]
+        with open(filename, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
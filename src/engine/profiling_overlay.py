@@ -0,0 +1,64 @@
+from . import pygame
+from . import text
+from .assets import AssetManager
+from .profiling import Profiler, PHASES, PHASE_COLORS
+
+# the overlay is only imported by games that profile, as it needs text rendering
+OVERLAY_GRAPH_FRAMES = 320
+OVERLAY_GRAPH_HEIGHT = 120
+OVERLAY_GRAPH_BUDGET_NS = 33_333_333
+OVERLAY_PADDING = 8
+
+
+class ProfilerOverlay:
+    def __init__(self, profiler: Profiler, assets: AssetManager | None = None):
+        self.profiler = profiler
+        self.assets = assets
+        self.visible = False
+        font = pygame.font.Font(None, 22)
+        self.text = text.TextRenderer(font, "white")
+        self.phase_texts = [text.TextRenderer(font, color) for color in PHASE_COLORS]
+        self.surface = pygame.Surface((OVERLAY_GRAPH_FRAMES + 2 * OVERLAY_PADDING, OVERLAY_GRAPH_HEIGHT + 5 * self.text.height + 3 * OVERLAY_PADDING), pygame.SRCALPHA)
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def draw(self, screen: pygame.Surface) -> pygame.Rect | None:
+        if not self.visible:
+            return None
+
+        profiler = self.profiler
+        surface = self.surface
+        surface.fill((0, 0, 0, 180))
+
+        # summary texts
+        lines = [
+            f"FPS {profiler.get_fps():.1f}",
+            f"p50 {profiler.get_percentile(50) / 1_000_000:.2f} ms",
+            f"p99 {profiler.get_percentile(99) / 1_000_000:.2f} ms",
+        ]
+        if self.assets is not None:
+            lines.append(f"assets {self.assets.get_hit_rate() * 100:.0f}% hit, {self.assets.bytes_resident / 1_048_576:.1f} MB")
+        for i, line in enumerate(lines):
+            surface.blit(self.text.render(line), (OVERLAY_PADDING, OVERLAY_PADDING + i * self.text.height))
+
+        # legend with the color of every phase
+        legend_left = OVERLAY_PADDING
+        for phase, phase_text in zip(PHASES, self.phase_texts):
+            legend_rect = surface.blit(phase_text.render(phase), (legend_left, OVERLAY_PADDING + len(lines) * self.text.height))
+            legend_left = legend_rect.right + OVERLAY_PADDING
+
+        # stacked bars with the time every phase took on recent frames
+        graph_bottom = surface.get_height() - OVERLAY_PADDING
+        frame_count = min(profiler.frame_count, profiler.capacity, OVERLAY_GRAPH_FRAMES)
+        for i in range(frame_count):
+            frame_idx = (profiler.frame_idx - frame_count + i) % profiler.capacity
+            top = graph_bottom
+            for phase, color in zip(PHASES, PHASE_COLORS):
+                height = profiler.phase_times[phase][frame_idx] * OVERLAY_GRAPH_HEIGHT // OVERLAY_GRAPH_BUDGET_NS
+                height = min(height, top - (graph_bottom - OVERLAY_GRAPH_HEIGHT))
+                if height > 0:
+                    pygame.draw.line(surface, color, (OVERLAY_PADDING + i, top - 1), (OVERLAY_PADDING + i, top - height))
+                    top -= height
+
+        return screen.blit(surface, (OVERLAY_PADDING, OVERLAY_PADDING))
@@ -0,0 +1,116 @@
+import numpy as np
+
+from . import pygame
+
+DEFAULT_CAPACITY = 8192
+
+# every projectile field lives in its own array, with the live ones packed at the front.
+# the position before the last update is kept, so drawing can interpolate between the two
+FIELDS = ("x", "y", "previous_x", "previous_y", "vx", "vy", "age", "lifetime", "radius", "spin", "acceleration")
+
+
+class ProjectileSystem:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, bounds: tuple[float, float, float, float] = (0.0, 0.0, 1.0, 1.0)):
+        self.capacity = capacity
+        self.count = 0
+        self.bounds = bounds
+        for field in FIELDS:
+            setattr(self, field, np.zeros(capacity, dtype=np.float32))
+
+    def spawn(self, x, y, vx, vy, lifetime, radius, spin=0.0, acceleration=0.0) -> int:
+        # accepts scalars or arrays, so whole patterns are spawned in one call
+        x, y, vx, vy, lifetime, radius, spin, acceleration = np.broadcast_arrays(x, y, vx, vy, lifetime, radius, spin, acceleration)
+        amount = min(x.size, self.capacity - self.count)
+        if amount <= 0:
+            return 0
+        start, end = self.count, self.count + amount
+        self.x[start:end] = x.ravel()[:amount]
+        self.y[start:end] = y.ravel()[:amount]
+        self.previous_x[start:end] = self.x[start:end]
+        self.previous_y[start:end] = self.y[start:end]
+        self.vx[start:end] = vx.ravel()[:amount]
+        self.vy[start:end] = vy.ravel()[:amount]
+        self.age[start:end] = 0
+        self.lifetime[start:end] = lifetime.ravel()[:amount]
+        self.radius[start:end] = radius.ravel()[:amount]
+        self.spin[start:end] = spin.ravel()[:amount]
+        self.acceleration[start:end] = acceleration.ravel()[:amount]
+        self.count = end
+        return amount
+
+    def spawn_ring(self, x: float, y: float, amount: int, speed: float, lifetime: float, radius: float, angle: float = 0.0, spin: float = 0.0, acceleration: float = 0.0) -> int:
+        angles = angle + np.arange(amount, dtype=np.float32) * (2 * np.pi / amount)
+        return self.spawn(x, y, np.cos(angles) * speed, np.sin(angles) * speed, lifetime, radius, spin, acceleration)
+
+    def spawn_aimed(self, x: float, y: float, target_x: float, target_y: float, amount: int, spread: float, speed: float, lifetime: float, radius: float) -> int:
+        # a fan of projectiles centered on the direction to the target
+        angle = np.arctan2(target_y - y, target_x - x)
+        offsets = np.linspace(-spread / 2, spread / 2, amount, dtype=np.float32) if amount > 1 else np.zeros(1, dtype=np.float32)
+        angles = angle + offsets
+        return self.spawn(x, y, np.cos(angles) * speed, np.sin(angles) * speed, lifetime, radius)
+
+    def update(self, dt: float):
+        n = self.count
+        if n == 0:
+            return
+        x, y, vx, vy = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n]
+        self.previous_x[:n] = x
+        self.previous_y[:n] = y
+
+        # spinning projectiles turn their velocity, accelerating ones scale it
+        spin = self.spin[:n] * dt
+        cos, sin = np.cos(spin), np.sin(spin)
+        scale = 1 + self.acceleration[:n] * dt
+        vx[:], vy[:] = (vx * cos - vy * sin) * scale, (vx * sin + vy * cos) * scale
+
+        x += vx * dt
+        y += vy * dt
+        self.age[:n] += dt
+
+        left, top, right, bottom = self.bounds
+        radius = self.radius[:n]
+        alive = (self.age[:n] < self.lifetime[:n]) & (x + radius >= left) & (x - radius <= right) & (y + radius >= top) & (y - radius <= bottom)
+        self.keep(alive)
+
+    def keep(self, alive: np.ndarray):
+        # packs the surviving projectiles to the front of every array
+        n = self.count
+        survivors = int(np.count_nonzero(alive))
+        if survivors == n:
+            return
+        for field in FIELDS:
+            array = getattr(self, field)
+            array[:survivors] = array[:n][alive]
+        self.count = survivors
+
+    def collide_circle(self, x: float, y: float, radius: float) -> np.ndarray:
+        n = self.count
+        dx = self.x[:n] - x
+        dy = self.y[:n] - y
+        reach = self.radius[:n] + radius
+        return dx * dx + dy * dy <= reach * reach
+
+    def remove(self, mask: np.ndarray):
+        self.keep(~mask)
+
+    def clear(self):
+        self.count = 0
+
+    def draw(self, surface: pygame.Surface, rect: pygame.Rect, image: pygame.Surface, alpha: float = 1.0):
+        # projectiles live in the 0..1 space of the rect, and share one pre-rendered image.
+        # alpha places them between their previous and current positions, like the rest of the scene
+        n = self.count
+        if n == 0:
+            return
+        x, y = self.x[:n], self.y[:n]
+        if alpha != 1.0:
+            previous_x, previous_y = self.previous_x[:n], self.previous_y[:n]
+            x = previous_x + (x - previous_x) * alpha
+            y = previous_y + (y - previous_y) * alpha
+        half_width, half_height = image.get_width() // 2, image.get_height() // 2
+        xs = (rect.left + x * rect.width).astype(np.int32) - half_width
+        ys = (rect.top + y * rect.height).astype(np.int32) - half_height
+        clip = surface.get_clip()
+        surface.set_clip(rect)
+        surface.blits([(image, position) for position in zip(xs.tolist(), ys.tolist())], doreturn=False)
+        surface.set_clip(clip)
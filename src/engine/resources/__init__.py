@@ -1,2 +1,3 @@
 from . import resolution
-from .json import load_json_resource
\ No newline at end of file
+from .json import load_json_resource
+from . import pack
@@ -1,8 +1,15 @@
 import json
 
+from .pack import get_pack, normalize_path
+
 
 def load_json_resource(filename: str):
+    # packed json is stored as compact text without its schema, and parsed from the mapped pack
+    pack = get_pack()
+    if pack is not None and normalize_path(filename) in pack:
+        return pack.load_json(normalize_path(filename))
+
     with open(filename) as file:
         result = json.load(file)
         del result["$schema"]
-        return result
\ No newline at end of file
+        return result
@@ -0,0 +1,175 @@
+import io
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+# pack layout: a header, an index with the kind, location and image size of every
+# entry keyed by its path under assets/, then the entry data aligned to 16 bytes.
+# images hold raw pixels ready for pygame.image.frombuffer, json entries are
+# stored compact, without whitespace or schema, and anything else (fonts, audio) is kept as is.
+# version 1 packs pickled their json, and are no longer read
+DEFAULT_PACK = "assets.pack"
+PACK_MAGIC = b"DRPK"
+PACK_VERSION = 2
+PACK_HEADER = struct.Struct("<4sHI")
+PACK_ENTRY = struct.Struct("<BHQQHH")
+PACK_ALIGNMENT = 16
+
+ENTRY_BYTES = 0
+ENTRY_IMAGE_RGB = 1
+ENTRY_IMAGE_RGBA = 2
+ENTRY_JSON = 3
+
+IMAGE_FORMATS = {ENTRY_IMAGE_RGB: "RGB", ENTRY_IMAGE_RGBA: "RGBA"}
+
+
+class PackEntry:
+    def __init__(self, kind: int, offset: int, size: int, width: int = 0, height: int = 0):
+        self.kind = kind
+        self.offset = offset
+        self.size = size
+        self.width = width
+        self.height = height
+
+
+class AssetPack:
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = open(filename, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.data)
+        self.entries = dict[str, PackEntry]()
+
+        magic, version, entry_count = PACK_HEADER.unpack_from(self.data, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError(f"{filename} is not a version {PACK_VERSION} asset pack")
+        offset = PACK_HEADER.size
+        for _ in range(entry_count):
+            kind, path_length, data_offset, size, width, height = PACK_ENTRY.unpack_from(self.data, offset)
+            offset += PACK_ENTRY.size
+            path = bytes(self.view[offset:offset + path_length]).decode("utf-8")
+            offset += path_length
+            self.entries[path] = PackEntry(kind, data_offset, size, width, height)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.entries
+
+    def get_buffer(self, path: str) -> memoryview:
+        # a view into the mapped file, nothing is copied
+        entry = self.entries[path]
+        return self.view[entry.offset:entry.offset + entry.size]
+
+    def load_image(self, path: str) -> pygame.Surface:
+        entry = self.entries[path]
+        return pygame.image.frombuffer(self.get_buffer(path), (entry.width, entry.height), IMAGE_FORMATS[entry.kind])
+
+    def load_json(self, path: str):
+        return json.loads(bytes(self.get_buffer(path)))
+
+    def open(self, path: str) -> io.BytesIO:
+        return io.BytesIO(self.get_buffer(path))
+
+    def close(self):
+        self.entries.clear()
+        try:
+            self.view.release()
+            self.data.close()
+        except BufferError:
+            # surfaces made from the pack still point into it, so the mapping goes with the last of them
+            pass
+        self.file.close()
+
+
+def write_pack(filename: str, entries: list[tuple[str, int, bytes, int, int]]):
+    # entries are (path, kind, data, width, height)
+    index_size = PACK_HEADER.size + sum(PACK_ENTRY.size + len(path.encode("utf-8")) for path, *_ in entries)
+    offset = align(index_size)
+    offsets = list[int]()
+    for _, _, data, _, _ in entries:
+        offsets.append(offset)
+        offset = align(offset + len(data))
+
+    with open(filename, "wb") as file:
+        file.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(entries)))
+        for (path, kind, data, width, height), data_offset in zip(entries, offsets):
+            encoded = path.encode("utf-8")
+            file.write(PACK_ENTRY.pack(kind, len(encoded), data_offset, len(data), width, height) + encoded)
+        for (_, _, data, _, _), data_offset in zip(entries, offsets):
+            file.write(bytes(data_offset - file.tell()))
+            file.write(data)
+
+
+def align(offset: int) -> int:
+    return (offset + PACK_ALIGNMENT - 1) // PACK_ALIGNMENT * PACK_ALIGNMENT
+
+
+_pack: AssetPack | None = None
+
+
+def mount_pack(filename: str = DEFAULT_PACK) -> AssetPack | None:
+    # without a pack every resource is read from its loose file
+    global _pack
+    unmount_pack()
+    if os.path.exists(filename):
+        _pack = AssetPack(filename)
+    return _pack
+
+
+def unmount_pack():
+    global _pack
+    if _pack is not None:
+        _pack.close()
+        _pack = None
+
+
+def get_pack() -> AssetPack | None:
+    return _pack
+
+
+def normalize_path(path: str) -> str:
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def has_resource(path: str) -> bool:
+    return (_pack is not None and normalize_path(path) in _pack) or os.path.exists(path)
+
+
+def load_image_resource(path: str) -> pygame.Surface:
+    if _pack is not None and normalize_path(path) in _pack:
+        return _pack.load_image(normalize_path(path))
+    return pygame.image.load(path)
+
+
+def load_raw_image_resource(path: str, size: tuple[int, int], format: str) -> pygame.Surface:
+    # raw pixels in the pack are used in place, loose ones are read into memory once
+    if _pack is not None and normalize_path(path) in _pack:
+        return pygame.image.frombuffer(_pack.get_buffer(normalize_path(path)), size, format)
+    with open(path, "rb") as file:
+        return pygame.image.frombytes(file.read(), size, format)
+
+
+def get_resource_mtime(path: str) -> float:
+    if os.path.exists(path):
+        return os.path.getmtime(path)
+    return os.path.getmtime(_pack.filename) if _pack is not None else 0.0
+
+
+def get_resource_source(path: str) -> str | io.BytesIO:
+    # what pygame loaders accept: a stream over the packed bytes, or the loose filename
+    if _pack is not None and normalize_path(path) in _pack:
+        return _pack.open(normalize_path(path))
+    return path
+
+
+def open_resource(path: str):
+    if _pack is not None and normalize_path(path) in _pack:
+        return _pack.open(normalize_path(path))
+    return open(path, "rb")
+
+
+def read_resource(path: str) -> bytes:
+    with open_resource(path) as file:
+        return file.read()
@@ -1 +1,2 @@
 from .scene import Scene
+from .factory import SceneFactory, LazyScene, lazy_scene, create_scene, get_scene_class
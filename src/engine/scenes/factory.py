@@ -0,0 +1,38 @@
+import importlib
+from typing import Callable
+
+from .scene import Scene
+
+SceneFactory = Callable[[], Scene]
+
+
+class LazyScene:
+    def __init__(self, module_name: str, class_name: str):
+        # the scene module is only imported once the game first needs the scene
+        self.module_name = module_name
+        self.class_name = class_name
+
+    def get_class(self) -> type[Scene]:
+        return getattr(importlib.import_module(self.module_name), self.class_name)
+
+    def __call__(self) -> Scene:
+        return self.get_class()()
+
+
+def lazy_scene(module_name: str, class_name: str) -> SceneFactory:
+    return LazyScene(module_name, class_name)
+
+
+def create_scene(scene: Scene | SceneFactory) -> Scene:
+    return scene if isinstance(scene, Scene) else scene()
+
+
+def get_scene_class(scene: Scene | SceneFactory) -> type[Scene] | None:
+    # the class of a scene without creating it, when its factory can tell
+    if isinstance(scene, Scene):
+        return type(scene)
+    if isinstance(scene, type) and issubclass(scene, Scene):
+        return scene
+    if isinstance(scene, LazyScene):
+        return scene.get_class()
+    return None
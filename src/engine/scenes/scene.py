@@ -1,24 +1,45 @@
 from abc import ABC, abstractmethod
-from ..game.context.game import GameContext
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # the game imports scenes, so the context is only named here for type checkers
+    from ..game.context.game import GameContext
 
 
 class Scene(ABC):
+    # resident scenes are loaded once and only started again when re-entered
+    keep_resident = False
+
+    @classmethod
+    def get_dependencies(cls, context: "GameContext") -> list:
+        # assets listed here are preloaded in the background before the scene loads. it is
+        # asked of the class, so scenes that may come next are prewarmed without creating them
+        return []
+
+    def get_next_scenes(self, context: "GameContext") -> list[int]:
+        # indices of scenes likely to follow, whose assets are read ahead of time
+        return []
+
     @abstractmethod
-    def load(self, context: GameContext) -> None:
+    def load(self, context: "GameContext") -> None:
         pass
 
     @abstractmethod
-    def start(self, context: GameContext) -> None:
+    def start(self, context: "GameContext") -> None:
         pass
 
     @abstractmethod
-    def update(self, context: GameContext) -> None:
+    def update(self, context: "GameContext") -> None:
         pass
 
     @abstractmethod
-    def draw(self, context: GameContext) -> None:
+    def draw(self, context: "GameContext") -> None:
         pass
 
     @abstractmethod
-    def exit(self, context: GameContext) -> None:
-        pass
\ No newline at end of file
+    def exit(self, context: "GameContext") -> None:
+        pass
+
+    def unload(self, context: "GameContext") -> None:
+        # called once a non resident scene exits, or when the game closes
+        pass
@@ -1,21 +1,87 @@
+import math
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import cache
+from itertools import accumulate
+
 import pygame
 from pygame import Surface, Vector2
 from pygame.sprite import Sprite
 
 from .resources.json import load_json_resource
+from .resources.pack import load_image_resource
 from .transformation import TransformationData, create_transformation_zero
 
+# clip durations are in milliseconds, like the rest of the scene clock
+DEFAULT_FRAME_DURATION = 100
+LOOP = "loop"
+PING_PONG = "ping_pong"
+ONCE = "once"
+CLIP_MODES = (LOOP, PING_PONG, ONCE)
+
+# transformed frames are made on demand and kept up to this many bytes per sheet. scales
+# and rotations are rounded, so close values share a variant instead of filling the cache
+DEFAULT_VARIANT_BUDGET = 16 * 1024 * 1024
+VARIANT_SCALE_PRECISION = 2
+VARIANT_ROTATION_STEP = 1
+
 
 def load_spritesheet(filename: str):
+    data = load_spritesheet_data(filename)
+    return create_spritesheet(load_image_resource(data.image_filename), data)
+
+
+def load_spritesheet_data(filename: str):
     data_dict = load_json_resource(filename)
-    data = SpriteSheetData(**data_dict)
-    image = pygame.image.load(data.image_filename).convert_alpha()
+    return SpriteSheetData(**data_dict)
+
+
+def create_spritesheet(image: Surface, data: "SpriteSheetData"):
+    # converting needs the display, so this part always runs on the main thread
+    image = image.convert_alpha()
     image = pygame.transform.scale(image, (image.get_width() * data.scale_factor, image.get_height() * data.scale_factor))
     return SpriteSheet(image, data)
 
 
+def create_clips(table: dict[str, dict] | None, frame_count: int) -> dict[str, "AnimationClip"]:
+    # clips are named frame ranges or lists, with one duration for every frame or one each
+    clips = dict[str, AnimationClip]()
+    for name, entry in (table or {}).items():
+        frames = entry.get("frames") or list(range(entry.get("start", 0), entry.get("end", frame_count - 1) + 1))
+        durations = entry.get("durations") or [entry.get("duration", DEFAULT_FRAME_DURATION)] * len(frames)
+        mode = entry.get("mode", LOOP)
+        if any(frame < 0 or frame >= frame_count for frame in frames):
+            raise ValueError(f"clip {name!r} uses frames outside of the {frame_count} in its sheet")
+        if len(durations) != len(frames):
+            raise ValueError(f"clip {name!r} has {len(durations)} durations for {len(frames)} frames")
+        if mode not in CLIP_MODES:
+            raise ValueError(f"clip {name!r} has the unknown mode {mode!r}")
+        clips[name] = AnimationClip(name, frames, durations, mode)
+    return clips
+
+
+def get_frame_rects(data: "SpriteSheetData") -> list[tuple[int, int, int, int]]:
+    # frames go left to right and top to bottom, stopping at linear_count when there is one
+    count = data.rows * data.columns
+    if data.linear_count:
+        count = min(count, data.linear_count)
+    return [(data.offset_x + data.scaled_width * (i % data.columns), data.offset_y + data.scaled_height * (i // data.columns), data.scaled_width, data.scaled_height) for i in range(count)]
+
+
+def load_image_data(filename: str):
+    data_dict = load_json_resource(filename)
+    return ImageData(**data_dict)
+
+
+class ImageData:
+    def __init__(self, image_filename: str, width: int, height: int):
+        self.image_filename = image_filename
+        self.width = width
+        self.height = height
+
+
 class SpriteSheetData:
-    def __init__(self, image_filename: str, width: int, height: int, columns = 1, rows = 1, linear_count: int | None = None, offset_x = 0, offset_y = 0, scale_factor = 1):
+    def __init__(self, image_filename: str, width: int, height: int, columns = 1, rows = 1, linear_count: int | None = None, offset_x = 0, offset_y = 0, scale_factor = 1, clips: dict[str, dict] | None = None):
         self.image_filename = image_filename
         self.width = width
         self.scaled_width = width * scale_factor
@@ -27,48 +93,210 @@ class SpriteSheetData:
         self.offset_x = offset_x
         self.offset_y = offset_y
         self.scale_factor = scale_factor
+        self.clips = clips
+
+
+class AnimationClip:
+    def __init__(self, name: str, frames: list[int], durations: list[float], mode: str = LOOP):
+        # ping pong clips play their frames forth and back, without repeating the ends
+        if mode == PING_PONG and len(frames) > 2:
+            frames = frames + frames[-2:0:-1]
+            durations = durations + durations[-2:0:-1]
+        self.name = name
+        self.mode = mode
+        self.sequence = frames
+        self.durations = durations
+        self.ends = list(accumulate(durations))
+        self.length = self.ends[-1]
+        # most clips give every frame the same time, and find their step with a division
+        self.uniform_duration = durations[0] if len(set(durations)) == 1 else None
+
+    def __len__(self):
+        return len(self.sequence)
+
+    def get_step(self, elapsed: float) -> int:
+        # the position in the sequence after elapsed milliseconds, from the clip start
+        last = len(self.sequence) - 1
+        if elapsed <= 0:
+            return 0
+        if elapsed >= self.length:
+            if self.mode == ONCE:
+                return last
+            elapsed %= self.length
+        if self.uniform_duration is not None:
+            return min(int(elapsed // self.uniform_duration), last)
+        return min(bisect_right(self.ends, elapsed), last)
+
+    def get_frame(self, elapsed: float) -> int:
+        return self.sequence[self.get_step(elapsed)]
+
+    def is_finished(self, elapsed: float) -> bool:
+        return self.mode == ONCE and elapsed >= self.length
+
+
+@cache
+def create_uniform_clip(frame_count: int, duration: float, mode: str = LOOP) -> AnimationClip:
+    # shared, so sprites made with the same frame count and duration animate as one group
+    return AnimationClip(f"{frame_count}x{duration}", list(range(frame_count)), [duration] * frame_count, mode)
+
+
+class FrameVariants:
+    def __init__(self, frames: list[Surface], budget: int = DEFAULT_VARIANT_BUDGET):
+        self.frames = frames
+        self.budget = budget
+        # flipped, scaled and rotated frames in least recently used order
+        self.variants = OrderedDict[tuple[int, float, float, int], Surface]()
+        self.size = 0
+        self.renders = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.variants)
+
+    def get(self, frame: int, scale: Vector2 | tuple[float, float] = (1, 1), rotation: float = 0) -> Surface:
+        # a negative scale mirrors the frame on that axis
+        scale_x, scale_y = round(scale[0], VARIANT_SCALE_PRECISION), round(scale[1], VARIANT_SCALE_PRECISION)
+        rotation = round(rotation / VARIANT_ROTATION_STEP) * VARIANT_ROTATION_STEP % 360
+        if scale_x == 1 and scale_y == 1 and rotation == 0:
+            return self.frames[frame]
+        key = (frame, scale_x, scale_y, rotation)
+        variant = self.variants.get(key)
+        if variant is not None:
+            self.variants.move_to_end(key)
+            return variant
+        variant = self.variants[key] = self.render(frame, scale_x, scale_y, rotation)
+        self.renders += 1
+        self.size += variant.get_bytesize() * variant.get_width() * variant.get_height()
+        while self.size > self.budget and len(self.variants) > 1:
+            _, evicted = self.variants.popitem(last=False)
+            self.size -= evicted.get_bytesize() * evicted.get_width() * evicted.get_height()
+            self.evictions += 1
+        return variant
+
+    def render(self, frame: int, scale_x: float, scale_y: float, rotation: int) -> Surface:
+        # nearest neighbour all the way, so pixel art stays sharp
+        image = self.frames[frame]
+        if scale_x < 0 or scale_y < 0:
+            image = pygame.transform.flip(image, scale_x < 0, scale_y < 0)
+        if abs(scale_x) != 1 or abs(scale_y) != 1:
+            image = pygame.transform.scale(image, (max(round(image.get_width() * abs(scale_x)), 1), max(round(image.get_height() * abs(scale_y)), 1)))
+        if rotation:
+            image = pygame.transform.rotate(image, rotation)
+        return image
+
+    def clear(self):
+        self.variants.clear()
+        self.size = 0
 
 
 class SpriteSheet:
-    def __init__(self, source: Surface, data: SpriteSheetData):
+    def __init__(self, source: Surface, data: SpriteSheetData, frames: list[Surface] | None = None):
         self.source = source
         self.data = data
-        self.frames = self.split()
-    
+        # baked sheets come with their frames already cut from a shared atlas page
+        if frames is not None:
+            self.rects = [(*frame.get_offset(), *frame.get_size()) for frame in frames]
+            self.frames = frames
+        else:
+            self.rects = get_frame_rects(data)
+            self.frames = self.split()
+        self.clips = create_clips(data.clips, len(self.frames))
+        self.variants = FrameVariants(self.frames)
+
+    def get_clip(self, name: str) -> AnimationClip:
+        return self.clips[name]
+
+    def get_frame(self, frame: int, scale: Vector2 | tuple[float, float] = (1, 1), rotation: float = 0) -> Surface:
+        return self.variants.get(frame, scale, rotation)
+
     def split(self) -> list[Surface]:
-        result = []
-        for i in range(self.data.rows):
-            for j in range(self.data.columns):
-                location = (self.data.offset_x + self.data.scaled_width * j, self.data.offset_y + self.data.scaled_height * i)
-                result.append(self.source.subsurface(pygame.Rect(location, (self.data.scaled_width, self.data.scaled_height))))
-                if self.data.linear_count and len(result) == self.data.linear_count:
-                    break
-        return result
+        return [self.source.subsurface(rect) for rect in self.rects]
 
 
 class AnimatedSprite(Sprite):
-    def __init__(self, frames: list[Surface], transform: TransformationData = create_transformation_zero(), duration = 1/10):
+    def __init__(self, frames: list[Surface], transform: TransformationData | None = None, duration = 1/10, clip: AnimationClip | None = None, variants: FrameVariants | None = None):
         super().__init__()
-        self.transform = transform
+        # every sprite gets its own transform, as scaling or moving one must not move the others
+        self.transform = transform or create_transformation_zero()
         self.frames = frames
         self.frame_count = len(frames)
         self.current_frame = 0
 
+        # the transform scale and rotation are applied with variants of the frames, shared
+        # with every sprite of the same sheet when it is given
+        self.variants = variants or FrameVariants(frames)
+        self.transformed = False
         self.image = self.frames[self.current_frame]
         self.rect = self.image.get_rect()
         self.transform.apply_position_to_rect(self.rect)
-        
-        self.frame_duration = duration
-        self.frame_timer = 0
+        self.update_image()
+
+        # without a clip every frame plays in order, for duration seconds each
+        self.clip = clip or create_uniform_clip(self.frame_count, duration * 1000)
+        self.elapsed = 0.0
+        self.step_ends_at = 0.0
+        # sprites played by an animation system get their frames from it instead
+        self.animator = None
 
     def set_position(self, position: Vector2 | tuple[float, float]):
         self.transform.position = position
         self.transform.apply_position_to_rect(self.rect)
 
-    def update(self, dt: float):
-        self.frame_timer = self.frame_timer + dt
+    def set_scale(self, scale: Vector2 | tuple[float, float]):
+        self.transform.scale = Vector2(scale)
+        self.update_image()
+
+    def set_rotation(self, rotation: float):
+        self.transform.rotation = rotation
+        self.update_image()
 
-        if self.frame_timer >= self.frame_duration:
-            self.frame_timer = 0
-            self.current_frame = (self.current_frame + 1) % self.frame_count
-            self.image = self.frames[self.current_frame]
+    def set_frame(self, frame: int):
+        if frame != self.current_frame:
+            self.show_frame(frame)
+
+    def show_frame(self, frame: int):
+        # untransformed sprites skip straight to the frame, as most sprites are
+        self.current_frame = frame
+        if self.transformed:
+            self.update_image()
+        else:
+            self.image = self.frames[frame]
+
+    def update_image(self):
+        # the transform is read again here, so it has to be called after changing it in place
+        transform = self.transform
+        self.transformed = transform.rotation != 0 or transform.scale.x != 1 or transform.scale.y != 1
+        if self.transformed:
+            image = self.variants.get(self.current_frame, transform.scale, transform.rotation)
+        else:
+            image = self.frames[self.current_frame]
+        # scaled and rotated frames change size, and stay anchored where they were
+        if image.get_size() != self.rect.size:
+            self.rect.size = image.get_size()
+            transform.apply_position_to_rect(self.rect)
+        self.image = image
+
+    def play(self, clip: AnimationClip):
+        self.clip = clip
+        self.elapsed = 0.0
+        self.step_ends_at = 0.0
+        self.set_frame(clip.sequence[0])
+
+    def update(self, dt: float):
+        # the frame comes from the time since the clip started, so it never drifts from it.
+        # the clip is only looked at once the current step is over
+        if self.animator is not None:
+            return
+        self.elapsed += dt * 1000
+        if self.elapsed < self.step_ends_at:
+            return
+        clip = self.clip
+        if self.elapsed >= clip.length:
+            if clip.mode == ONCE:
+                self.step_ends_at = math.inf
+                self.set_frame(clip.sequence[-1])
+                return
+            self.elapsed %= clip.length
+        step = clip.get_step(self.elapsed)
+        self.step_ends_at = clip.ends[step]
+        self.set_frame(clip.sequence[step])
@@ -0,0 +1,54 @@
+import json
+import time
+from time import perf_counter
+
+STARTUP_PHASES = ("import", "init", "first_frame")
+
+
+class StartupTrace:
+    def __init__(self):
+        # the clock starts when the engine is first imported
+        self.started_at = perf_counter()
+        self.marks = list[tuple[str, float]]()
+        self.first_frame_wall_time = None
+
+    @property
+    def is_finished(self):
+        return self.first_frame_wall_time is not None
+
+    def mark(self, name: str):
+        if not self.is_finished:
+            self.marks.append((name, perf_counter()))
+            if name == "first_frame":
+                self.first_frame_wall_time = time.time()
+
+    def get_time_to_first_frame(self) -> float | None:
+        for name, marked_at in self.marks:
+            if name == "first_frame":
+                return (marked_at - self.started_at) * 1000
+        return None
+
+    def get_report(self) -> dict:
+        phases = {}
+        previous = self.started_at
+        for name, marked_at in self.marks:
+            phases[name] = (marked_at - previous) * 1000
+            previous = marked_at
+        return {
+            "phases_ms": phases,
+            "time_to_first_frame_ms": self.get_time_to_first_frame(),
+            "first_frame_wall_time": self.first_frame_wall_time,
+        }
+
+    def print_report(self):
+        report = self.get_report()
+        for name, duration in report["phases_ms"].items():
+            print(f"startup {name:<12} {duration:8.2f} ms")
+        print(f"startup {'total':<12} {report['time_to_first_frame_ms']:8.2f} ms")
+
+    def export(self, filename: str):
+        with open(filename, "w") as file:
+            json.dump(self.get_report(), file, indent=2)
+
+
+STARTUP = StartupTrace()
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+
+from . import pygame
+from .pygame import Font, Surface, Rect, Color
+
+DEFAULT_CHARSET = "".join(chr(code) for code in range(32, 127))
+ATLAS_MAX_WIDTH = 1024
+DEFAULT_TEXT_CACHE_SIZE = 128
+
+
+class GlyphAtlas:
+    def __init__(self,
+                 font: Font,
+                 color: Color | str,
+                 antialias: bool = False,
+                 height: int | None = None,
+                 charset: str = DEFAULT_CHARSET):
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.height = int(height) if height else font.get_height()
+        self.scale = self.height / font.get_height()
+        self.glyphs = dict[str, tuple[Surface, Rect]]()
+        self.surface = self.build(charset)
+
+    def rasterize(self, char: str) -> Surface:
+        glyph = self.font.render(char, self.antialias, self.color)
+        if self.scale != 1:
+            glyph = pygame.transform.scale(glyph, (round(glyph.get_width() * self.scale), self.height))
+        return glyph
+
+    def build(self, charset: str) -> Surface:
+        # lay glyphs out in rows no wider than the atlas max width
+        placements = []
+        x, y, width = 0, 0, 0
+        for char in dict.fromkeys(charset):
+            glyph = self.rasterize(char)
+            if x and x + glyph.get_width() > ATLAS_MAX_WIDTH:
+                x, y = 0, y + self.height
+            placements.append((char, glyph, x, y))
+            x += glyph.get_width()
+            width = max(width, x)
+
+        # blit every glyph once into the shared atlas surface
+        atlas = Surface((max(width, 1), y + self.height), pygame.SRCALPHA)
+        atlas.fill((0, 0, 0, 0))
+        for char, glyph, x, y in placements:
+            atlas.blit(glyph, (x, y))
+            self.glyphs[char] = (atlas, Rect(x, y, glyph.get_width(), self.height))
+        return atlas
+
+    def get_glyph(self, char: str) -> tuple[Surface, Rect]:
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            # characters outside the charset get their own surface on first use
+            surface = self.rasterize(char)
+            glyph = self.glyphs[char] = (surface, surface.get_rect())
+        return glyph
+
+    def measure(self, text: str) -> int:
+        return sum(self.get_glyph(char)[1].width for char in text)
+
+    def blit(self, target: Surface, text: str, position: tuple[float, float]) -> Rect:
+        x, y = position
+        blits = []
+        for char in text:
+            source, area = self.get_glyph(char)
+            blits.append((source, (x, y), area))
+            x += area.width
+        target.blits(blits, doreturn=False)
+        return Rect(position[0], position[1], x - position[0], self.height)
+
+    def compose(self, text: str) -> Surface:
+        surface = Surface((max(self.measure(text), 1), self.height), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 0))
+        self.blit(surface, text, (0, 0))
+        return surface
+
+
+class TextRenderer:
+    def __init__(self,
+                 font: Font,
+                 color: Color | str,
+                 antialias: bool = False,
+                 height: int | None = None,
+                 cache_size: int = DEFAULT_TEXT_CACHE_SIZE):
+        self.atlas = get_glyph_atlas(font, color, antialias, height)
+        self.cache_size = cache_size
+        self.cache = OrderedDict[str, Surface]()
+
+    @property
+    def height(self):
+        return self.atlas.height
+
+    def render(self, text: str) -> Surface:
+        surface = self.cache.get(text)
+        if surface is not None:
+            self.cache.move_to_end(text)
+            return surface
+
+        surface = self.atlas.compose(text)
+        self.cache[text] = surface
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.cache.clear()
+
+
+_glyph_atlases = dict[tuple, GlyphAtlas]()
+
+
+def get_glyph_atlas(font: Font, color: Color | str, antialias: bool = False, height: int | None = None) -> GlyphAtlas:
+    key = (font, tuple(Color(color)), antialias, int(height) if height else None)
+    atlas = _glyph_atlases.get(key)
+    if atlas is None:
+        atlas = _glyph_atlases[key] = GlyphAtlas(font, color, antialias, height)
+    return atlas
+
+
+def clear_glyph_atlases():
+    _glyph_atlases.clear()
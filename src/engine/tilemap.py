@@ -0,0 +1,261 @@
+from collections import OrderedDict
+
+import pygame
+from pygame import Rect, Surface, Vector2
+
+from .resources.json import load_json_resource
+from .resources.pack import load_image_resource
+
+DEFAULT_CHUNK_SIZE = 8
+DEFAULT_CHUNK_CAPACITY = 24
+DEFAULT_STREAM_BUDGET = 1
+EMPTY_TILE = -1
+
+
+def load_tilemap(filename: str):
+    data = load_tilemap_data(filename)
+    return create_tilemap(load_image_resource(data.tileset_filename), data)
+
+
+def load_tilemap_data(filename: str):
+    data_dict = load_json_resource(filename)
+    return TileMapData(**data_dict)
+
+
+def create_tilemap(image: Surface, data: "TileMapData"):
+    # converting needs the display, so this part always runs on the main thread
+    image = image.convert_alpha()
+    image = pygame.transform.scale(image, (image.get_width() * data.scale_factor, image.get_height() * data.scale_factor))
+    return TileMap(image, data)
+
+
+class TileMapData:
+    def __init__(self, tileset_filename: str, tile_width: int, tile_height: int, width: int, height: int, legend: dict[str, int], layers: list[dict], tileset_columns = 1, scale_factor = 1, chunk_size = DEFAULT_CHUNK_SIZE, solid: list[str] | None = None, spawn: list[int] | None = None):
+        self.tileset_filename = tileset_filename
+        self.tile_width = tile_width
+        self.scaled_tile_width = tile_width * scale_factor
+        self.tile_height = tile_height
+        self.scaled_tile_height = tile_height * scale_factor
+        self.width = width
+        self.height = height
+        self.legend = legend
+        self.layers = layers
+        self.tileset_columns = tileset_columns
+        self.scale_factor = scale_factor
+        self.chunk_size = chunk_size
+        self.solid = solid or []
+        self.spawn = spawn or [0, 0]
+
+
+class TileMap:
+    def __init__(self, tileset: Surface, data: TileMapData):
+        self.tileset = tileset
+        self.data = data
+        self.tile_width = data.scaled_tile_width
+        self.tile_height = data.scaled_tile_height
+        self.width = data.width
+        self.height = data.height
+        self.chunk_size = data.chunk_size
+        self.chunk_columns = -(-data.width // data.chunk_size)
+        self.chunk_rows = -(-data.height // data.chunk_size)
+
+        # every tile of the tileset is cut once, layers only keep indices into it. fully
+        # opaque tiles are cut from a copy without alpha, and hide the layers below them
+        tile_count = max(data.legend.values()) + 1
+        opaque_tileset = tileset.convert()
+        self.tiles = list[Surface]()
+        self.opaque = list[bool]()
+        for i in range(tile_count):
+            rect = Rect((i % data.tileset_columns) * self.tile_width, (i // data.tileset_columns) * self.tile_height, self.tile_width, self.tile_height)
+            is_opaque = pygame.mask.from_surface(tileset.subsurface(rect), 254).count() == rect.width * rect.height
+            self.tiles.append((opaque_tileset if is_opaque else tileset).subsurface(rect))
+            self.opaque.append(is_opaque)
+        self.layers = [self.parse_layer(layer["rows"]) for layer in data.layers]
+        self.layer_names = [layer["name"] for layer in data.layers]
+
+        solid_tiles = {data.legend[character] for character in data.solid}
+        self.solid = [any(layer[y][x] in solid_tiles for layer in self.layers) for y in range(self.height) for x in range(self.width)]
+
+    def parse_layer(self, rows: list[str]) -> list[list[int]]:
+        legend = self.data.legend
+        return [[legend.get(character, EMPTY_TILE) for character in row.ljust(self.width)[:self.width]] for row in rows[:self.height]] + [[EMPTY_TILE] * self.width for _ in range(self.height - len(rows))]
+
+    def get_rect(self) -> Rect:
+        return Rect(0, 0, self.width * self.tile_width, self.height * self.tile_height)
+
+    def get_chunk_pixel_size(self) -> tuple[int, int]:
+        return self.chunk_size * self.tile_width, self.chunk_size * self.tile_height
+
+    def get_tile(self, layer: int, x: int, y: int) -> int:
+        return self.layers[layer][y][x]
+
+    def is_solid(self, x: int, y: int) -> bool:
+        return self.solid[y * self.width + x]
+
+    def get_spawn_position(self) -> Vector2:
+        # the bottom center of the spawn tile, where the feet of the player go
+        x, y = self.data.spawn
+        return Vector2((x + 0.5) * self.tile_width, (y + 1) * self.tile_height)
+
+    def get_solid_rects(self) -> list[Rect]:
+        # runs of solid tiles in a row are merged, so there are far fewer rects than tiles
+        rects = list[Rect]()
+        for y in range(self.height):
+            x = 0
+            while x < self.width:
+                if not self.is_solid(x, y):
+                    x += 1
+                    continue
+                start = x
+                while x < self.width and self.is_solid(x, y):
+                    x += 1
+                rects.append(Rect(start * self.tile_width, y * self.tile_height, (x - start) * self.tile_width, self.tile_height))
+        return rects
+
+    def get_chunk_range(self, rect: Rect) -> tuple[int, int, int, int]:
+        # chunks touched by a rect in map pixels, clamped to the map
+        chunk_width, chunk_height = self.get_chunk_pixel_size()
+        left = max(0, rect.left // chunk_width)
+        top = max(0, rect.top // chunk_height)
+        right = min(self.chunk_columns - 1, (rect.right - 1) // chunk_width)
+        bottom = min(self.chunk_rows - 1, (rect.bottom - 1) // chunk_height)
+        return left, top, right, bottom
+
+    def render_chunk(self, chunk_x: int, chunk_y: int, surface: Surface | None = None) -> Surface:
+        # chunks are made in the display format right away, converting them costs more than drawing them
+        if surface is None:
+            display = pygame.display.get_surface()
+            surface = pygame.Surface(self.get_chunk_pixel_size(), 0, display) if display is not None else pygame.Surface(self.get_chunk_pixel_size())
+        surface.fill("black")
+        first_x, first_y = chunk_x * self.chunk_size, chunk_y * self.chunk_size
+        last_x, last_y = min(first_x + self.chunk_size, self.width), min(first_y + self.chunk_size, self.height)
+        blits = list[tuple[Surface, tuple[int, int]]]()
+        for y in range(first_y, last_y):
+            for x in range(first_x, last_x):
+                stack = [layer[y][x] for layer in self.layers if layer[y][x] != EMPTY_TILE]
+                # tiles under the topmost opaque one would never be seen
+                for bottom in range(len(stack) - 1, 0, -1):
+                    if self.opaque[stack[bottom]]:
+                        stack = stack[bottom:]
+                        break
+                position = ((x - first_x) * self.tile_width, (y - first_y) * self.tile_height)
+                blits.extend((self.tiles[tile], position) for tile in stack)
+        surface.blits(blits, doreturn=False)
+        return surface
+
+
+class ChunkCache:
+    def __init__(self, tilemap: TileMap, capacity: int = DEFAULT_CHUNK_CAPACITY):
+        self.tilemap = tilemap
+        self.capacity = capacity
+        # rendered chunks in least recently used order
+        self.chunks = OrderedDict[tuple[int, int], Surface]()
+        # chunks queued for the draw being put together, which must not be drawn over
+        self.in_use = set[tuple[int, int]]()
+        self.renders = 0
+        self.evictions = 0
+
+    def get(self, chunk_x: int, chunk_y: int) -> Surface:
+        key = (chunk_x, chunk_y)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.render(key)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def render(self, key: tuple[int, int]) -> Surface:
+        # once full, the least recently used chunk is drawn over instead of making a new surface
+        reused = self.evict() if len(self.chunks) >= self.capacity else None
+        chunk = self.chunks[key] = self.tilemap.render_chunk(*key, reused)
+        self.renders += 1
+        return chunk
+
+    def evict(self) -> Surface | None:
+        # the least recently used chunk that is not in use. when every chunk is, the cache
+        # grows past its capacity until the draw is done
+        for key in self.chunks:
+            if key not in self.in_use:
+                self.evictions += 1
+                return self.chunks.pop(key)
+        return None
+
+    def trim(self):
+        while len(self.chunks) > self.capacity:
+            self.chunks.popitem(last=False)
+            self.evictions += 1
+
+    def stream(self, view: Rect, margin: int, budget: int = DEFAULT_STREAM_BUDGET):
+        # renders a few of the missing chunks around the view, the nearest first, before
+        # the camera reaches them. chunks in the view are touched so they are kept
+        left, top, right, bottom = self.tilemap.get_chunk_range(view.inflate(2 * margin, 2 * margin))
+        center_x, center_y = view.center
+        chunk_width, chunk_height = self.tilemap.get_chunk_pixel_size()
+        missing = list[tuple[float, tuple[int, int]]]()
+        for chunk_y in range(top, bottom + 1):
+            for chunk_x in range(left, right + 1):
+                key = (chunk_x, chunk_y)
+                if key in self.chunks:
+                    self.chunks.move_to_end(key)
+                else:
+                    distance = ((chunk_x + 0.5) * chunk_width - center_x) ** 2 + ((chunk_y + 0.5) * chunk_height - center_y) ** 2
+                    missing.append((distance, key))
+        missing.sort()
+        for _, key in missing[:budget]:
+            self.render(key)
+
+    def clear(self):
+        self.chunks.clear()
+
+    def get_size(self) -> int:
+        return sum(chunk.get_bytesize() * chunk.get_width() * chunk.get_height() for chunk in self.chunks.values())
+
+
+class Camera:
+    def __init__(self, size: tuple[int, int], bounds: Rect | None = None):
+        self.size = size
+        self.bounds = bounds
+        self.position = Vector2(0, 0)
+
+    def follow(self, target: Vector2 | tuple[float, float]):
+        # centers the target, without showing anything outside of the bounds
+        width, height = self.size
+        x, y = target[0] - width / 2, target[1] - height / 2
+        if self.bounds is not None:
+            x = min(max(x, self.bounds.left), self.bounds.right - width) if self.bounds.width > width else self.bounds.centerx - width / 2
+            y = min(max(y, self.bounds.top), self.bounds.bottom - height) if self.bounds.height > height else self.bounds.centery - height / 2
+        self.position = Vector2(x, y)
+
+    def get_offset(self) -> tuple[int, int]:
+        # whole pixels, so the map and the sprites drawn over it never drift apart
+        return round(self.position.x), round(self.position.y)
+
+    def get_view_rect(self) -> Rect:
+        return Rect(self.get_offset(), self.size)
+
+    def to_screen(self, position: Vector2 | tuple[float, float]) -> Vector2:
+        offset_x, offset_y = self.get_offset()
+        return Vector2(position[0] - offset_x, position[1] - offset_y)
+
+
+def draw_tilemap(surface: Surface, cache: ChunkCache, camera: Camera, destination: Rect | None = None) -> Rect:
+    # only the chunks under the camera are drawn, so the cost does not grow with the map
+    destination = destination or surface.get_rect()
+    view = camera.get_view_rect()
+    chunk_width, chunk_height = cache.tilemap.get_chunk_pixel_size()
+    left, top, right, bottom = cache.tilemap.get_chunk_range(view)
+    blits = list[tuple[Surface, tuple[int, int]]]()
+    if not cache.tilemap.get_rect().contains(view):
+        surface.fill("black", destination)
+    for chunk_y in range(top, bottom + 1):
+        for chunk_x in range(left, right + 1):
+            position = (destination.left + chunk_x * chunk_width - view.left, destination.top + chunk_y * chunk_height - view.top)
+            cache.in_use.add((chunk_x, chunk_y))
+            blits.append((cache.get(chunk_x, chunk_y), position))
+    clip = surface.get_clip()
+    surface.set_clip(destination)
+    surface.blits(blits, doreturn=False)
+    surface.set_clip(clip)
+    cache.in_use.clear()
+    cache.trim()
+    return destination
@@ -0,0 +1,22 @@
+from . import pygame
+
+
+class SystemTimeSource:
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+    def advance(self):
+        pass
+
+
+class VirtualTimeSource:
+    def __init__(self, rate: int):
+        # frames are counted, so the ticks never pick up rounding from adding steps
+        self.rate = rate
+        self.frames = 0
+
+    def get_ticks(self):
+        return self.frames * 1000 / self.rate
+
+    def advance(self):
+        self.frames += 1
@@ -0,0 +1,185 @@
+import heapq
+from typing import Any, Callable, Iterator
+
+from pygame import Color
+
+Easing = Callable[[float], float]
+
+
+def linear(t: float) -> float:
+    return t
+
+
+def ease_in(t: float) -> float:
+    return t * t
+
+
+def ease_out(t: float) -> float:
+    return t * (2 - t)
+
+
+def ease_in_out(t: float) -> float:
+    return 2 * t * t if t < 0.5 else 1 - 2 * (1 - t) * (1 - t)
+
+
+def ease_out_cubic(t: float) -> float:
+    return 1 - (1 - t) ** 3
+
+
+def ease_out_back(t: float) -> float:
+    # overshoots the end a little before settling on it
+    t -= 1
+    return 1 + t * t * (2.70158 * t + 1.70158)
+
+
+def interpolate(start: Any, end: Any, t: float) -> Any:
+    # numbers and vectors in a straight line, colors per channel and clamped, since easings can overshoot
+    if isinstance(start, Color):
+        end = Color(end)
+        return Color(*(min(max(round(a + (b - a) * t), 0), 255) for a, b in zip(start, end)))
+    return start + (end - start) * t
+
+
+class TimerHandle:
+    def __init__(self, due: float, payload: Any, interval: float | None = None, count: int | None = None):
+        # repeating timers come due every interval, count times or until cancelled
+        self.due = due
+        self.payload = payload
+        self.interval = interval
+        self.count = count
+        self.cancelled = False
+
+
+class TimerQueue:
+    def __init__(self):
+        # heap of (due, sequence, timer), so timers due at the same tick come out in the order
+        # they were pushed and the heap only ever compares plain numbers
+        self.heap = list[tuple[float, int, TimerHandle]]()
+        self.sequence = 0
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def push(self, due: float, payload: Any, interval: float | None = None, count: int | None = None) -> TimerHandle:
+        timer = TimerHandle(due, payload, interval, count)
+        heapq.heappush(self.heap, (due, self.sequence, timer))
+        self.sequence += 1
+        return timer
+
+    def cancel(self, timer: TimerHandle | None):
+        # cancelled timers stay in the heap and are skipped once they come up
+        if timer is not None:
+            timer.cancelled = True
+
+    def pop_due(self, ticks: float) -> Iterator[TimerHandle]:
+        # every timer due by ticks, in order. each one costs a heap operation,
+        # and timers that are not due yet are never looked at. timers cancelled while
+        # iterating are skipped, and new ones already due come out too
+        heap = self.heap
+        while heap and heap[0][0] <= ticks:
+            timer = heap[0][2]
+            if timer.cancelled:
+                heapq.heappop(heap)
+                continue
+            if timer.count is not None:
+                timer.count -= 1
+            if timer.interval and timer.count != 0:
+                # repeating timers go back into the heap in the same step they come out of it
+                timer.due += timer.interval
+                heapq.heapreplace(heap, (timer.due, self.sequence, timer))
+                self.sequence += 1
+            else:
+                heapq.heappop(heap)
+            yield timer
+
+    def clear(self):
+        self.heap.clear()
+
+
+class Tween:
+    def __init__(self, target: Any, attribute: str, end: Any, duration: float, easing: Easing = linear, started_at: float = 0, on_complete: Callable[[], None] | None = None):
+        self.target = target
+        self.attribute = attribute
+        self.start = None
+        self.end = end
+        self.duration = duration
+        self.easing = easing
+        self.started_at = started_at
+        self.on_complete = on_complete
+        self.cancelled = False
+
+    def apply(self, ticks: float) -> bool:
+        # sets the attribute for the given tick, and tells whether the tween got to its end
+        if ticks < self.started_at:
+            return False
+        if self.start is None:
+            # delayed tweens start from wherever the attribute is once they begin
+            self.start = getattr(self.target, self.attribute)
+        t = min((ticks - self.started_at) / self.duration, 1) if self.duration > 0 else 1
+        setattr(self.target, self.attribute, self.end if t == 1 else interpolate(self.start, self.end, self.easing(t)))
+        return t == 1
+
+
+class Scheduler:
+    def __init__(self):
+        self.timers = TimerQueue()
+        # one tween per attribute, a new one takes over from the running one
+        self.tweens = dict[tuple[int, str], Tween]()
+        self.ticks = 0.0
+
+    def after(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        return self.timers.push(self.ticks + delay, callback)
+
+    def at(self, due: float, callback: Callable[[], None]) -> TimerHandle:
+        return self.timers.push(due, callback)
+
+    def every(self, interval: float, callback: Callable[[], None], count: int | None = None, delay: float | None = None) -> TimerHandle:
+        # the first call comes after one interval, unless a delay is given
+        return self.timers.push(self.ticks + (interval if delay is None else delay), callback, interval, count)
+
+    def tween(self, target: Any, attribute: str, end: Any, duration: float, easing: Easing = linear, delay: float = 0, on_complete: Callable[[], None] | None = None) -> Tween:
+        key = (id(target), attribute)
+        previous = self.tweens.pop(key, None)
+        if previous is not None:
+            previous.cancelled = True
+        tween = self.tweens[key] = Tween(target, attribute, end, duration, easing, self.ticks + delay, on_complete)
+        return tween
+
+    def cancel(self, handle: TimerHandle | Tween | None):
+        if isinstance(handle, Tween):
+            if self.tweens.get((id(handle.target), handle.attribute)) is handle:
+                del self.tweens[(id(handle.target), handle.attribute)]
+            handle.cancelled = True
+        else:
+            self.timers.cancel(handle)
+
+    def is_tweening(self, target: Any, attribute: str) -> bool:
+        return (id(target), attribute) in self.tweens
+
+    def set_ticks(self, ticks: float):
+        self.ticks = ticks
+
+    def advance(self, ticks: float):
+        # runs everything due by ticks. the clock only moves with the scene, so nothing runs
+        # ahead while the game is paused
+        self.ticks = ticks
+        for timer in self.timers.pop_due(ticks):
+            timer.payload()
+
+        if not self.tweens:
+            return
+        finished = list[Tween]()
+        for tween in list(self.tweens.values()):
+            if not tween.cancelled and tween.apply(ticks):
+                finished.append(tween)
+        for tween in finished:
+            self.cancel(tween)
+            if tween.on_complete is not None:
+                tween.on_complete()
+
+    def clear(self):
+        self.timers.clear()
+        for tween in self.tweens.values():
+            tween.cancelled = True
+        self.tweens.clear()
+        self.ticks = 0.0
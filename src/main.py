@@ -1,7 +1,7 @@
-from engine import *
-from deltarune.scenes import Coconut, Wip, Adventure
+from engine import Game, GameSetup, lazy_scene
 
-# setup = GameSetup("Coconut", [Wip(), Coconut(), Adventure()])
-setup = GameSetup("Coconut", [Adventure()])
+# scenes are created, and their modules imported, only when the game first enters them
+# setup = GameSetup("Coconut", [lazy_scene("deltarune.scenes.wip", "Wip"), lazy_scene("deltarune.scenes.coconut", "Coconut"), lazy_scene("deltarune.scenes.adventure", "Adventure")], loading_scene=lazy_scene("deltarune.scenes.loading", "Loading"))
+setup = GameSetup("Coconut", [lazy_scene("deltarune.scenes.adventure", "Adventure")], loading_scene=lazy_scene("deltarune.scenes.loading", "Loading"))
 
 Game(setup).run()